@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Análise de loudness das bibliotecas de samples
+==============================================
+
+Calcula, em paralelo, a loudness integrada ponderada K (ITU-R BS.1770, com gating
+absoluto e relativo), o true peak (oversampling 4x) e o RMS de cada sample, e grava
+no manifest um ganho pré-calculado (gain_db) para levar todos ao mesmo alvo.
+Os serviços de áudio do navegador aplicam o ganho sem nenhuma análise.
+
+Bibliotecas: chords, notes, philharmonia/<instrumento> e MP3s renderizados de MIDI.
+
+Uso:
+python analyze_loudness.py --libraries chords notes --target-lufs -18
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import lfilter, resample_poly
+
+from sample_manifest import SAMPLES_DIR, load_manifest, save_manifest
+
+BLOCK_SECONDS = 0.4
+BLOCK_OVERLAP = 0.75
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+
+def k_weighting(sr: int):
+    """
+    Coeficientes dos dois estágios do filtro K (shelf + passa-altas) para a taxa sr.
+    Os biquads de 48 kHz da ITU-R BS.1770-4 são convertidos para sr pela
+    transformada bilinear com os parâmetros analógicos equivalentes; em 48 kHz
+    o resultado coincide com os coeficientes da norma.
+    """
+    # Estágio 1: high shelf (~+4 dB acima de ~1.7 kHz)
+    gain_db, q, fc = 3.999843853973347, 0.7071752369554196, 1681.974450955533
+    k = np.tan(np.pi * fc / sr)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k ** 2
+    shelf_b = [(vh + vb * k / q + k ** 2) / a0, 2 * (k ** 2 - vh) / a0, (vh - vb * k / q + k ** 2) / a0]
+    shelf_a = [1.0, 2 * (k ** 2 - 1) / a0, (1 - k / q + k ** 2) / a0]
+
+    # Estágio 2: passa-altas (RLB) em ~38 Hz
+    q, fc = 0.5003270373238773, 38.13547087602444
+    k = np.tan(np.pi * fc / sr)
+    a0 = 1 + k / q + k ** 2
+    hp_b = [1.0, -2.0, 1.0]
+    hp_a = [1.0, 2 * (k ** 2 - 1) / a0, (1 - k / q + k ** 2) / a0]
+
+    return (np.array(shelf_b), np.array(shelf_a)), (np.array(hp_b), np.array(hp_a))
+
+
+def integrated_loudness(audio: np.ndarray, sr: int) -> float:
+    """Loudness integrada (LUFS) de um sinal (amostras, canais)"""
+    (b1, a1), (b2, a2) = k_weighting(sr)
+    weighted = lfilter(b2, a2, lfilter(b1, a1, audio, axis=0), axis=0)
+
+    block = int(BLOCK_SECONDS * sr)
+    if len(weighted) < block:
+        # Sample mais curto que um bloco: um único bloco com o sinal inteiro
+        block_power = np.mean(weighted ** 2, axis=0, keepdims=True)
+    else:
+        step = int(block * (1 - BLOCK_OVERLAP))
+        squared = np.concatenate([np.zeros((1, weighted.shape[1])), np.cumsum(weighted ** 2, axis=0)])
+        starts = np.arange(0, len(weighted) - block + 1, step)
+        block_power = (squared[starts + block] - squared[starts]) / block
+
+    # Soma dos canais (pesos 1.0 para L/R/C) e gating
+    power = block_power.sum(axis=1)
+    loudness = -0.691 + 10 * np.log10(np.maximum(power, 1e-12))
+    gated = power[loudness > ABSOLUTE_GATE]
+    if len(gated) == 0:
+        return float('-inf')
+    relative = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE
+    gated = power[(loudness > ABSOLUTE_GATE) & (loudness > relative)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def true_peak_db(audio: np.ndarray) -> float:
+    """Pico real estimado com oversampling 4x"""
+    oversampled = resample_poly(audio, 4, 1, axis=0)
+    peak = max(float(np.max(np.abs(oversampled))), float(np.max(np.abs(audio))))
+    return 20 * np.log10(max(peak, 1e-10))
+
+
+def analyze_file(path: str, target_lufs: float, ceiling_db: float) -> Dict:
+    audio, sr = sf.read(path, dtype='float64', always_2d=True)
+    lufs = integrated_loudness(audio, sr)
+    peak = true_peak_db(audio)
+    rms = 20 * np.log10(max(float(np.sqrt(np.mean(audio ** 2))), 1e-10))
+
+    if np.isfinite(lufs):
+        # Ganho até o alvo, limitado para o true peak não passar do teto
+        gain_db = min(target_lufs - lufs, ceiling_db - peak)
+    else:
+        gain_db = 0.0
+
+    return {
+        'gain_db': round(gain_db, 2),
+        'loudness': {
+            'integratedLufs': round(lufs, 2) if np.isfinite(lufs) else None,
+            'truePeakDb': round(peak, 2),
+            'rmsDb': round(rms, 2),
+        }
+    }
+
+
+def manifest_entries(manifest: Dict):
+    """(arquivo, entrada) de cada sample do manifest, incluindo variantes"""
+    for entry in manifest.values():
+        if not isinstance(entry, dict):
+            continue
+        if 'variants' in entry:
+            for variant in entry['variants']:
+                yield variant['file'], variant
+        elif 'file' in entry:
+            yield entry['file'], entry
+
+
+def analyze_library(library_dir, target_lufs: float = -18.0, ceiling_db: float = -1.0,
+                    workers: Optional[int] = None) -> Dict:
+    library_dir = Path(library_dir)
+    manifest_path = library_dir / 'manifest.json'
+    manifest = load_manifest(manifest_path)
+
+    entries = [(library_dir / f, e) for f, e in manifest_entries(manifest) if (library_dir / f).exists()]
+    unique_paths = sorted({str(path) for path, _ in entries})
+
+    analyze = partial(analyze_file, target_lufs=target_lufs, ceiling_db=ceiling_db)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(unique_paths, pool.map(analyze, unique_paths, chunksize=4)))
+
+    for path, entry in entries:
+        entry.update(results[str(path)])
+
+    save_manifest(manifest_path, manifest)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calcula loudness e ganho pré-calculado dos samples')
+    parser.add_argument('--libraries', nargs='+', default=['chords', 'notes'],
+                        help='Bibliotecas relativas a client/public/samples (ex.: notes, philharmonia/violin)')
+    parser.add_argument('--samples-dir', default=str(SAMPLES_DIR),
+                        help='Diretório das bibliotecas')
+    parser.add_argument('--target-lufs', type=float, default=-18.0,
+                        help='Loudness alvo (LUFS)')
+    parser.add_argument('--ceiling-db', type=float, default=-1.0,
+                        help='True peak máximo após o ganho (dBTP)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('--report', default=None,
+                        help='Arquivo JSON opcional com o relatório completo')
+    args = parser.parse_args()
+
+    print("🔊 Análise de loudness dos samples")
+    print("=" * 40)
+
+    report = {}
+    for library in args.libraries:
+        library_dir = Path(args.samples_dir) / library
+        if not (library_dir / 'manifest.json').exists():
+            print(f"⚠️ {library}: manifest.json não encontrado")
+            continue
+        results = analyze_library(library_dir, args.target_lufs, args.ceiling_db, args.workers)
+        report[library] = results
+        lufs = [r['loudness']['integratedLufs'] for r in results.values() if r['loudness']['integratedLufs'] is not None]
+        if lufs:
+            print(f"📁 {library}: {len(results)} arquivos, loudness {min(lufs):.1f} a {max(lufs):.1f} LUFS")
+        else:
+            print(f"📁 {library}: {len(results)} arquivos")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📄 Relatório salvo em: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Aumento de dados offline para prepare_training_data.py.
+
+Gera variantes dos segmentos do GuitarSet (pitch shift com transposição do
+rótulo, time stretch, ganho e ruído), extrai as mesmas features dos segmentos
+originais e guarda o resultado em cache por (hash da fonte, parâmetros), então
+experimentos repetidos reaproveitam as variantes já calculadas. O trabalho é
+agrupado por gravação (cada arquivo é decodificado uma vez) e distribuído em um
+pool de processos; as features voltam por memória compartilhada
+(shared_results.py). Um orçamento por época decide quantas variantes entram nos
+dados de treinamento.
+"""
+import hashlib
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from dataset_shards import stable_hash
+from music_notes import PITCH_CLASSES, parse_pitch_class
+from sample_manifest import content_hash
+
+CACHE_DIR = Path('datasets/cache/augment')
+
+# Grade padrão de transformações (além do pitch shift de ±max_shift semitons)
+STRETCH_RATES = (0.9, 0.95, 1.05, 1.1)
+GAINS_DB = (-12, -6, 6)
+NOISE_SNR_DB = (15, 25, 35)
+
+
+def transpose_chord(chord: str, semitones: int) -> str:
+    """Transpõe o rótulo: ('C#m', 2) -> 'D#m'; 'no_chord' não muda"""
+    root_pc = parse_pitch_class(chord)
+    if root_pc is None:
+        return chord
+    root_length = 2 if len(chord) > 1 and chord[1] == '#' else 1
+    return PITCH_CLASSES[(root_pc + semitones) % 12] + chord[root_length:]
+
+
+def variant_grid(max_shift: int = 2) -> List[Dict]:
+    """Todas as variantes candidatas de um segmento"""
+    variants = [{'kind': 'pitch', 'value': s} for s in range(-max_shift, max_shift + 1) if s]
+    variants += [{'kind': 'stretch', 'value': r} for r in STRETCH_RATES]
+    variants += [{'kind': 'gain', 'value': g} for g in GAINS_DB]
+    variants += [{'kind': 'noise', 'value': n} for n in NOISE_SNR_DB]
+    return variants
+
+
+def params_key(variant: Dict) -> str:
+    return f"{variant['kind']}{variant['value']:+g}"
+
+
+def select_variants(segments: List[Dict], grid: List[Dict], budget: float, seed: int, epoch: int) -> List[List[Dict]]:
+    """
+    Sorteia as variantes da época: budget variantes por segmento em média, sem
+    repetição. O sorteio de cada segmento depende só de (seed, epoch, arquivo,
+    tempo), então o resultado é o mesmo com ou sem particionamento em shards.
+    """
+    whole, fraction = int(budget), budget - int(budget)
+    selected = []
+    for segment in segments:
+        key = f"{Path(segment['path']).name}:{segment['time']:.4f}"
+        rng = np.random.default_rng([seed, epoch, stable_hash(key) % 2 ** 32])
+        count = min(whole + int(rng.random() < fraction), len(grid))
+        chosen = np.sort(rng.choice(len(grid), size=count, replace=False))
+        selected.append([grid[i] for i in chosen])
+    return selected
+
+
+def apply_variant(segment: np.ndarray, variant: Dict, source_key: str) -> np.ndarray:
+    """Aplica uma transformação; o ruído é determinístico por (fonte, parâmetros)"""
+    from fill_note_gaps import phase_vocoder_stretch, shift_vocoder
+
+    kind, value = variant['kind'], variant['value']
+    if kind == 'pitch':
+        return shift_vocoder(segment, value)
+    if kind == 'stretch':
+        return phase_vocoder_stretch(segment, value)
+    if kind == 'gain':
+        return np.clip(segment * 10 ** (value / 20), -1.0, 1.0).astype(np.float32)
+    if kind == 'noise':
+        seed = int.from_bytes(hashlib.sha256(f"{source_key}:{params_key(variant)}".encode()).digest()[:8], 'big')
+        noise = np.random.default_rng(seed).standard_normal(len(segment)).astype(np.float32)
+        power = np.mean(segment ** 2) + 1e-12
+        return segment + noise * np.sqrt(power / 10 ** (value / 10))
+    raise ValueError(f"Transformação desconhecida: {kind}")
+
+
+def cache_path(cache_dir: Path, source_key: str, variant: Dict) -> Path:
+    digest = hashlib.sha1(f"{source_key}:{params_key(variant)}".encode()).hexdigest()
+    return cache_dir / digest[:2] / f"{digest}.npy"
+
+
+def augment_recording(job: Dict) -> Dict:
+    """Variantes de todos os segmentos de uma gravação (executado no worker)"""
+    from prepare_training_data import (FEATURE_NAMES, FEATURE_VERSION, TARGET_TIME_STEPS,
+                                       extract_features, fit_time_steps)
+    from shared_results import share_array
+
+    from guitarset_zip import ZipMember, open_input
+
+    cache_dir = Path(job['cache_dir'])
+    sr = job['sample_rate']
+    source = job['file']  # Path ou membro de ZIP (guitarset_zip.py)
+    # Membros de ZIP são identificados pelo CRC-32 e tamanho gravados no arquivo
+    if isinstance(source, ZipMember):
+        file_hash = f"zip{source.info.CRC:08x}{source.info.file_size:x}"
+    else:
+        file_hash = content_hash(source, 16)
+    backend = job['backend']
+    profile = job['profile']
+    audio = None
+
+    features, labels, metadata = [], [], []
+    hits = 0
+    for segment in job['segments']:
+        source_key = f"{file_hash}:{segment['time']:.4f}:{segment['duration']:.4f}:{sr}:{backend}:{profile}:v{FEATURE_VERSION}"
+        for variant in segment['variants']:
+            chord = segment['chord']
+            if variant['kind'] == 'pitch':
+                chord = transpose_chord(chord, variant['value'])
+            if chord not in job['vocab']:
+                continue
+
+            path = cache_path(cache_dir, source_key, variant)
+            if path.exists():
+                fitted = np.load(path)
+                hits += 1
+            else:
+                if audio is None:
+                    if backend == 'numpy':
+                        from feature_backend import load_audio
+                        audio = load_audio(source, sr)
+                    else:
+                        import librosa
+                        with open_input(source) as f:
+                            audio, _ = librosa.load(f, sr=sr, mono=True)
+                start = int(segment['time'] * sr)
+                end = int((segment['time'] + segment['duration']) * sr)
+                augmented = apply_variant(audio[start:end], variant, source_key)
+                fitted = fit_time_steps(extract_features(augmented, sr, backend, profile)).astype(np.float32)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp.npy')
+                np.save(tmp_path, fitted)
+                tmp_path.replace(path)
+
+            features.append(fitted)
+            labels.append(job['vocab'].index(chord))
+            metadata.append({
+                'file': source.name,
+                'chord': chord,
+                'time': segment['time'],
+                'duration': segment['duration'],
+                'augmentation': params_key(variant),
+                'sourceChord': segment['chord'],
+            })
+
+    X = np.array(features, dtype=np.float32).reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES))
+    return {'features': share_array(X), 'labels': labels, 'metadata': metadata, 'cache_hits': hits}
+
+
+def augment_segments(
+    segments: List[Dict],
+    vocab: List[str],
+    budget: float = 1.0,
+    epoch: int = 0,
+    seed: int = 42,
+    max_shift: int = 2,
+    sample_rate: int = 22050,
+    cache_dir=CACHE_DIR,
+    workers: Optional[int] = None,
+    backend: str = 'librosa',
+    profile: str = 'default'
+):
+    """
+    Gera as variantes da época para os segmentos (dicts com file, time,
+    duration e chord, como no metadata de prepare_training_data).
+    Retorna (features, labels, metadata), com features em um único array.
+    """
+    from prepare_training_data import FEATURE_NAMES, TARGET_TIME_STEPS
+    from shared_results import SharedArrays, discard_futures
+
+    selected = select_variants(segments, variant_grid(max_shift), budget, seed, epoch)
+
+    by_file = defaultdict(list)
+    paths = {}
+    for segment, variants in zip(segments, selected):
+        if variants:
+            paths[str(segment['path'])] = segment['path']
+            by_file[str(segment['path'])].append({
+                'time': segment['time'],
+                'duration': segment['duration'],
+                'chord': segment['chord'],
+                'variants': variants,
+            })
+    jobs = [
+        {'file': paths[file], 'segments': file_segments, 'vocab': vocab,
+         'sample_rate': sample_rate, 'cache_dir': str(cache_dir),
+         'backend': backend, 'profile': profile}
+        for file, file_segments in by_file.items()
+    ]
+
+    blocks, labels, metadata = [], [], []
+    hits = 0
+    shared = SharedArrays()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = deque(pool.submit(augment_recording, job) for job in jobs)
+            try:
+                while futures:
+                    result = futures.popleft().result()
+                    blocks.append(shared.view(result['features']))
+                    labels.extend(result['labels'])
+                    metadata.extend(result['metadata'])
+                    hits += result['cache_hits']
+            finally:
+                # Erro no meio: resultados que não chegaram a ser anexados também saem de /dev/shm
+                discard_futures(futures)
+        # Uma cópia de cada bloco direto para o array final
+        features = np.empty((len(labels), TARGET_TIME_STEPS, len(FEATURE_NAMES)), dtype=np.float32)
+        if blocks:
+            np.concatenate(blocks, out=features)
+    finally:
+        # Views só na lista: sem elas os blocos podem ser desmapeados
+        blocks.clear()
+        shared.release()
+
+    print(f"   🔁 {len(features)} variantes ({hits} do cache) de {len(jobs)} gravações")
+    return features, labels, metadata
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Empacota bibliotecas de samples em sprites de áudio
+===================================================
+
+Junta todos os samples de uma biblioteca (ou de um grupo: lição, família de acordes)
+em um único arquivo, com intervalos de silêncio alinhados aos frames do codec,
+e escreve um manifest com offsets e durações. O cliente baixa e decodifica a
+biblioteca inteira com uma única requisição.
+
+Agrupamento:
+- all: um sprite por biblioteca (padrão)
+- family: um sprite por família de acorde (maj, m, 7, m7, dim...) ou oitava (notas)
+- arquivo JSON ({"licao-1": ["C", "G", "Am"], ...}) via --groups-file
+
+Uso:
+python build_audio_sprites.py --library chords --group-by family
+python build_audio_sprites.py --library chords --groups-file lessons.json
+"""
+
+import argparse
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from sample_manifest import SAMPLES_DIR, content_hash, library_files, load_manifest, save_manifest
+
+# Tamanho do frame do codec (amostras) usado para alinhar o início de cada sample
+CODEC_FRAMES = {
+    'opus': 960,   # 20 ms a 48 kHz
+    'aac': 1024,
+    'wav': 1,
+}
+
+ROOT_PATTERN = re.compile(r'^[A-G](?:#|b|sharp)?')
+
+
+def sample_family(name: str) -> str:
+    """Família do sample a partir do nome (sufixo após a tônica): 'A#m7' -> 'm7', 'C' -> 'maj'"""
+    suffix = ROOT_PATTERN.sub('', name, count=1)
+    return suffix or 'maj'
+
+
+def load_mono(path: Path, sample_rate: int) -> np.ndarray:
+    """Carrega um sample em mono float32 na taxa pedida"""
+    audio, sr = sf.read(str(path), dtype='float32', always_2d=True)
+    audio = audio.mean(axis=1)
+    if sr != sample_rate:
+        from math import gcd
+        from scipy.signal import resample_poly
+        g = gcd(sr, sample_rate)
+        audio = resample_poly(audio, sample_rate // g, sr // g).astype(np.float32)
+    return audio
+
+
+def aligned(n: int, frame: int) -> int:
+    """Arredonda n para cima até um múltiplo do frame"""
+    return -(-n // frame) * frame
+
+
+def pack_sprite(samples: Dict[str, np.ndarray], sample_rate: int, frame: int, gap_ms: float):
+    """
+    Concatena os samples em um buffer único. Cada sample começa em um múltiplo
+    do frame do codec, com pelo menos gap_ms de silêncio entre eles.
+    Retorna (buffer, {nome: {start, duration}}).
+    """
+    gap = int(gap_ms / 1000 * sample_rate)
+    offsets = {}
+    pos = 0
+    for name, audio in samples.items():
+        offsets[name] = (pos, len(audio))
+        pos = aligned(pos + len(audio) + gap, frame)
+
+    buffer = np.zeros(pos, dtype=np.float32)
+    layout = {}
+    for name, (start, length) in offsets.items():
+        buffer[start:start + length] = samples[name]
+        layout[name] = {
+            'start': start / sample_rate,
+            'duration': length / sample_rate,
+            'startSample': start,
+            'lengthSamples': length,
+        }
+    return buffer, layout
+
+
+def group_samples(names: List[str], group_by: str, groups_file: Optional[str]) -> Dict[str, List[str]]:
+    if groups_file:
+        with open(groups_file, encoding='utf-8') as f:
+            groups = json.load(f)
+        return {group: [n for n in members if n in names] for group, members in groups.items()}
+    if group_by == 'family':
+        groups = {}
+        for name in names:
+            groups.setdefault(sample_family(name), []).append(name)
+        return groups
+    return {'all': list(names)}
+
+
+def build_library_sprites(
+    library_dir,
+    output_dir=None,
+    fmt: str = 'opus',
+    group_by: str = 'all',
+    groups_file: Optional[str] = None,
+    sample_rate: int = 48000,
+    gap_ms: float = 50.0
+) -> Dict:
+    """Gera os sprites de uma biblioteca e o sprites.json com offsets/durações"""
+    from build_sample_assets import transcode
+
+    library_dir = Path(library_dir)
+    output_dir = Path(output_dir) if output_dir else library_dir / 'sprites'
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if fmt != 'wav' and not shutil.which('ffmpeg'):
+        raise RuntimeError("ffmpeg não encontrado no PATH (necessário para opus/aac)")
+
+    manifest = load_manifest(library_dir / 'manifest.json')
+    files = library_files(library_dir)
+    if manifest:
+        sources = {name: files[e['file']] for name, e in manifest.items() if e.get('file') in files}
+    else:
+        sources = {p.stem: p for p in files.values()}
+
+    # Cada arquivo é decodificado uma única vez, mesmo com vários aliases
+    decoded = {}
+    for path in set(sources.values()):
+        decoded[path] = load_mono(path, sample_rate)
+
+    sprites = {}
+    for group, names in group_samples(sorted(sources), group_by, groups_file).items():
+        if not names:
+            continue
+        buffer, layout = pack_sprite(
+            {name: decoded[sources[name]] for name in names},
+            sample_rate, CODEC_FRAMES[fmt], gap_ms
+        )
+
+        wav_path = output_dir / f".{group}.sprite.wav"
+        sf.write(str(wav_path), buffer, sample_rate, subtype='PCM_16')
+        ext = '.m4a' if fmt == 'aac' else f".{fmt}"
+        tmp_path = output_dir / f".{group}.sprite.tmp{ext}"
+        transcode(wav_path, tmp_path, fmt)
+        wav_path.unlink()
+
+        sprite_name = f"{group}.{content_hash(tmp_path)}{ext}"
+        tmp_path.replace(output_dir / sprite_name)
+
+        sprites[group] = {
+            'file': sprite_name,
+            'sampleRate': sample_rate,
+            'duration': len(buffer) / sample_rate,
+            'bytes': (output_dir / sprite_name).stat().st_size,
+            'samples': layout,
+        }
+        print(f"  🎞️ {group}: {len(names)} samples -> {sprite_name}")
+
+    sprite_manifest = {'format': fmt, 'frameSize': CODEC_FRAMES[fmt], 'sprites': sprites}
+    save_manifest(output_dir / 'sprites.json', sprite_manifest)
+    return sprite_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Empacota samples em sprites de áudio')
+    parser.add_argument('--library', default='chords',
+                        help='Biblioteca em client/public/samples (chords, notes)')
+    parser.add_argument('--samples-dir', default=str(SAMPLES_DIR),
+                        help='Diretório das bibliotecas')
+    parser.add_argument('--output-dir', default=None,
+                        help='Saída (padrão: <biblioteca>/sprites)')
+    parser.add_argument('--format', choices=sorted(CODEC_FRAMES), default='opus',
+                        help='Codec do sprite')
+    parser.add_argument('--group-by', choices=['all', 'family'], default='all',
+                        help='Agrupamento dos samples')
+    parser.add_argument('--groups-file', default=None,
+                        help='JSON com grupos explícitos (ex.: por lição)')
+    parser.add_argument('--sample-rate', type=int, default=48000,
+                        help='Taxa de amostragem do sprite')
+    parser.add_argument('--gap-ms', type=float, default=50.0,
+                        help='Silêncio mínimo entre samples (ms)')
+    args = parser.parse_args()
+
+    library_dir = Path(args.samples_dir) / args.library
+    print(f"🎞️ Gerando sprites de {library_dir}...")
+    manifest = build_library_sprites(
+        library_dir,
+        args.output_dir,
+        fmt=args.format,
+        group_by=args.group_by,
+        groups_file=args.groups_file,
+        sample_rate=args.sample_rate,
+        gap_ms=args.gap_ms
+    )
+    print(f"✅ {len(manifest['sprites'])} sprites gerados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Build dos assets de áudio do app
+================================
+
+Transcodifica as bibliotecas de samples (chords, notes) para Opus/AAC em paralelo,
+mantém WAV quando necessário, gera nomes com hash de conteúdo para cache imutável
+e escreve manifests com duração real, tamanho em bytes e formatos alternativos.
+Arquivos de teste/backup (ex.: A6_test.wav, notes_backup_guitarset) ficam de fora.
+
+O build falha (código de saída 1) com um relatório de tamanho quando o payload
+total excede o orçamento.
+
+Pré-requisitos:
+- ffmpeg no PATH (com libopus)
+- pip install soundfile
+
+Uso:
+python build_sample_assets.py --budget-mb 25
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from sample_manifest import (
+    SAMPLES_DIR,
+    audio_duration,
+    content_hash,
+    entries_by_file,
+    library_files,
+    load_manifest,
+    save_manifest,
+)
+
+# Codecs de saída: extensão e argumentos do ffmpeg
+FORMATS = {
+    'opus': {'ext': '.opus', 'args': ['-c:a', 'libopus', '-b:a', '96k', '-vbr', 'on']},
+    'aac': {'ext': '.m4a', 'args': ['-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart']},
+    'wav': {'ext': '.wav', 'args': None},  # cópia sem transcodificação
+}
+
+DEFAULT_LIBRARIES = ['chords', 'notes']
+
+
+def transcode(source: Path, target: Path, fmt: str):
+    """Converte um arquivo para o formato pedido (WAV é copiado)"""
+    args = FORMATS[fmt]['args']
+    if args is None:
+        shutil.copyfile(source, target)
+        return
+    subprocess.run(
+        ['ffmpeg', '-y', '-loglevel', 'error', '-i', str(source), '-vn', *args, str(target)],
+        check=True
+    )
+
+
+def build_file(source: Path, output_dir: Path, formats: List[str]) -> Dict:
+    """Transcodifica um arquivo para todos os formatos e renomeia com hash do conteúdo"""
+    result = {'duration': audio_duration(source), 'formats': {}}
+
+    for fmt in formats:
+        tmp_target = output_dir / f".{source.stem}.tmp{FORMATS[fmt]['ext']}"
+        transcode(source, tmp_target, fmt)
+        hashed_name = f"{source.stem}.{content_hash(tmp_target)}{FORMATS[fmt]['ext']}"
+        final_target = output_dir / hashed_name
+        tmp_target.replace(final_target)
+        result['formats'][fmt] = {
+            'file': hashed_name,
+            'bytes': final_target.stat().st_size,
+        }
+
+    return result
+
+
+def build_library(library: str, samples_dir: Path, build_dir: Path, formats: List[str], workers: int) -> Dict:
+    """Gera os assets e o manifest de uma biblioteca"""
+    library_dir = samples_dir / library
+    output_dir = build_dir / library
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    source_manifest = load_manifest(library_dir / 'manifest.json')
+    files = library_files(library_dir)
+
+    # Só publica o que o manifest referencia; sem manifest, publica tudo que for publicável
+    names_by_file = entries_by_file(source_manifest) if source_manifest else {
+        name: [Path(name).stem] for name in files
+    }
+    missing = sorted(f for f in names_by_file if f not in files)
+    skipped = sorted(f for f in files if f not in names_by_file)
+    for file_name in missing:
+        print(f"  ⚠️ {library}: {file_name} está no manifest mas não existe (ou é de teste/backup)")
+    for file_name in skipped:
+        print(f"  ⏭️ {library}: {file_name} não está no manifest, ignorado")
+
+    to_build = [f for f in names_by_file if f in files]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(to_build, pool.map(
+            lambda f: build_file(files[f], output_dir, formats), to_build
+        )))
+
+    manifest = {}
+    for file_name, result in results.items():
+        default = result['formats'][formats[0]]
+        for name in names_by_file[file_name]:
+            entry = dict(source_manifest.get(name, {}))
+            entry.update({
+                'file': default['file'],
+                'duration': result['duration'],
+                'bytes': default['bytes'],
+                'formats': result['formats'],
+            })
+            manifest[name] = entry
+
+    save_manifest(output_dir / 'manifest.json', manifest)
+    return {'files': results, 'manifest': manifest}
+
+
+def size_report(libraries: Dict[str, Dict], formats: List[str]) -> int:
+    """Imprime o relatório de tamanho e retorna o payload total (formato padrão) em bytes"""
+    total = 0
+    print("\n📦 Relatório de tamanho (formato padrão: %s)" % formats[0])
+    for library, built in libraries.items():
+        sizes = sorted(
+            ((f, r['formats'][formats[0]]['bytes']) for f, r in built['files'].items()),
+            key=lambda x: -x[1]
+        )
+        library_total = sum(size for _, size in sizes)
+        total += library_total
+        print(f"   {library}: {len(sizes)} arquivos, {library_total / (1024 * 1024):.2f} MB")
+        for file_name, size in sizes[:5]:
+            print(f"      {file_name}: {size / 1024:.1f} KB")
+        for fmt in formats[1:]:
+            fmt_total = sum(r['formats'][fmt]['bytes'] for r in built['files'].values())
+            print(f"      (alternativa {fmt}: {fmt_total / (1024 * 1024):.2f} MB)")
+    print(f"   Total: {total / (1024 * 1024):.2f} MB")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build dos assets de samples (transcode + hash + manifest)')
+    parser.add_argument('--samples-dir', default=str(SAMPLES_DIR),
+                        help='Diretório com as bibliotecas de samples')
+    parser.add_argument('--build-dir', default=str(SAMPLES_DIR.parent / 'samples-build'),
+                        help='Diretório de saída dos assets publicados')
+    parser.add_argument('--libraries', nargs='+', default=DEFAULT_LIBRARIES,
+                        help='Bibliotecas para processar')
+    parser.add_argument('--formats', nargs='+', default=['opus', 'aac', 'wav'], choices=sorted(FORMATS),
+                        help='Formatos de saída (o primeiro é o padrão do manifest)')
+    parser.add_argument('--budget-mb', type=float, default=None,
+                        help='Orçamento do payload no formato padrão (MB); excedido = build falha')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Número de transcodificações em paralelo')
+    args = parser.parse_args()
+
+    if any(FORMATS[f]['args'] for f in args.formats) and not shutil.which('ffmpeg'):
+        print("❌ ffmpeg não encontrado no PATH")
+        sys.exit(1)
+
+    samples_dir = Path(args.samples_dir)
+    build_dir = Path(args.build_dir)
+
+    print("🎧 MusicTutor - Build de Assets de Áudio")
+    print("=" * 45)
+
+    built = {}
+    for library in args.libraries:
+        print(f"📁 {library}...")
+        built[library] = build_library(library, samples_dir, build_dir, args.formats, args.workers)
+        print(f"  ✅ {len(built[library]['files'])} arquivos, {len(built[library]['manifest'])} entradas")
+
+    total = size_report(built, args.formats)
+
+    if args.budget_mb is not None and total > args.budget_mb * 1024 * 1024:
+        print(f"\n❌ Payload de {total / (1024 * 1024):.2f} MB excede o orçamento de {args.budget_mb:.2f} MB")
+        sys.exit(1)
+
+    print(f"\n✅ Assets gerados em: {build_dir}")
+
+
+if __name__ == "__main__":
+    main()
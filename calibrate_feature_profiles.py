@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Calibração dos perfis de features
+=================================
+
+Prepara o GuitarSet com cada perfil de FEATURE_PROFILES (ex.: default a
+22050 Hz e fast a 11025 Hz), treina o mesmo modelo com a mesma divisão de dados
+e compara acurácia e custo de preparação. O relatório mostra quanto de acurácia
+cada perfil perde em relação ao default, para decidir se o perfil rápido pode
+ser usado.
+
+Uso:
+python calibrate_feature_profiles.py --profiles default fast --epochs 15
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from prepare_training_data import FEATURE_PROFILES, process_guitarset_dataset
+
+
+def train_and_evaluate(X, y, num_classes: int, epochs: int, batch_size: int, model_dir: Path, seed: int = 42):
+    """Treina e avalia o ChordDetectionModel com uma divisão fixa (70/15/15)"""
+    from sklearn.model_selection import train_test_split
+    from train_model import ChordDetectionModel
+
+    X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.3, random_state=seed)
+    X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=seed)
+
+    model = ChordDetectionModel(X.shape[1:], num_classes)
+    model.build_model()
+    model.train(X_train, y_train, X_val, y_val, epochs=epochs, batch_size=batch_size, save_path=str(model_dir))
+    results = model.evaluate(X_test, y_test)
+    return {
+        'accuracy': float(results['accuracy']),
+        'top3_accuracy': float(results['top3_accuracy']),
+        'loss': float(results['loss']),
+        'test_samples': int(len(X_test)),
+    }
+
+
+def calibrate(audio_dir, annot_dir, profiles, output_dir, backend: str = 'librosa',
+              epochs: int = 15, batch_size: int = 32) -> dict:
+    output_dir = Path(output_dir)
+    report = {'backend': backend, 'epochs': epochs, 'profiles': {}}
+
+    for profile in profiles:
+        print(f"\n🎛️ Perfil {profile}: {FEATURE_PROFILES[profile]}")
+        data_file = output_dir / f"training_data_{profile}.npz"
+
+        started = time.perf_counter()
+        X, y, chord_vocab = process_guitarset_dataset(
+            audio_dir, annot_dir, data_file, backend=backend, profile=profile
+        )
+        prepare_seconds = time.perf_counter() - started
+
+        metrics = train_and_evaluate(X, y, len(chord_vocab), epochs, batch_size, output_dir / 'models' / profile)
+        report['profiles'][profile] = {
+            **FEATURE_PROFILES[profile],
+            **metrics,
+            'samples': int(len(X)),
+            'prepare_seconds': round(prepare_seconds, 1),
+            'seconds_per_segment': round(prepare_seconds / max(len(X), 1), 4),
+            'dataset_mb': round(data_file.stat().st_size / (1024 * 1024), 2),
+        }
+
+    # Diferenças em relação ao primeiro perfil (referência)
+    baseline = report['profiles'][profiles[0]]
+    for result in report['profiles'].values():
+        result['accuracy_delta'] = round(result['accuracy'] - baseline['accuracy'], 4)
+        result['speedup'] = round(baseline['prepare_seconds'] / max(result['prepare_seconds'], 1e-9), 2)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara acurácia e custo dos perfis de features')
+    parser.add_argument('--audio-dir', default='datasets/audio_mono-mic',
+                        help='Diretório com arquivos de áudio')
+    parser.add_argument('--annot-dir', default='datasets/annotations',
+                        help='Diretório com anotações JAMS')
+    parser.add_argument('--profiles', nargs='+', choices=sorted(FEATURE_PROFILES), default=['default', 'fast'],
+                        help='Perfis a comparar (o primeiro é a referência)')
+    parser.add_argument('--backend', choices=['librosa', 'numpy'], default='librosa',
+                        help='Backend de features')
+    parser.add_argument('--epochs', type=int, default=15,
+                        help='Epochs de treinamento por perfil')
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='Tamanho do batch')
+    parser.add_argument('--output-dir', default='datasets/processed/calibration',
+                        help='Diretório para dados, modelos e relatório')
+    args = parser.parse_args()
+
+    report = calibrate(args.audio_dir, args.annot_dir, args.profiles, args.output_dir,
+                       args.backend, args.epochs, args.batch_size)
+
+    report_path = Path(args.output_dir) / 'profile_calibration.json'
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n📊 Calibração dos perfis:")
+    print(f"   {'perfil':<10} {'Hz':>6} {'acurácia':>9} {'Δ':>8} {'top-3':>7} {'s/segm.':>8} {'aceleração':>10}")
+    for profile, result in report['profiles'].items():
+        print(f"   {profile:<10} {result['sample_rate']:>6} {result['accuracy'] * 100:>8.2f}% "
+              f"{result['accuracy_delta'] * 100:>+7.2f}% {result['top3_accuracy'] * 100:>6.1f}% "
+              f"{result['seconds_per_segment']:>8.4f} {result['speedup']:>9.2f}x")
+    print(f"\n💾 Relatório salvo em {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Gera variantes compactas dos perfis de acordes para o GuitarSetAITrainingService.
+
+A partir de features_by_chord.json e ai_training_prompts.json produz:
+- features_by_chord.bin: perfis em Float32/Float16 little-endian, um bloco por acorde
+- features_by_chord.index.json: layout das features e offsets de cada acorde no .bin
+- chords/<acorde>.json: um arquivo por acorde (perfil + prompt) com precisão limitada
+- cópias pré-comprimidas .gz e .br (brotli, se instalado) de cada arquivo
+
+Uso:
+python chord_profile_assets.py --training-dir client/public/training_data
+"""
+
+import argparse
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Ordem fixa das features no bloco binário de cada acorde
+PROFILE_LAYOUT = [
+    ('chroma', 12),
+    ('mfcc', 13),
+    ('tonnetz', 6),
+    ('spectral_centroid', 1),
+    ('spectral_rolloff', 1),
+    ('zero_crossing_rate', 1),
+    ('rms', 1),
+    ('duration', 1),
+]
+
+DTYPES = {
+    'float32': '<f4',
+    'float16': '<f2',
+}
+
+
+def chord_file_name(chord: str) -> str:
+    """Nome de arquivo seguro para URLs (mesma convenção dos samples: A# -> Asharp)"""
+    return chord.replace('#', 'sharp')
+
+
+def profile_from_features(features) -> Dict:
+    """Aceita um perfil único ou uma lista de features (formato antigo) e devolve a média"""
+    if isinstance(features, dict):
+        return features
+    if not features:
+        return {}
+    profile = {}
+    for name, _ in PROFILE_LAYOUT:
+        values = [f[name] for f in features if name in f]
+        if values:
+            mean = np.mean(np.asarray(values, dtype=np.float64), axis=0)
+            profile[name] = mean.tolist() if mean.ndim else float(mean)
+    return profile
+
+
+def profile_to_vector(profile: Dict) -> np.ndarray:
+    """Achata o perfil de um acorde segundo PROFILE_LAYOUT (features ausentes viram 0)"""
+    vector = np.zeros(sum(length for _, length in PROFILE_LAYOUT), dtype=np.float64)
+    pos = 0
+    for name, length in PROFILE_LAYOUT:
+        value = profile.get(name)
+        if value is not None:
+            vector[pos:pos + length] = np.asarray(value, dtype=np.float64).reshape(-1)[:length]
+        pos += length
+    return vector
+
+
+def round_values(value, precision: int):
+    """Arredonda recursivamente floats de um objeto JSON"""
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, list):
+        return [round_values(v, precision) for v in value]
+    if isinstance(value, dict):
+        return {k: round_values(v, precision) for k, v in value.items()}
+    return value
+
+
+def precompress(path: Path) -> List[Path]:
+    """Grava cópias .gz e .br ao lado do arquivo"""
+    data = path.read_bytes()
+    written = []
+
+    gz_path = path.with_name(path.name + '.gz')
+    gz_path.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(gz_path)
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        br_path = path.with_name(path.name + '.br')
+        br_path.write_bytes(brotli.compress(data, quality=11))
+        written.append(br_path)
+
+    return written
+
+
+def write_chord_profile_assets(
+    features_by_chord: Dict,
+    examples: Optional[List[Dict]],
+    output_dir,
+    dtype: str = 'float32',
+    precision: int = 4,
+    compress: bool = True
+) -> Dict:
+    """Escreve o binário, o índice e os arquivos por acorde; retorna o índice"""
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype inválido: {dtype} (use {', '.join(DTYPES)})")
+
+    output_dir = Path(output_dir)
+    chords_dir = output_dir / 'chords'
+    chords_dir.mkdir(parents=True, exist_ok=True)
+
+    examples_by_chord = {e['chord']: e for e in (examples or [])}
+    chords = sorted(features_by_chord.keys())
+    profiles = {chord: profile_from_features(features_by_chord[chord]) for chord in chords}
+
+    # Binário: um bloco contíguo por acorde
+    matrix = np.stack([profile_to_vector(profiles[c]) for c in chords]) if chords else np.zeros((0, 0))
+    matrix = matrix.astype(DTYPES[dtype])
+    bin_path = output_dir / 'features_by_chord.bin'
+    bin_path.write_bytes(matrix.tobytes())
+
+    vector_length = matrix.shape[1] if chords else 0
+    bytes_per_chord = vector_length * matrix.dtype.itemsize
+    index = {
+        'file': bin_path.name,
+        'dtype': dtype,
+        'endianness': 'little',
+        'vector_length': vector_length,
+        'layout': [{'name': name, 'length': length} for name, length in PROFILE_LAYOUT],
+        'chords': {},
+    }
+
+    for i, chord in enumerate(chords):
+        file_name = f"{chord_file_name(chord)}.json"
+        entry = {
+            'profile': round_values(profiles[chord], precision),
+        }
+        if chord in examples_by_chord:
+            entry['example'] = round_values(examples_by_chord[chord], precision)
+
+        chord_path = chords_dir / file_name
+        with open(chord_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+        if compress:
+            precompress(chord_path)
+
+        index['chords'][chord] = {
+            'offset': i * bytes_per_chord,
+            'length': bytes_per_chord,
+            'file': f"chords/{file_name}",
+        }
+
+    index_path = output_dir / 'features_by_chord.index.json'
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    if compress:
+        precompress(bin_path)
+        precompress(index_path)
+
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera perfis compactos de acordes para o app')
+    parser.add_argument('--training-dir', default='client/public/training_data',
+                        help='Diretório com features/ e metadata/')
+    parser.add_argument('--dtype', choices=sorted(DTYPES), default='float32',
+                        help='Tipo dos valores no binário')
+    parser.add_argument('--precision', type=int, default=4,
+                        help='Casas decimais nos arquivos por acorde')
+    parser.add_argument('--no-compress', action='store_true',
+                        help='Não gerar cópias .gz/.br')
+    args = parser.parse_args()
+
+    training_dir = Path(args.training_dir)
+    features_file = training_dir / 'features' / 'features_by_chord.json'
+    prompts_file = training_dir / 'metadata' / 'ai_training_prompts.json'
+
+    if not features_file.exists():
+        print(f"[ERRO] Arquivo não encontrado: {features_file}")
+        return
+
+    with open(features_file, encoding='utf-8') as f:
+        features_by_chord = json.load(f)
+
+    examples = None
+    if prompts_file.exists():
+        with open(prompts_file, encoding='utf-8') as f:
+            examples = json.load(f).get('examples', [])
+
+    index = write_chord_profile_assets(
+        features_by_chord,
+        examples,
+        features_file.parent,
+        dtype=args.dtype,
+        precision=args.precision,
+        compress=not args.no_compress
+    )
+
+    print(f"[OK] {len(index['chords'])} perfis de acordes gerados em {features_file.parent}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Estatísticas incrementais por acorde (Welford) para o GuitarSetTrainer.
+Permite gerar perfis e prompts em uma única passada, com memória O(acordes).
+"""
+import numpy as np
+from typing import Dict, List, Optional
+
+# Features vetoriais (média ao longo do tempo) e escalares extraídas por
+# GuitarSetTrainer.extract_audio_features
+VECTOR_FEATURES = ('chroma', 'mfcc', 'tonnetz')
+SCALAR_FEATURES = (
+    'spectral_centroid', 'spectral_rolloff', 'zero_crossing_rate', 'rms', 'duration'
+)
+
+
+class RunningStats:
+    """Média, variância, mínimo e máximo incrementais (algoritmo de Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+
+    def update(self, value):
+        x = np.asarray(value, dtype=np.float64)
+        if self.count == 0:
+            self.mean = np.zeros_like(x)
+            self.m2 = np.zeros_like(x)
+            self.min = x.copy()
+            self.max = x.copy()
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+
+    def update_batch(self, values):
+        """Atualiza com várias observações de uma vez (linhas de values)."""
+        x = np.asarray(values, dtype=np.float64)
+        if len(x) == 0:
+            return
+        batch = RunningStats()
+        batch.count = len(x)
+        batch.mean = x.mean(axis=0)
+        batch.m2 = ((x - batch.mean) ** 2).sum(axis=0)
+        batch.min = x.min(axis=0)
+        batch.max = x.max(axis=0)
+        self.merge(batch)
+
+    def merge(self, other: 'RunningStats'):
+        """Combina outra instância (fórmula paralela de Chan)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.min = other.min.copy()
+            self.max = other.max.copy()
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.count = total
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+
+    @property
+    def variance(self):
+        """Variância populacional (equivalente a np.var / np.std com ddof=0)."""
+        if self.count == 0:
+            return None
+        return self.m2 / self.count
+
+    @property
+    def std(self):
+        if self.count == 0:
+            return None
+        return np.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        def plain(arr):
+            return arr.tolist() if arr is not None else None
+
+        return {
+            'count': self.count,
+            'mean': plain(self.mean),
+            'std': plain(self.std),
+            'min': plain(self.min),
+            'max': plain(self.max),
+        }
+
+
+class ChordStatsAggregator:
+    """Agrega features de samples por acorde sem manter os samples em memória."""
+
+    def __init__(self, features=VECTOR_FEATURES + SCALAR_FEATURES):
+        self.features = tuple(features)
+        self._stats: Dict[str, Dict[str, RunningStats]] = {}
+
+    def update(self, chord: str, features: Dict):
+        """Atualiza as estatísticas do acorde com as features de um sample."""
+        chord_stats = self._stats.get(chord)
+        if chord_stats is None:
+            chord_stats = {name: RunningStats() for name in self.features}
+            self._stats[chord] = chord_stats
+        for name in self.features:
+            if name in features and features[name] is not None:
+                chord_stats[name].update(features[name])
+
+    def merge(self, other: 'ChordStatsAggregator'):
+        for chord, other_stats in other._stats.items():
+            chord_stats = self._stats.setdefault(
+                chord, {name: RunningStats() for name in self.features}
+            )
+            for name, stats in other_stats.items():
+                chord_stats.setdefault(name, RunningStats()).merge(stats)
+
+    def chords(self) -> List[str]:
+        return list(self._stats.keys())
+
+    def count(self, chord: str) -> int:
+        chord_stats = self._stats.get(chord)
+        if not chord_stats:
+            return 0
+        return max(stats.count for stats in chord_stats.values())
+
+    def stats(self, chord: str, feature: str) -> Optional[RunningStats]:
+        return self._stats.get(chord, {}).get(feature)
+
+    def mean(self, chord: str) -> Dict:
+        """Features médias do acorde (mesmo formato de calculate_average_features)."""
+        avg = {}
+        for name, stats in self._stats.get(chord, {}).items():
+            if stats.count == 0:
+                continue
+            avg[name] = stats.mean.tolist() if name in VECTOR_FEATURES else float(stats.mean)
+        return avg
+
+    def std(self, chord: str, feature: str):
+        stats = self.stats(chord, feature)
+        return stats.std if stats is not None else None
+
+    def to_dict(self) -> Dict:
+        """Resumo serializável: contagem e estatísticas por feature para cada acorde."""
+        return {
+            chord: {
+                'count': self.count(chord),
+                'features': {name: stats.to_dict() for name, stats in chord_stats.items()},
+            }
+            for chord, chord_stats in self._stats.items()
+        }
+
+    @classmethod
+    def from_samples(cls, samples: List[Dict]) -> 'ChordStatsAggregator':
+        aggregator = cls()
+        for sample in samples:
+            aggregator.update(sample['chord'], sample['features'])
+        return aggregator
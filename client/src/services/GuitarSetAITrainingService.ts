@@ -12,6 +12,7 @@ export interface ChordFeatures {
   zero_crossing_rate: number;
   rms: number;
   duration: number;
+  sampleCount?: number; // samples resumidos quando a entrada já é um perfil médio
 }
 
 export interface TrainingData {
@@ -79,7 +80,8 @@ class GuitarSetAITrainingService {
             this.chordProfiles.set(chord, {
               chord,
               averageFeatures: avgFeatures,
-              sampleCount: features.length,
+              // Perfil médio único (train_ai_with_guitarset.py) traz a contagem real
+              sampleCount: features[0]?.sampleCount ?? features.length,
               typicalCharacteristics: {
                 duration: avgFeatures.duration,
                 rms: avgFeatures.rms,
@@ -1,18 +1,36 @@
 """
-Script para converter arquivos MIDI do diretório 'Gimme All Your Chords' para MP3
-e copiar para client/public/samples/chords/ com os nomes corretos.
+Renderiza os arquivos MIDI de acordes para áudio e copia para
+client/public/samples/chords/ com os nomes corretos.
+
+Todos os .mid do diretório são renderizados (inclusive 6, 9, maj7, 7+, sus, aug, dim...)
+em um pool de processos, com um sintetizador FluidSynth por worker. O áudio é
+codificado em memória (sem WAV temporário) e arquivos cujo MIDI, soundfont e
+parâmetros não mudaram são pulados (hash de conteúdo em
+datasets/cache/render_cache.json, fora dos arquivos públicos do app). "7+" nos
+MIDIs é sétima aumentada (A7+ = A C# F G, 7#5), não maj7: vira A7aug, com
+arquivo próprio. Quando dois MIDIs resultam no mesmo arquivo de saída (ex.:
+"C .mid" e "C.mid"), vence o que já tem a grafia canônica; entre aliases, o
+primeiro em ordem alfabética. A escolha não depende da ordem do sistema de arquivos.
 
 REQUISITOS:
-- pip install midi2audio
-- FluidSynth instalado no sistema (para Windows: baixar de https://www.fluidsynth.org/)
+- pip install pyfluidsynth soundfile numpy
+- FluidSynth (libfluidsynth) e um soundfont .sf2
 
 USO:
-python convert_midi_to_mp3.py
+python convert_midi_to_mp3.py --soundfont /usr/share/sounds/sf2/FluidR3_GM.sf2
+python convert_midi_to_mp3.py --midi-dir client/public/midi/chords --format ogg --workers 8
 """
 
+import argparse
+import hashlib
+import io
+import json
 import os
-import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict
+
+from midi_file import read_midi_notes
 
 # Mapeamento de nomes de acordes MIDI para nomes esperados pelo ChordPlayer
 CHORD_NAME_MAPPING = {
@@ -60,6 +78,16 @@ CHORD_NAME_MAPPING = {
     'A#7': 'A#7',
 }
 
+# Sufixos das variações estendidas -> sufixo usado nos arquivos de samples
+EXTENDED_SUFFIXES = {
+    'min': 'm',
+    'min6': 'm6',
+    'min7': 'm7',
+    'Maj7': 'maj7',
+    '7+': '7aug',  # sétima aumentada (7#5): A7+ = A C# F G
+    'mMaj7': 'minMaj7',
+}
+
 def normalize_chord_name(midi_name: str) -> str:
     """Normaliza nome do acorde do MIDI para o formato esperado pelo ChordPlayer"""
     # Remove extensão
@@ -69,81 +97,212 @@ def normalize_chord_name(midi_name: str) -> str:
     if name in CHORD_NAME_MAPPING:
         return CHORD_NAME_MAPPING[name]
     
+    # Variações estendidas (Amin6 -> Am6, AMaj7 -> Amaj7, A7+ -> A7aug, AmMaj7 -> AminMaj7)
+    root_length = 2 if len(name) > 1 and name[1] == '#' else 1
+    root, suffix = name[:root_length], name[root_length:]
+    if suffix in EXTENDED_SUFFIXES:
+        return root + EXTENDED_SUFFIXES[suffix]
+    
     # Fallback: retorna o nome original (pode precisar ajuste manual)
     return name
 
-def convert_midi_to_mp3(midi_path: Path, output_path: Path):
-    """Converte um arquivo MIDI para MP3 usando midi2audio"""
+def output_file_name(chord_name: str, extension: str) -> str:
+    """Nome do arquivo de saída (mesma convenção dos samples: A# -> Asharp)"""
+    return f"{chord_name.replace('#', 'sharp')}.{extension}"
+
+# Estado por worker: um sintetizador carregado uma única vez
+_synth = None
+_sfid = None
+
+def _init_worker(soundfont: str, sample_rate: int, program: int):
+    global _synth, _sfid
+    import fluidsynth
+    
+    _synth = fluidsynth.Synth(samplerate=float(sample_rate))
+    _sfid = _synth.sfload(soundfont)
+    for channel in range(16):
+        _synth.program_select(channel, _sfid, 0, program)
+
+def render_midi(midi_path: str, sample_rate: int, tail: float):
+    """Renderiza um MIDI com o sintetizador do worker; retorna array (amostras, 2) float32"""
+    import numpy as np
+    
+    notes = read_midi_notes(midi_path)
+    events = sorted(
+        [(n.start, 1, n.channel, n.pitch, n.velocity) for n in notes] +
+        [(n.end, 0, n.channel, n.pitch, 0) for n in notes]
+    )
+    
+    chunks = []
+    position = 0
+    for time, is_on, channel, pitch, velocity in events:
+        frame = int(round(time * sample_rate))
+        if frame > position:
+            chunks.append(_synth.get_samples(frame - position))
+            position = frame
+        if is_on:
+            _synth.noteon(channel, pitch, velocity)
+        else:
+            _synth.noteoff(channel, pitch)
+    chunks.append(_synth.get_samples(int(tail * sample_rate)))
+    
+    # Reset para o próximo arquivo do mesmo worker
+    for channel in range(16):
+        _synth.cc(channel, 123, 0)
+    _synth.get_samples(int(0.5 * sample_rate))
+    
+    audio = np.concatenate(chunks).astype(np.float32).reshape(-1, 2) / 32768.0
+    return audio
+
+def encode(audio, sample_rate: int, fmt: str) -> bytes:
+    """Codifica em memória com soundfile (MP3 requer libsndfile >= 1.1)"""
+    import numpy as np
+    import soundfile as sf
+    
+    peak = float(np.max(np.abs(audio))) if len(audio) else 0.0
+    if peak > 0:
+        audio = audio / peak * 0.8
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=fmt.upper())
+    return buffer.getvalue()
+
+def render_job(job: Dict) -> Dict:
     try:
-        from midi2audio import FluidSynth
-        
-        # Usar soundfont padrão (pode precisar ajuste)
-        fs = FluidSynth()
-        fs.midi_to_audio(str(midi_path), str(output_path))
-        return True
-    except ImportError:
-        print("ERRO: midi2audio não instalado. Execute: pip install midi2audio")
-        return False
+        audio = render_midi(job['midi'], job['sample_rate'], job['tail'])
+        data = encode(audio, job['sample_rate'], job['format'])
+        tmp_path = job['output'] + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, job['output'])
+        return {**job, 'ok': True, 'duration': round(len(audio) / job['sample_rate'], 3)}
     except Exception as e:
-        print(f"ERRO ao converter {midi_path.name}: {e}")
-        return False
+        return {**job, 'ok': False, 'error': str(e)}
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def render_key(midi_path: Path, soundfont_id: str, params: Dict) -> str:
+    """Hash do MIDI + soundfont + parâmetros: se não mudar, o arquivo renderizado é reaproveitado"""
+    digest = hashlib.sha256()
+    digest.update(file_digest(midi_path).encode())
+    digest.update(soundfont_id.encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def source_priority(midi_path: Path, midi_dir: Path):
+    """
+    Ordem de preferência entre MIDIs que geram o mesmo arquivo: primeiro o que
+    já tem a grafia canônica (AMaj7 -> Amaj7), depois aliases (ex.: "C .mid"),
+    e por último o caminho relativo em ordem alfabética
+    """
+    stem = midi_path.stem.strip()
+    is_alias = normalize_chord_name(midi_path.name).lower() != stem.lower()
+    return is_alias, str(midi_path.relative_to(midi_dir))
 
 def main():
-    source_dir = Path(r"C:\Users\Joao\Desktop\Gimme All Your Chords (Vol. 1)\Gimme All Your Chords (Vol. 1)")
-    target_dir = Path("client/public/samples/chords")
+    parser = argparse.ArgumentParser(description='Renderiza acordes MIDI para áudio em paralelo')
+    parser.add_argument('--midi-dir', default='client/public/midi/chords',
+                        help='Diretório com arquivos .mid (busca recursiva)')
+    parser.add_argument('--output-dir', default='client/public/samples/chords',
+                        help='Diretório de saída')
+    parser.add_argument('--soundfont', default=os.environ.get('SOUNDFONT', '/usr/share/sounds/sf2/FluidR3_GM.sf2'),
+                        help='Soundfont .sf2 (ou variável SOUNDFONT)')
+    parser.add_argument('--format', choices=['mp3', 'ogg', 'flac', 'wav'], default='mp3',
+                        help='Formato de saída')
+    parser.add_argument('--program', type=int, default=24,
+                        help='Programa General MIDI (24 = violão nylon)')
+    parser.add_argument('--sample-rate', type=int, default=44100,
+                        help='Taxa de amostragem')
+    parser.add_argument('--tail', type=float, default=1.0,
+                        help='Segundos renderizados após o último note-off')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('--force', action='store_true',
+                        help='Renderiza mesmo sem mudanças')
+    parser.add_argument('--cache-file', default='datasets/cache/render_cache.json',
+                        help='Hashes das renderizações anteriores (fora de client/public)')
+    args = parser.parse_args()
+    
+    midi_dir = Path(args.midi_dir)
+    target_dir = Path(args.output_dir)
+    soundfont = Path(args.soundfont)
     
-    if not source_dir.exists():
-        print(f"ERRO: Diretório de origem não encontrado: {source_dir}")
+    if not midi_dir.exists():
+        print(f"ERRO: Diretório de origem não encontrado: {midi_dir}")
+        return
+    if not soundfont.exists():
+        print(f"ERRO: Soundfont não encontrado: {soundfont}")
         return
     
     # Criar diretório de destino se não existir
     target_dir.mkdir(parents=True, exist_ok=True)
     
-    # Processar cada pasta de acorde
-    converted = 0
-    skipped = 0
+    # Um MIDI por arquivo de saída, escolhido de forma determinística (ver source_priority)
+    candidates = {}
+    for midi_file in midi_dir.rglob("*.mid"):
+        output_name = output_file_name(normalize_chord_name(midi_file.name), args.format)
+        candidates.setdefault(output_name, []).append(midi_file)
+    sources = {}
+    for output_name, files in candidates.items():
+        files.sort(key=lambda f: source_priority(f, midi_dir))
+        sources[output_name] = files[0]
+        if len(files) > 1:
+            skipped_names = ', '.join(f.name for f in files[1:])
+            print(f"  {output_name}: usando {files[0].name} (alias ignorado: {skipped_names})")
     
-    for chord_folder in source_dir.iterdir():
-        if not chord_folder.is_dir() or chord_folder.name.startswith('.'):
-            continue
-        
-        # Encontrar arquivo principal do acorde (ex: C.mid, Amin.mid)
-        main_midi = None
-        for midi_file in chord_folder.glob("*.mid"):
-            name = midi_file.stem.strip()
-            # Priorizar arquivo principal (sem sufixos como 6, 7, 9, etc.)
-            if name == chord_folder.name or name in ['C ', 'C']:
-                main_midi = midi_file
-                break
-        
-        # Se não encontrou principal, pegar o primeiro
-        if not main_midi:
-            midi_files = list(chord_folder.glob("*.mid"))
-            if midi_files:
-                main_midi = midi_files[0]
-        
-        if not main_midi:
-            print(f"AVISO: Nenhum arquivo MIDI encontrado em {chord_folder.name}")
-            continue
-        
-        # Normalizar nome do acorde
-        chord_name = normalize_chord_name(main_midi.stem)
-        output_file = target_dir / f"{chord_name}.mp3"
+    # Chaves pelo caminho de saída: o mesmo cache serve a vários --output-dir
+    cache_path = Path(args.cache_file)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache = json.loads(cache_path.read_text()) if cache_path.exists() else {}
+    soundfont_id = file_digest(soundfont)
+    params = {
+        'format': args.format,
+        'program': args.program,
+        'sample_rate': args.sample_rate,
+        'tail': args.tail,
+    }
+    
+    jobs = []
+    skipped = 0
+    for output_name, midi_file in sorted(sources.items()):
+        chord_name = normalize_chord_name(midi_file.name)
+        output_file = target_dir / output_name
         
-        # Verificar se já existe
-        if output_file.exists():
-            print(f"PULADO: {chord_name}.mp3 já existe")
+        key = render_key(midi_file, soundfont_id, params)
+        if not args.force and output_file.exists() and cache.get(str(output_file)) == key:
             skipped += 1
             continue
         
-        # Converter
-        print(f"Convertendo: {main_midi.name} -> {chord_name}.mp3")
-        if convert_midi_to_mp3(main_midi, output_file):
-            converted += 1
-        else:
-            skipped += 1
+        jobs.append({
+            'midi': str(midi_file),
+            'output': str(output_file),
+            'chord': chord_name,
+            'key': key,
+            **params,
+        })
+    
+    print(f"Renderizando {len(jobs)} arquivos ({skipped} inalterados)...")
+    
+    converted = 0
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(str(soundfont), args.sample_rate, args.program)
+    ) as pool:
+        for result in pool.map(render_job, jobs):
+            name = Path(result['output']).name
+            if result['ok']:
+                cache[result['output']] = result['key']
+                converted += 1
+                print(f"  {Path(result['midi']).name} -> {name} ({result['duration']}s)")
+            else:
+                failed += 1
+                print(f"ERRO ao converter {Path(result['midi']).name}: {result['error']}")
+    
+    cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
     
-    print(f"\n✅ Conversão concluída: {converted} arquivos convertidos, {skipped} pulados")
+    print(f"\n✅ Conversão concluída: {converted} arquivos convertidos, {skipped} pulados, {failed} com erro")
 
 if __name__ == "__main__":
     main()
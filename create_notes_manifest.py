@@ -1,22 +1,31 @@
 """
 Cria manifest.json para as notas extraídas.
 """
-import json
 from pathlib import Path
 
-notes_dir = Path("client/public/samples/notes")
-manifest_path = notes_dir / "manifest.json"
+from sample_manifest import audio_duration, library_files, save_manifest
 
-notes = {}
-for wav_file in notes_dir.glob("*.wav"):
-    note_name = wav_file.stem
-    notes[note_name] = {
-        'file': wav_file.name,
-        'duration': 1.5  # Default duration for notes
-    }
+NOTES_DIR = Path("client/public/samples/notes")
 
-with open(manifest_path, 'w') as f:
-    json.dump(notes, f, indent=2)
 
-print(f"Manifest criado: {len(notes)} notas")
-print(f"   Arquivo: {manifest_path}")
+def create_manifest(library_dir=NOTES_DIR) -> dict:
+    """Manifest com todos os WAVs publicáveis da biblioteca (nome -> arquivo, duração)"""
+    library_dir = Path(library_dir)
+    manifest_path = library_dir / "manifest.json"
+
+    entries = {}
+    for wav_file in library_files(library_dir).values():
+        entries[wav_file.stem] = {
+            'file': wav_file.name,
+            'duration': audio_duration(wav_file)
+        }
+
+    save_manifest(manifest_path, entries)
+
+    print(f"Manifest criado: {len(entries)} entradas")
+    print(f"   Arquivo: {manifest_path}")
+    return entries
+
+
+if __name__ == "__main__":
+    create_manifest(NOTES_DIR)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Particionamento determinístico do pré-processamento entre máquinas
+==================================================================
+
+Cada arquivo de origem pertence a um único shard, escolhido por um hash estável
+do nome do arquivo (não depende da ordem do sistema de arquivos nem da máquina).
+Os comandos prepare/process/extract aceitam --shard-index i --num-shards n e
+gravam saídas parciais com o sufixo .shard-0000i-of-0000n e um manifest por
+shard. O merge junta os shards e produz o mesmo resultado de uma execução em um
+único nó (mesma ordem, mesmas estatísticas, mesmos samples escolhidos).
+
+Só é preciso um sistema de arquivos compartilhado:
+  máquina k:  python prepare_training_data.py --shard-index k --num-shards 4
+  depois:     python dataset_shards.py prepare --output datasets/processed/training_data.npz
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+SHARD_PATTERN = re.compile(r'\.shard-(\d{5})-of-(\d{5})$')
+
+
+def stable_hash(key: str) -> int:
+    return int(hashlib.sha1(key.encode('utf-8')).hexdigest()[:16], 16)
+
+
+def validate_shard(shard_index: int, num_shards: int):
+    if num_shards < 1 or not 0 <= shard_index < num_shards:
+        raise ValueError(f"Shard inválido: {shard_index} de {num_shards}")
+
+
+def in_shard(key: str, shard_index: int = 0, num_shards: int = 1) -> bool:
+    return num_shards == 1 or stable_hash(key) % num_shards == shard_index
+
+
+def select_shard(paths: Iterable[Path], shard_index: int = 0, num_shards: int = 1) -> List[Path]:
+    """Arquivos do shard, em ordem estável (o hash usa só o nome do arquivo)"""
+    validate_shard(shard_index, num_shards)
+    return [p for p in sorted(paths)
+            if in_shard(p.name if hasattr(p, 'name') else Path(p).name, shard_index, num_shards)]
+
+
+def shard_path(path, shard_index: int, num_shards: int) -> Path:
+    """datasets/x.npz -> datasets/x.shard-00001-of-00004.npz (sem mudança com 1 shard)"""
+    path = Path(path)
+    if num_shards == 1:
+        return path
+    return path.with_name(f"{path.stem}.shard-{shard_index:05d}-of-{num_shards:05d}{path.suffix}")
+
+
+def manifest_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.stem}.manifest.json")
+
+
+def write_shard_manifest(output_path, shard_index: int, num_shards: int, files: List[Path], **extra):
+    """Manifest do shard: quais arquivos de origem ele cobre e o que produziu"""
+    manifest = {
+        'shard_index': shard_index,
+        'num_shards': num_shards,
+        'output': Path(output_path).name,
+        'files': [Path(f).name for f in files],
+        **extra,
+    }
+    with open(manifest_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def find_shards(path) -> List[Path]:
+    """Todos os shards de uma saída, ordenados; falha se algum estiver faltando"""
+    path = Path(path)
+    found: Dict[int, Path] = {}
+    totals = set()
+    for candidate in path.parent.glob(f"{path.stem}.shard-*{path.suffix}"):
+        match = SHARD_PATTERN.search(candidate.name[:-len(path.suffix)] if path.suffix else candidate.name)
+        if match:
+            found[int(match.group(1))] = candidate
+            totals.add(int(match.group(2)))
+    if not found:
+        raise FileNotFoundError(f"Nenhum shard encontrado para {path}")
+    if len(totals) != 1:
+        raise ValueError(f"Shards de execuções diferentes para {path}: {sorted(totals)}")
+    total = totals.pop()
+    missing = [i for i in range(total) if i not in found]
+    if missing:
+        raise FileNotFoundError(f"Shards faltando para {path}: {missing}")
+    return [found[i] for i in range(total)]
+
+
+def save_candidate_shard(shard_dir, best: Dict[str, Dict], shard_index: int, num_shards: int,
+                         sample_rate: int, files: List[Path], config: Dict):
+    """
+    Grava o melhor candidato de cada nome deste shard (áudio bruto, sem
+    normalização, em float para não perder precisão) e candidates.json com
+    score, origem e posição (arquivo, ordem no arquivo) de cada um.
+    """
+    import soundfile as sf
+
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    for name, candidate in best.items():
+        audio_path = shard_path(shard_dir / f"{name}.wav", shard_index, num_shards)
+        audio = candidate['audio']
+        sf.write(audio_path, audio, sample_rate, subtype='DOUBLE' if audio.dtype == 'float64' else 'FLOAT')
+        entries[name] = {
+            **{key: value for key, value in candidate.items() if key != 'audio'},
+            'audio_file': audio_path.name,
+            'dtype': str(audio.dtype),
+        }
+
+    index_path = shard_path(shard_dir / 'candidates.json', shard_index, num_shards)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({'config': config, 'candidates': entries}, f, indent=2, ensure_ascii=False, default=float)
+    write_shard_manifest(index_path, shard_index, num_shards, files, candidates=len(entries))
+    return index_path
+
+
+def load_candidate_shards(shard_dir):
+    """
+    Candidatos de todos os shards por nome, na ordem global dos arquivos (a mesma
+    de uma execução em um único nó), e a configuração do extrator.
+    """
+    import soundfile as sf
+
+    shard_dir = Path(shard_dir)
+    candidates: Dict[str, List[Dict]] = {}
+    config = None
+    for path in find_shards(shard_dir / 'candidates.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if config is None:
+            config = data['config']
+        elif data['config'] != config:
+            raise ValueError(f"{path.name} foi gerado com outra configuração do extrator")
+        for name, entry in data['candidates'].items():
+            audio, _ = sf.read(shard_dir / entry['audio_file'], dtype=entry['dtype'])
+            candidates.setdefault(name, []).append({**entry, 'audio': audio})
+
+    for entries in candidates.values():
+        entries.sort(key=lambda c: (c['file'], c['seq']))
+    return candidates, config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Junta os shards do pré-processamento')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    command = subparsers.add_parser('prepare', help='Shards de prepare_training_data.py')
+    command.add_argument('--output', default='datasets/processed/training_data.npz',
+                         help='Arquivo final (os shards ficam ao lado)')
+
+    command = subparsers.add_parser('process', help='Shards de process_datasets.py')
+    command.add_argument('--output-dir', default='datasets/processed',
+                         help='Diretório de saída do process_datasets.py')
+    command.add_argument('--codec', choices=['float32', 'float16', 'uint8'], default='float32',
+                         help='Armazenamento de X no training_data.npz')
+
+    for name, label, default in (('chords', 'acordes', 'client/public/samples/chords'),
+                                 ('notes', 'notas', 'client/public/samples/notes')):
+        command = subparsers.add_parser(name, help=f'Candidatos dos shards do extrator de {label}')
+        command.add_argument('--output-dir', default=default,
+                             help='Diretório de saída do extrator')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'prepare':
+        from prepare_training_data import merge_training_shards
+        merge_training_shards(args.output)
+    elif args.command == 'process':
+        from process_datasets import merge_processed_shards
+        merge_processed_shards(args.output_dir, args.codec)
+    elif args.command == 'chords':
+        from extract_samples import SampleExtractor
+        SampleExtractor.merge_shards(args.output_dir)
+    else:
+        from extract_notes import NoteExtractor
+        NoteExtractor.merge_shards(args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
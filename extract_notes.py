@@ -1,6 +1,8 @@
 """
 Extrai samples de notas individuais do GuitarSet.
 O GuitarSet tem anotações de pitch por corda, permitindo extrair notas limpas.
+Com workers > 0, a análise roda em um pool de processos e só RMS e posição
+de cada candidato voltam ao processo principal (ver extract_samples.py).
 """
 import librosa
 import numpy as np
@@ -8,18 +10,23 @@ import jams
 from pathlib import Path
 import soundfile as sf
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from scipy import signal
 
-# Mapeamento MIDI -> Nome da nota
-MIDI_TO_NOTE = {
-    40: 'E2', 41: 'F2', 42: 'F#2', 43: 'G2', 44: 'G#2', 45: 'A2',
-    46: 'A#2', 47: 'B2', 48: 'C3', 49: 'C#3', 50: 'D3', 51: 'D#3',
-    52: 'E3', 53: 'F3', 54: 'F#3', 55: 'G3', 56: 'G#3', 57: 'A3',
-    58: 'A#3', 59: 'B3', 60: 'C4', 61: 'C#4', 62: 'D4', 63: 'D#4',
-    64: 'E4', 65: 'F4', 66: 'F#4', 67: 'G4', 68: 'G#4', 69: 'A4',
-    70: 'A#4', 71: 'B4', 72: 'C5', 73: 'C#5', 74: 'D5', 75: 'D#5',
-    76: 'E5', 77: 'F5', 78: 'F#5', 79: 'G5', 80: 'G#5', 81: 'A5',
-}
+from dataset_shards import load_candidate_shards, save_candidate_shard, select_shard
+from prefetch_reader import PrefetchReader
+from hex_pickup import annotation_string, hex_file_for, is_hex_file, load_hex, mix_strings
+from music_notes import MIDI_TO_NOTE
+
+# Extrator de cada processo do pool (ver _init_worker)
+_EXTRACTOR = None
+
+def _init_worker(extractor):
+    global _EXTRACTOR
+    _EXTRACTOR = extractor
+
+def _scored_candidates(audio_path):
+    return _EXTRACTOR.scored_candidates(audio_path)
 
 class NoteExtractor:
     """Extrai samples de notas individuais."""
@@ -30,119 +37,254 @@ class NoteExtractor:
         annot_dir: str,
         output_dir: str,
         sample_rate: int = 44100,
-        note_duration: float = 1.5
+        note_duration: float = 1.5,
+        build_sprites: bool = False,  # Também gerar sprite único da biblioteca
+        hex_dir: str = None,  # audio_hex-pickup_debleeded: extrai do canal da corda anotada
+        shard_index: int = 0,  # Com num_shards > 1, só os arquivos deste shard
+        num_shards: int = 1,
+        prefetch: int = 4,  # Gravações decodificadas antecipadamente (prefetch_reader.py)
+        workers: int = 0  # Processos de análise (0 = no processo principal)
     ):
         self.audio_dir = Path(audio_dir)
         self.annot_dir = Path(annot_dir)
         self.output_dir = Path(output_dir)
         self.sample_rate = sample_rate
         self.note_duration = note_duration
+        self.build_sprites = build_sprites
+        self.hex_dir = Path(hex_dir) if hex_dir else None
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.audio_files = []
+        self.prefetch = prefetch
+        self.workers = workers
         
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def extract_notes(self):
         """Extrai notas do GuitarSet usando anotações de pitch."""
         
+        candidates = self.collect_candidates()
+        if self.workers > 0:
+            candidates = self.with_audio(candidates)
+        
+        if self.num_shards > 1:
+            # Só o melhor candidato de cada nota neste shard; o merge escolhe entre os shards
+            best = {note: self.best_candidate(note, samples) for note, samples in candidates.items()}
+            best = {note: sample for note, sample in best.items() if sample is not None}
+            index_path = save_candidate_shard(
+                self.output_dir / 'shards', best, self.shard_index, self.num_shards,
+                self.sample_rate, self.audio_files, {'sample_rate': self.sample_rate, 'note_duration': self.note_duration}
+            )
+            print(f"\nCandidatos do shard salvos em: {index_path}")
+            print(f"Depois de todos os shards: python dataset_shards.py notes --output-dir {self.output_dir}")
+            return
+        
+        self.save_notes(candidates)
+    
+    def collect_candidates(self):
+        """Candidatos de cada nota (segmento, RMS e posição no dataset)."""
+        
         candidates = defaultdict(list)
         
-        audio_files = list(self.audio_dir.glob("*.wav"))
+        audio_files = select_shard(self.audio_dir.glob("*.wav"), self.shard_index, self.num_shards)
+        self.audio_files = audio_files
         print(f"Processando {len(audio_files)} arquivos...")
         
-        for audio_path in audio_files:
-            # Arquivos de áudio têm _mic no final, mas JAMS não têm
-            stem_name = audio_path.stem.replace('_mic', '')
-            jams_path = self.annot_dir / f"{stem_name}.jams"
-            if not jams_path.exists():
+        if self.workers > 0:
+            # Análise nos workers: volta só RMS e posição de cada candidato
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self,))
+            reader = PrefetchReader(audio_files, _scored_candidates, max(self.prefetch, 2 * self.workers), executor=pool)
+        else:
+            # JAMS e áudio das próximas gravações são lidos enquanto a atual é analisada
+            pool = None
+            reader = PrefetchReader(audio_files, self.load_recording, self.prefetch)
+        try:
+            for audio_path, loaded in reader:
+                if pool is None:
+                    recording = loaded.get()
+                    if recording is None:
+                        continue
+                    found = self.file_candidates(audio_path, recording)
+                else:
+                    found = loaded.get()
+                for note_name, candidate in found:
+                    candidates[note_name].append(candidate)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        
+        return candidates
+    
+    def file_candidates(self, audio_path, recording):
+        """Candidatos (nota, dict) de uma gravação carregada, com o segmento e seus limites em amostras."""
+        jam, hex_path, strings, mono = recording
+        found = []
+        
+        # Procurar anotações de note_midi (não pitch_contour)
+        seq = 0  # ordem do candidato no arquivo: desempate estável entre shards
+        for ann in jam.annotations:
+            if ann.namespace != 'note_midi':
                 continue
             
-            jam = jams.load(str(jams_path))
+            string = annotation_string(ann) if strings is not None else None
+            isolated = string is not None and string < len(strings)
+            audio = strings[string] if isolated else mono
             
-            # GuitarSet tem anotações por corda (string0 a string5)
-            # Cada anotação tem pitch MIDI e confidence
-            
-            audio, sr = librosa.load(audio_path, sr=self.sample_rate)
-            
-            # Procurar anotações de note_midi (não pitch_contour)
-            for ann in jam.annotations:
-                if ann.namespace != 'note_midi':
+            for obs in ann.data:
+                # obs.value é o pitch MIDI
+                midi_pitch = int(round(obs.value))
+                
+                if midi_pitch not in MIDI_TO_NOTE:
                     continue
                 
-                for obs in ann.data:
-                    # obs.value é o pitch MIDI
-                    midi_pitch = int(round(obs.value))
-                    
-                    if midi_pitch not in MIDI_TO_NOTE:
-                        continue
-                    
-                    if obs.duration < 0.5:  # Notas muito curtas
-                        continue
-                    
-                    # Extrair segmento
-                    start = int(obs.time * self.sample_rate)
-                    duration = min(obs.duration, self.note_duration)
-                    end = int((obs.time + duration) * self.sample_rate)
-                    
-                    if end > len(audio):
-                        continue
-                    
-                    segment = audio[start:end]
+                if obs.duration < 0.5:  # Notas muito curtas
+                    continue
+                
+                # Extrair segmento
+                start = int(obs.time * self.sample_rate)
+                duration = min(obs.duration, self.note_duration)
+                end = int((obs.time + duration) * self.sample_rate)
+                
+                if end > len(audio):
+                    continue
+                
+                segment = audio[start:end]
+                
+                # Calcular qualidade (RMS, sem clipping)
+                rms = np.sqrt(np.mean(segment**2))
+                if rms < 0.01:  # Muito silencioso
+                    continue
+                
+                # VALIDAÇÃO ESPECÍFICA PARA F2 (MIDI 41): Garantir que é nota individual, não acorde
+                # F2 está na corda 6 (string5), primeira casa
+                is_f2 = (midi_pitch == 41)
+                
+                # Canal isolado da corda: a heurística espectral contra acordes é desnecessária
+                if is_f2 and not isolated:
+                    # VALIDAÇÃO CRÍTICA PARA F2: Verificar se é realmente nota individual, não acorde
+                    # Análise espectral: notas individuais têm frequência fundamental clara
                     
-                    # Calcular qualidade (RMS, sem clipping)
-                    rms = np.sqrt(np.mean(segment**2))
-                    if rms < 0.01:  # Muito silencioso
-                        continue
+                    # Calcular FFT para análise espectral
+                    fft = np.fft.rfft(segment)
+                    freqs = np.fft.rfftfreq(len(segment), 1/self.sample_rate)
+                    magnitude = np.abs(fft)
                     
-                    # VALIDAÇÃO ESPECÍFICA PARA F2 (MIDI 41): Garantir que é nota individual, não acorde
-                    # F2 está na corda 6 (string5), primeira casa
-                    is_f2 = (midi_pitch == 41)
+                    # Encontrar picos de frequência
+                    peaks, _ = signal.find_peaks(magnitude, height=np.max(magnitude) * 0.1)
                     
-                    if is_f2:
-                        # VALIDAÇÃO CRÍTICA PARA F2: Verificar se é realmente nota individual, não acorde
-                        # Análise espectral: notas individuais têm frequência fundamental clara
+                    if len(peaks) > 0:
+                        # Frequência fundamental esperada para F2 (MIDI 41) ≈ 87.31 Hz
+                        expected_freq = 440 * (2 ** ((midi_pitch - 69) / 12))
                         
-                        # Calcular FFT para análise espectral
-                        fft = np.fft.rfft(segment)
-                        freqs = np.fft.rfftfreq(len(segment), 1/self.sample_rate)
-                        magnitude = np.abs(fft)
+                        # Verificar se há frequência próxima à esperada (tolerância de 10Hz)
+                        peak_freqs = freqs[peaks]
+                        fundamental_found = any(abs(f - expected_freq) < 10 for f in peak_freqs[:5])
                         
-                        # Encontrar picos de frequência
-                        peaks, _ = signal.find_peaks(magnitude, height=np.max(magnitude) * 0.1)
+                        # Se não encontrar frequência fundamental clara, rejeitar (pode ser acorde)
+                        if not fundamental_found:
+                            print(f"  ⚠️ F2 rejeitado de {audio_path.name}: frequência fundamental não encontrada (esperada ~{expected_freq:.1f}Hz)")
+                            continue
                         
-                        if len(peaks) > 0:
-                            # Frequência fundamental esperada para F2 (MIDI 41) ≈ 87.31 Hz
-                            expected_freq = 440 * (2 ** ((midi_pitch - 69) / 12))
-                            
-                            # Verificar se há frequência próxima à esperada (tolerância de 10Hz)
-                            peak_freqs = freqs[peaks]
-                            fundamental_found = any(abs(f - expected_freq) < 10 for f in peak_freqs[:5])
-                            
-                            # Se não encontrar frequência fundamental clara, rejeitar (pode ser acorde)
-                            if not fundamental_found:
-                                print(f"  ⚠️ F2 rejeitado de {audio_path.name}: frequência fundamental não encontrada (esperada ~{expected_freq:.1f}Hz)")
-                                continue
-                            
-                            # Verificar se há muitas frequências fortes simultâneas (indica acorde)
-                            # Notas individuais têm 1-2 frequências dominantes, acordes têm 3+
-                            strong_peaks = peaks[magnitude[peaks] > np.max(magnitude) * 0.3]
-                            if len(strong_peaks) > 3:
-                                print(f"  ⚠️ F2 rejeitado de {audio_path.name}: muitas frequências fortes ({len(strong_peaks)}), parece acorde")
-                                continue
-                            
-                            # Verificar duração: notas individuais são mais curtas
-                            if obs.duration > 3.0:
-                                print(f"  ⚠️ F2 rejeitado de {audio_path.name}: duração muito longa ({obs.duration:.2f}s), pode ser acorde")
-                                continue
-                            
-                            print(f"  ✅ F2 validado de {audio_path.name}: frequência fundamental encontrada, duração {obs.duration:.2f}s")
-                    
-                    note_name = MIDI_TO_NOTE[midi_pitch]
-                    candidates[note_name].append({
-                        'audio': segment,
-                        'rms': rms,
-                        'source': audio_path.name,
-                        'is_f2': is_f2
-                    })
+                        # Verificar se há muitas frequências fortes simultâneas (indica acorde)
+                        # Notas individuais têm 1-2 frequências dominantes, acordes têm 3+
+                        strong_peaks = peaks[magnitude[peaks] > np.max(magnitude) * 0.3]
+                        if len(strong_peaks) > 3:
+                            print(f"  ⚠️ F2 rejeitado de {audio_path.name}: muitas frequências fortes ({len(strong_peaks)}), parece acorde")
+                            continue
+                        
+                        # Verificar duração: notas individuais são mais curtas
+                        if obs.duration > 3.0:
+                            print(f"  ⚠️ F2 rejeitado de {audio_path.name}: duração muito longa ({obs.duration:.2f}s), pode ser acorde")
+                            continue
+                        
+                        print(f"  ✅ F2 validado de {audio_path.name}: frequência fundamental encontrada, duração {obs.duration:.2f}s")
+                
+                found.append((MIDI_TO_NOTE[midi_pitch], {
+                    'audio': segment,
+                    'rms': rms,
+                    'source': hex_path.name if isolated else audio_path.name,
+                    'is_f2': is_f2,
+                    'file': audio_path.name,
+                    'seq': seq,
+                    'string': string if isolated else None,
+                    'start': start,
+                    'end': end
+                }))
+                seq += 1
+        
+        return found
+    
+    def scored_candidates(self, audio_path):
+        """file_candidates sem o áudio (executado no worker: só metadados voltam pelo pickle)"""
+        recording = self.load_recording(audio_path)
+        if recording is None:
+            return []
+        found = self.file_candidates(audio_path, recording)
+        for _, candidate in found:
+            del candidate['audio']
+        return found
+    
+    def with_audio(self, candidates):
+        """Melhor candidato de cada nota com o áudio, decodificando só as gravações vencedoras."""
+        chosen = {note: self.best_candidate(note, samples) for note, samples in candidates.items()}
+        by_file = defaultdict(list)
+        for candidate in chosen.values():
+            if candidate is not None:
+                by_file[candidate['file']].append(candidate)
+        for file, selected in by_file.items():
+            _, _, strings, mono = self.load_recording(self.audio_dir / file)
+            for candidate in selected:
+                audio = mono if candidate['string'] is None else strings[candidate['string']]
+                candidate['audio'] = audio[candidate['start']:candidate['end']]
+        # Notas sem candidato válido continuam com a lista (save_notes explica a ausência)
+        return {note: [candidate] if candidate is not None else candidates[note]
+                for note, candidate in chosen.items()}
+    
+    def load_recording(self, audio_path):
+        """
+        JAMS, arquivo hex (ou None), canais por corda e áudio mono de uma gravação.
+        O mono é sempre o do microfone quando audio_path é o mic (notas sem corda
+        anotada); só um arquivo hex sem mic usa o mix dos canais (mix_strings).
+        """
+        # Arquivos de áudio têm _mic/_hex_cln no final, mas JAMS não têm
+        stem_name = audio_path.stem.replace('_mic', '').replace('_hex_cln', '').replace('_hex', '')
+        jams_path = self.annot_dir / f"{stem_name}.jams"
+        if not jams_path.exists():
+            return None
+        
+        jam = jams.load(str(jams_path))
         
+        # GuitarSet tem anotações por corda (string0 a string5)
+        # Cada anotação tem pitch MIDI e confidence
+        
+        # Com hex-pickup, cada corda tem seu próprio canal (sem acordes vazando)
+        hex_path = audio_path if is_hex_file(audio_path) else None
+        if hex_path is None and self.hex_dir is not None:
+            hex_path = hex_file_for(stem_name, self.hex_dir)
+        strings = load_hex(hex_path, self.sample_rate)[0] if hex_path is not None else None
+        if hex_path == audio_path:
+            mono = mix_strings(strings)
+        else:
+            mono, _ = librosa.load(audio_path, sr=self.sample_rate)
+        return jam, hex_path, strings, mono
+    
+    def best_candidate(self, note, samples):
+        """Maior RMS (empate fica com o primeiro na ordem do dataset); None se não houver sample válido."""
+        if not samples:
+            return None
+        
+        # Para F2, priorizar samples que passaram validação de frequência
+        # Para outras notas, ordenar por RMS (volume)
+        if note == 'F2':
+            # Separar F2 validados (que passaram análise espectral)
+            f2_validated = [s for s in samples if s.get('is_f2', False)]
+            if not f2_validated:
+                return None
+            return max(f2_validated, key=lambda x: x['rms'])
+        return max(samples, key=lambda x: x['rms'])
+    
+    def save_notes(self, candidates):
+        """Normaliza, completa a duração e salva a melhor amostra de cada nota."""
         # Salvar melhores samples
         print("Salvando notas...")
         
@@ -150,25 +292,15 @@ class NoteExtractor:
             if not samples:
                 continue
             
-            # Para F2, priorizar samples que passaram validação de frequência
-            # Para outras notas, ordenar por RMS (volume)
+            best = self.best_candidate(note, samples)
             if note == 'F2':
-                # Separar F2 validados (que passaram análise espectral)
-                f2_validated = [s for s in samples if s.get('is_f2', False)]
-                if f2_validated:
-                    # Ordenar F2 validados por RMS (volume)
-                    f2_validated.sort(key=lambda x: x['rms'], reverse=True)
-                    best = f2_validated[0]
+                if best is not None:
                     print(f"  ✅ F2: usando sample VALIDADO de {best['source']} (nota individual limpa)")
                 else:
                     # Se não houver F2 validado, NÃO salvar (melhor não ter sample do que ter incorreto)
                     print(f"  ❌ F2: NENHUM sample válido encontrado! Todos foram rejeitados por parecerem acordes.")
                     print(f"  ❌ F2: É necessário reextrair F2 do dataset com critérios mais rigorosos.")
                     continue
-            else:
-                # Ordenar por RMS (volume)
-                samples.sort(key=lambda x: x['rms'], reverse=True)
-                best = samples[0]
             
             audio = best['audio']
             
@@ -191,12 +323,26 @@ class NoteExtractor:
             print(f"  {note}: saved")
         
         print(f"\nNotas salvas em: {self.output_dir}")
+        
+        if self.build_sprites:
+            from build_audio_sprites import build_library_sprites
+            build_library_sprites(self.output_dir)
+    
+    @classmethod
+    def merge_shards(cls, output_dir: str, build_sprites: bool = False):
+        """Escolhe a melhor amostra entre os shards e salva como em uma execução única."""
+        candidates, config = load_candidate_shards(Path(output_dir) / 'shards')
+        print(f"Juntando candidatos de {len(candidates)} notas...")
+        extractor = cls('', '', output_dir, build_sprites=build_sprites, **config)
+        extractor.save_notes(candidates)
 
 
 if __name__ == "__main__":
+    hex_dir = Path("datasets/audio_hex-pickup_debleeded")
     extractor = NoteExtractor(
         audio_dir="datasets/audio_mono-mic",
         annot_dir="datasets/annotations",
-        output_dir="client/public/samples/notes"
+        output_dir="client/public/samples/notes",
+        hex_dir=str(hex_dir) if hex_dir.exists() else None
     )
     extractor.extract_notes()
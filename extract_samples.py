@@ -1,5 +1,9 @@
 """
 Extrai samples limpos de acordes do GuitarSet para uso no app.
+
+Com workers > 0, a pontuação roda em um pool de processos que devolve só o
+score e a posição de cada candidato; o áudio fica nos workers e só os
+vencedores são decodificados de novo no processo principal.
 """
 import librosa
 import numpy as np
@@ -7,6 +11,21 @@ import jams
 from pathlib import Path
 import soundfile as sf
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from dataset_shards import load_candidate_shards, save_candidate_shard, select_shard
+from prefetch_reader import PrefetchReader
+from sample_manifest import audio_duration, library_files, save_manifest
+
+# Extrator de cada processo do pool (ver _init_worker)
+_EXTRACTOR = None
+
+def _init_worker(extractor):
+    global _EXTRACTOR
+    _EXTRACTOR = extractor
+
+def _scored_candidates(audio_path):
+    return _EXTRACTOR.scored_candidates(audio_path)
 
 class SampleExtractor:
     """Extrai os melhores samples de cada acorde do GuitarSet."""
@@ -17,13 +36,24 @@ class SampleExtractor:
         annot_dir: str,
         output_dir: str,
         sample_rate: int = 44100,  # Qualidade alta para playback
-        sample_duration: float = 2.0  # 2 segundos por sample
+        sample_duration: float = 2.0,  # 2 segundos por sample
+        build_sprites: bool = False,  # Também gerar sprite único da biblioteca
+        shard_index: int = 0,  # Com num_shards > 1, só os arquivos deste shard
+        num_shards: int = 1,
+        prefetch: int = 4,  # Gravações decodificadas antecipadamente (prefetch_reader.py)
+        workers: int = 0  # Processos de pontuação (0 = no processo principal)
     ):
         self.audio_dir = Path(audio_dir)
         self.annot_dir = Path(annot_dir)
         self.output_dir = Path(output_dir)
         self.sample_rate = sample_rate
         self.sample_duration = sample_duration
+        self.build_sprites = build_sprites
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.audio_files = []
+        self.prefetch = prefetch
+        self.workers = workers
         
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -94,72 +124,166 @@ class SampleExtractor:
     def extract_samples(self):
         """Extrai melhores samples de cada acorde."""
         
+        candidates = self.collect_candidates()
+        if self.workers > 0:
+            candidates = self.with_audio(candidates)
+        
+        if self.num_shards > 1:
+            # Só o melhor candidato de cada acorde neste shard; o merge escolhe entre os shards
+            best = {chord: self.best_candidate(samples) for chord, samples in candidates.items() if samples}
+            index_path = save_candidate_shard(
+                self.output_dir / 'shards', best, self.shard_index, self.num_shards,
+                self.sample_rate, self.audio_files, {'sample_rate': self.sample_rate, 'sample_duration': self.sample_duration}
+            )
+            print(f"\nCandidatos do shard salvos em: {index_path}")
+            print(f"Depois de todos os shards: python dataset_shards.py chords --output-dir {self.output_dir}")
+            return
+        
+        self.save_samples(candidates)
+    
+    def collect_candidates(self):
+        """Candidatos de cada acorde (segmento, score e posição no dataset)."""
+        
         # Armazena candidatos por acorde
         candidates = defaultdict(list)
         
-        audio_files = list(self.audio_dir.glob("*.wav"))
+        audio_files = select_shard(self.audio_dir.glob("*.wav"), self.shard_index, self.num_shards)
+        self.audio_files = audio_files
         print(f"Processando {len(audio_files)} arquivos...")
         
         total_chords_found = 0
         chords_processed = 0
         
-        for idx, audio_path in enumerate(audio_files):
-            if (idx + 1) % 50 == 0:
-                print(f"  Processado {idx + 1}/{len(audio_files)} arquivos...")
-            
-            # Carregar anotação
-            # Arquivos de áudio têm _mic no final, mas JAMS não têm
-            stem_name = audio_path.stem.replace('_mic', '')
-            jams_path = self.annot_dir / f"{stem_name}.jams"
-            if not jams_path.exists():
-                continue
-            
-            jam = jams.load(str(jams_path))
-            chord_ann = jam.search(namespace='chord')[0]
-            
-            # Carregar áudio
-            audio, sr = librosa.load(audio_path, sr=self.sample_rate)
-            
-            for obs in chord_ann.data:
-                chord = obs.value
-                total_chords_found += 1
-                
-                if chord not in self.target_chords:
-                    continue
-                
-                chords_processed += 1
-                
-                # Verificar duração suficiente (mínimo 1.5s)
-                if obs.duration < 1.5:
-                    continue
-                
-                # Usar duração real do acorde (ou máximo de sample_duration)
-                actual_duration = min(obs.duration, self.sample_duration)
-                
-                # Extrair segmento
-                start_sample = int(obs.time * self.sample_rate)
-                end_sample = int((obs.time + actual_duration) * self.sample_rate)
-                
-                if end_sample > len(audio):
-                    continue
+        if self.workers > 0:
+            # Pontuação nos workers: volta só score e posição de cada candidato
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self,))
+            reader = PrefetchReader(audio_files, _scored_candidates, max(self.prefetch, 2 * self.workers), executor=pool)
+        else:
+            # Anotação e áudio das próximas gravações são lidos enquanto a atual é pontuada
+            pool = None
+            reader = PrefetchReader(audio_files, self.load_recording, self.prefetch)
+        try:
+            for idx, (audio_path, loaded) in enumerate(reader):
+                if (idx + 1) % 50 == 0:
+                    print(f"  Processado {idx + 1}/{len(audio_files)} arquivos...")
                 
-                segment = audio[start_sample:end_sample]
+                if pool is None:
+                    recording = loaded.get()
+                    if recording is None:
+                        continue
+                    found, total, processed = self.file_candidates(audio_path, recording)
+                else:
+                    found, total, processed = loaded.get()
                 
-                # Calcular qualidade
-                score = self.calculate_quality_score(segment)
-                
-                simple_chord = self.target_chords[chord]
-                candidates[simple_chord].append({
-                    'audio': segment,
-                    'score': score,
-                    'source': audio_path.name,
-                    'time': obs.time
-                })
-        
-        # Selecionar e salvar melhores samples
+                total_chords_found += total
+                chords_processed += processed
+                for simple_chord, candidate in found:
+                    candidates[simple_chord].append(candidate)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        
         print(f"\nTotal de acordes encontrados: {total_chords_found}")
         print(f"Acordes processados (nos target_chords): {chords_processed}")
         print(f"Candidatos por acorde: {len(candidates)}")
+        return candidates
+    
+    def file_candidates(self, audio_path, recording):
+        """
+        Candidatos (acorde, dict) de uma gravação carregada, com o segmento e
+        seus limites em amostras; mais o total de acordes anotados e quantos
+        estão nos target_chords.
+        """
+        chord_ann, audio = recording
+        found = []
+        total_chords_found = 0
+        chords_processed = 0
+        
+        for seq, obs in enumerate(chord_ann.data):
+            chord = obs.value
+            total_chords_found += 1
+            
+            if chord not in self.target_chords:
+                continue
+            
+            chords_processed += 1
+            
+            # Verificar duração suficiente (mínimo 1.5s)
+            if obs.duration < 1.5:
+                continue
+            
+            # Usar duração real do acorde (ou máximo de sample_duration)
+            actual_duration = min(obs.duration, self.sample_duration)
+            
+            # Extrair segmento
+            start_sample = int(obs.time * self.sample_rate)
+            end_sample = int((obs.time + actual_duration) * self.sample_rate)
+            
+            if end_sample > len(audio):
+                continue
+            
+            segment = audio[start_sample:end_sample]
+            
+            # Calcular qualidade
+            score = self.calculate_quality_score(segment)
+            
+            found.append((self.target_chords[chord], {
+                'audio': segment,
+                'score': score,
+                'source': audio_path.name,
+                'time': obs.time,
+                'file': audio_path.name,  # posição no dataset: desempate estável entre shards
+                'seq': seq,
+                'start': start_sample,
+                'end': end_sample
+            }))
+        
+        return found, total_chords_found, chords_processed
+    
+    def scored_candidates(self, audio_path):
+        """file_candidates sem o áudio (executado no worker: só metadados voltam pelo pickle)"""
+        recording = self.load_recording(audio_path)
+        if recording is None:
+            return [], 0, 0
+        found, total, processed = self.file_candidates(audio_path, recording)
+        for _, candidate in found:
+            del candidate['audio']
+        return found, total, processed
+    
+    def with_audio(self, candidates):
+        """Melhor candidato de cada acorde com o áudio, decodificando só as gravações vencedoras."""
+        best = {chord: self.best_candidate(samples) for chord, samples in candidates.items() if samples}
+        by_file = defaultdict(list)
+        for candidate in best.values():
+            by_file[candidate['file']].append(candidate)
+        for file, selected in by_file.items():
+            _, audio = self.load_recording(self.audio_dir / file)
+            for candidate in selected:
+                candidate['audio'] = audio[candidate['start']:candidate['end']]
+        return {chord: [candidate] for chord, candidate in best.items()}
+    
+    def load_recording(self, audio_path):
+        """Anotação de acordes e áudio de uma gravação (None se não houver JAMS)."""
+        # Carregar anotação
+        # Arquivos de áudio têm _mic no final, mas JAMS não têm
+        stem_name = audio_path.stem.replace('_mic', '')
+        jams_path = self.annot_dir / f"{stem_name}.jams"
+        if not jams_path.exists():
+            return None
+        
+        jam = jams.load(str(jams_path))
+        chord_ann = jam.search(namespace='chord')[0]
+        
+        # Carregar áudio
+        audio, sr = librosa.load(audio_path, sr=self.sample_rate)
+        return chord_ann, audio
+    
+    def best_candidate(self, samples):
+        """Maior score; empate fica com o primeiro na ordem do dataset."""
+        return max(samples, key=lambda x: x['score'])
+    
+    def save_samples(self, candidates):
+        """Normaliza e salva o melhor candidato de cada acorde, e gera o manifest."""
         print("\nSelecionando melhores samples...")
         
         for chord, samples in candidates.items():
@@ -167,11 +291,8 @@ class SampleExtractor:
                 print(f"  {chord}: Nenhum sample encontrado!")
                 continue
             
-            # Ordenar por qualidade
-            samples.sort(key=lambda x: x['score'], reverse=True)
-            
             # Pegar o melhor
-            best = samples[0]
+            best = self.best_candidate(samples)
             
             # Normalizar volume
             audio = best['audio']
@@ -192,22 +313,31 @@ class SampleExtractor:
         
         # Gerar lista de arquivos para o frontend
         self.generate_manifest()
+        
+        if self.build_sprites:
+            from build_audio_sprites import build_library_sprites
+            build_library_sprites(self.output_dir)
+    
+    @classmethod
+    def merge_shards(cls, output_dir: str, build_sprites: bool = False):
+        """Escolhe o melhor candidato entre os shards e salva como em uma execução única."""
+        candidates, config = load_candidate_shards(Path(output_dir) / 'shards')
+        print(f"Juntando candidatos de {len(candidates)} acordes...")
+        extractor = cls('', '', output_dir, build_sprites=build_sprites, **config)
+        extractor.save_samples(candidates)
     
     def generate_manifest(self):
         """Gera JSON com lista de samples disponíveis."""
-        import json
-        
         samples = {}
-        for wav_file in self.output_dir.glob("*.wav"):
+        for wav_file in library_files(self.output_dir).values():
             chord_name = wav_file.stem
             samples[chord_name] = {
                 'file': wav_file.name,
-                'duration': self.sample_duration
+                'duration': audio_duration(wav_file)
             }
         
         manifest_path = self.output_dir / 'manifest.json'
-        with open(manifest_path, 'w') as f:
-            json.dump(samples, f, indent=2)
+        save_manifest(manifest_path, samples)
         
         print(f"Manifest salvo: {manifest_path}")
 
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Backend de features em NumPy/scipy.fft (sem librosa)
+===================================================
+
+Reimplementa o subconjunto do librosa usado por prepare_training_data.py e
+process_datasets.py: STFT, chroma, mel, MFCC, RMS, centroide, rolloff e ZCR,
+com os mesmos defaults (janela Hann periódica, frames centralizados com padding
+de zeros, filtros Slaney). Os frames são views por stride (sem cópias), a FFT
+aceita workers do scipy.fft e os bancos de filtros são calculados uma vez e
+guardados em disco.
+
+Diferença conhecida: o chroma do librosa estima a afinação de cada segmento
+(estimate_tuning) quando tuning não é informado; aqui a afinação é fixa em
+A4 = 440 Hz. A verificação de paridade compara com o librosa usando tuning=0.
+
+Uso (paridade e benchmark contra o librosa):
+python feature_backend.py --files datasets/audio_mono-mic/00_BN1-129-Eb_comp_mic.wav
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
+
+CACHE_DIR = Path('datasets/cache/filterbanks')
+
+BACKENDS = ('librosa', 'numpy')
+
+# Tolerância da verificação de paridade (erro absoluto máximo, features normalizadas)
+PARITY_TOLERANCE = 1e-3
+
+
+def load_audio(path, sr: int = 22050) -> np.ndarray:
+    """Decodifica em mono float32 na taxa pedida (soundfile + reamostragem polifásica)"""
+    import soundfile as sf
+    from guitarset_zip import open_input
+
+    with open_input(path) as source:  # caminho ou membro de ZIP (guitarset_zip.py)
+        audio, file_sr = sf.read(source, dtype='float32', always_2d=True)
+    audio = audio.mean(axis=1)
+    if file_sr != sr:
+        from fill_note_gaps import shift_resample
+        audio = shift_resample(audio, -12 * np.log2(sr / file_sr))
+    return audio
+
+
+def frame(audio: np.ndarray, frame_length: int, hop_length: int, pad_mode: str = 'constant') -> np.ndarray:
+    """Frames centralizados (frames, frame_length) como view por stride do sinal com padding"""
+    padded = np.pad(audio, frame_length // 2, mode=pad_mode)
+    return sliding_window_view(padded, frame_length)[::hop_length]
+
+
+@lru_cache(maxsize=None)
+def hann_window(n_fft: int) -> np.ndarray:
+    """Hann periódica (igual a scipy.signal.get_window('hann', n_fft))"""
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+
+def stft_magnitude(audio: np.ndarray, n_fft: int = 2048, hop_length: int = 512,
+                   workers: Optional[int] = None) -> np.ndarray:
+    """|STFT| no formato do librosa: (bins, frames)"""
+    frames = frame(np.asarray(audio, dtype=np.float32), n_fft, hop_length)
+    spectrum = scipy.fft.rfft(frames * hann_window(n_fft), axis=-1, workers=workers)
+    return np.abs(spectrum).T
+
+
+def fft_frequencies(sr: int, n_fft: int) -> np.ndarray:
+    return np.linspace(0, sr / 2, 1 + n_fft // 2)
+
+
+def _cached_filterbank(name: str, build):
+    """Carrega o banco de filtros do disco ou calcula e grava (escrita atômica)"""
+    path = CACHE_DIR / f"{name}.npy"
+    if path.exists():
+        return np.load(path)
+    weights = build()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp.npy')
+        np.save(tmp_path, weights)
+        tmp_path.replace(path)
+    except OSError:
+        pass  # Cache é só otimização (ex.: diretório somente leitura)
+    return weights
+
+
+@lru_cache(maxsize=None)
+def chroma_filterbank(sr: int, n_fft: int, n_chroma: int = 12, tuning: float = 0.0) -> np.ndarray:
+    """Filtros de chroma (n_chroma, bins), equivalentes a librosa.filters.chroma"""
+
+    def build():
+        frequencies = np.linspace(0, sr, n_fft, endpoint=False)[1:]
+        a440 = 440.0 * 2.0 ** (tuning / n_chroma)
+        frqbins = n_chroma * np.log2(frequencies / (a440 / 16))
+        frqbins = np.concatenate(([frqbins[0] - 1.5 * n_chroma], frqbins))
+        binwidthbins = np.concatenate((np.maximum(frqbins[1:] - frqbins[:-1], 1.0), [1]))
+
+        distance = np.subtract.outer(frqbins, np.arange(0, n_chroma, dtype='d')).T
+        half = np.round(float(n_chroma) / 2)
+        distance = np.remainder(distance + half + 10 * n_chroma, n_chroma) - half
+
+        weights = np.exp(-0.5 * (2 * distance / binwidthbins) ** 2)
+        weights /= np.maximum(np.sqrt(np.sum(weights ** 2, axis=0, keepdims=True)), np.finfo(float).tiny)
+        # Ênfase gaussiana em torno da oitava 5 (ctroct=5, octwidth=2)
+        weights *= np.exp(-0.5 * ((frqbins / n_chroma - 5.0) / 2) ** 2)
+        # Começar em C
+        weights = np.roll(weights, -3 * (n_chroma // 12), axis=0)
+        return np.ascontiguousarray(weights[:, :1 + n_fft // 2], dtype=np.float32)
+
+    return _cached_filterbank(f"chroma_sr{sr}_n{n_fft}_c{n_chroma}_t{tuning:g}", build)
+
+
+def _hz_to_mel(frequencies):
+    """Escala mel de Slaney (padrão do librosa)"""
+    frequencies = np.asanyarray(frequencies, dtype=np.float64)
+    f_sp = 200.0 / 3
+    mels = frequencies / f_sp
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    log_t = frequencies >= min_log_hz
+    mels[log_t] = min_log_mel + np.log(frequencies[log_t] / min_log_hz) / logstep
+    return mels
+
+
+def _mel_to_hz(mels):
+    mels = np.asanyarray(mels, dtype=np.float64)
+    f_sp = 200.0 / 3
+    freqs = f_sp * mels
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    log_t = mels >= min_log_mel
+    freqs[log_t] = min_log_hz * np.exp(logstep * (mels[log_t] - min_log_mel))
+    return freqs
+
+
+@lru_cache(maxsize=None)
+def mel_filterbank(sr: int, n_fft: int, n_mels: int = 128) -> np.ndarray:
+    """Filtros mel (n_mels, bins), equivalentes a librosa.filters.mel (Slaney, norm='slaney')"""
+
+    def build():
+        fftfreqs = fft_frequencies(sr, n_fft)
+        mel_f = _mel_to_hz(np.linspace(_hz_to_mel(np.array([0.0]))[0], _hz_to_mel(np.array([sr / 2.0]))[0], n_mels + 2))
+        fdiff = np.diff(mel_f)
+        ramps = np.subtract.outer(mel_f, fftfreqs)
+        lower = -ramps[:-2] / fdiff[:-1, None]
+        upper = ramps[2:] / fdiff[1:, None]
+        weights = np.maximum(0, np.minimum(lower, upper))
+        weights *= (2.0 / (mel_f[2:n_mels + 2] - mel_f[:n_mels]))[:, None]
+        return weights.astype(np.float32)
+
+    return _cached_filterbank(f"mel_sr{sr}_n{n_fft}_m{n_mels}", build)
+
+
+def _normalize_max(values: np.ndarray) -> np.ndarray:
+    """Divide cada frame pelo máximo (norm=inf no eixo das bandas); frames nulos ficam intactos"""
+    peak = values.max(axis=0, keepdims=True)
+    return values / np.where(peak < np.finfo(values.dtype).tiny, 1.0, peak)
+
+
+def chroma_stft(magnitude: np.ndarray, sr: int, n_fft: int = 2048, n_chroma: int = 12) -> np.ndarray:
+    return _normalize_max(chroma_filterbank(sr, n_fft, n_chroma) @ magnitude ** 2)
+
+
+def melspectrogram(magnitude: np.ndarray, sr: int, n_fft: int = 2048, n_mels: int = 128) -> np.ndarray:
+    return mel_filterbank(sr, n_fft, n_mels) @ magnitude ** 2
+
+
+def power_to_db(power: np.ndarray, ref=1.0, amin: float = 1e-10, top_db: float = 80.0) -> np.ndarray:
+    ref_value = ref(power) if callable(ref) else ref
+    log_spec = 10.0 * np.log10(np.maximum(amin, power))
+    log_spec -= 10.0 * np.log10(np.maximum(amin, ref_value))
+    return np.maximum(log_spec, log_spec.max() - top_db)
+
+
+def mfcc(magnitude: np.ndarray, sr: int, n_fft: int = 2048, n_mfcc: int = 13, n_mels: int = 128) -> np.ndarray:
+    log_mel = power_to_db(melspectrogram(magnitude, sr, n_fft, n_mels))
+    return scipy.fft.dct(log_mel, axis=0, type=2, norm='ortho')[:n_mfcc]
+
+
+def rms(audio: np.ndarray, frame_length: int = 2048, hop_length: int = 512) -> np.ndarray:
+    frames = frame(np.asarray(audio, dtype=np.float32), frame_length, hop_length)
+    return np.sqrt(np.mean(np.abs(frames) ** 2, axis=-1))
+
+
+def spectral_centroid(magnitude: np.ndarray, sr: int, n_fft: int = 2048) -> np.ndarray:
+    freqs = fft_frequencies(sr, n_fft)[:, None]
+    total = magnitude.sum(axis=0)
+    return (freqs * magnitude).sum(axis=0) / np.where(total > 0, total, 1.0)
+
+
+def spectral_rolloff(magnitude: np.ndarray, sr: int, n_fft: int = 2048, roll_percent: float = 0.85) -> np.ndarray:
+    """Menor frequência cuja energia acumulada atinge roll_percent do total"""
+    cumulative = np.cumsum(magnitude, axis=0)
+    reached = cumulative >= roll_percent * cumulative[-1:]
+    return fft_frequencies(sr, n_fft)[np.argmax(reached, axis=0)]
+
+
+def zero_crossing_rate(audio: np.ndarray, frame_length: int = 2048, hop_length: int = 512,
+                       threshold: float = 1e-10) -> np.ndarray:
+    frames = frame(np.asarray(audio, dtype=np.float32), frame_length, hop_length, pad_mode='edge')
+    signs = np.signbit(np.where(np.abs(frames) <= threshold, 0, frames))
+    crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=-1)
+    return crossings / frame_length
+
+
+def basic_features(audio: np.ndarray, sr: int = 22050, n_fft: int = 2048, hop_length: int = 512,
+                   workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Features de prepare_training_data.extract_features a partir de um único STFT"""
+    magnitude = stft_magnitude(audio, n_fft, hop_length, workers)
+    return {
+        'chroma': chroma_stft(magnitude, sr, n_fft),
+        'rms': rms(audio, n_fft, hop_length),
+        'spectral_centroid': spectral_centroid(magnitude, sr, n_fft),
+        'spectral_rolloff': spectral_rolloff(magnitude, sr, n_fft),
+        'zcr': zero_crossing_rate(audio, n_fft, hop_length),
+    }
+
+
+def librosa_basic_features(audio: np.ndarray, sr: int = 22050, n_fft: int = 2048, hop_length: int = 512,
+                           tuning: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """As mesmas features calculadas pelo librosa (referência)"""
+    import librosa
+
+    return {
+        'chroma': librosa.feature.chroma_stft(y=audio, sr=sr, hop_length=hop_length, n_fft=n_fft, tuning=tuning),
+        'rms': librosa.feature.rms(y=audio, hop_length=hop_length)[0],
+        'spectral_centroid': librosa.feature.spectral_centroid(y=audio, sr=sr, hop_length=hop_length)[0],
+        'spectral_rolloff': librosa.feature.spectral_rolloff(y=audio, sr=sr, hop_length=hop_length)[0],
+        'zcr': librosa.feature.zero_crossing_rate(audio, hop_length=hop_length)[0],
+    }
+
+
+def parity_report(audio: np.ndarray, sr: int = 22050) -> Dict[str, float]:
+    """Erro máximo relativo à escala de cada feature (librosa com tuning=0 como referência)"""
+    reference = librosa_basic_features(audio, sr, tuning=0.0)
+    ours = basic_features(audio, sr)
+    report = {}
+    for name, expected in reference.items():
+        scale = max(float(np.max(np.abs(expected))), 1e-12)
+        report[name] = float(np.max(np.abs(ours[name] - expected))) / scale
+    return report
+
+
+def import_time(statement: str, runs: int = 3) -> float:
+    """Tempo (s) de um processo novo que só executa o import"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Paridade e benchmark do backend NumPy contra o librosa')
+    parser.add_argument('--files', nargs='*', default=[],
+                        help='Arquivos de áudio (padrão: sinal sintético)')
+    parser.add_argument('--segment-seconds', type=float, default=2.0,
+                        help='Duração dos segmentos medidos')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Repetições por segmento no benchmark')
+    args = parser.parse_args()
+
+    sr = 22050
+    segment = int(args.segment_seconds * sr)
+    if args.files:
+        segments = [load_audio(path, sr)[:segment] for path in args.files]
+    else:
+        t = np.arange(segment) / sr
+        rng = np.random.default_rng(0)
+        chord = sum(np.sin(2 * np.pi * f * t) for f in (130.81, 164.81, 196.0))
+        segments = [(chord * np.exp(-t) + 0.01 * rng.standard_normal(segment)).astype(np.float32)]
+
+    print("⏱️ Importação (processo novo):")
+    print(f"   librosa:         {import_time('import librosa') * 1000:.0f} ms")
+    print(f"   feature_backend: {import_time('import feature_backend') * 1000:.0f} ms")
+
+    timings = {}
+    for name, extract in (('librosa', librosa_basic_features), ('numpy', basic_features)):
+        extract(segments[0], sr)  # aquecimento (numba/caches)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for audio in segments:
+                extract(audio, sr)
+        timings[name] = (time.perf_counter() - started) / (args.repeat * len(segments))
+        print(f"   {name}: {timings[name] * 1000:.2f} ms/segmento")
+    print(f"   Aceleração: {timings['librosa'] / timings['numpy']:.1f}x")
+
+    failed = False
+    for index, audio in enumerate(segments):
+        for feature, error in parity_report(audio, sr).items():
+            status = '✅' if error <= PARITY_TOLERANCE else '❌'
+            failed |= error > PARITY_TOLERANCE
+            print(f"   {status} segmento {index} {feature}: erro relativo {error:.2e}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Codecs compactos para as features de treinamento
+================================================
+
+- float32: formato original
+- float16: metade do tamanho; suficiente para chroma em [0, 1] e escalares
+- uint8: quantização linear por coluna, x ≈ offset + código * scale, com
+  offset/scale (mínimo/máximo de cada feature) gravados junto do dataset
+
+Os frames de padding (zeros no fim de cada amostra) não sobrevivem à
+quantização, então o número de frames reais de cada amostra fica em `lengths`
+e a decodificação zera o resto. A decodificação acontece no carregamento
+(train_model.load_training_data).
+
+Auditoria (tamanho, erro de reconstrução e acurácia por codec):
+python feature_codecs.py --data datasets/processed/training_data.npz --epochs 15
+"""
+
+import argparse
+import io
+import json
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+CODECS = ('float32', 'float16', 'uint8')
+
+
+def frame_lengths(X: np.ndarray) -> np.ndarray:
+    """Frames até a última linha não nula de cada amostra (o padding é sempre no fim)"""
+    nonzero = np.any(X != 0, axis=-1)
+    last = X.shape[1] - np.argmax(nonzero[:, ::-1], axis=1)
+    return np.where(nonzero.any(axis=1), last, 0).astype(np.uint16)
+
+
+def encode_features(X: np.ndarray, codec: str = 'float32') -> Tuple[np.ndarray, Dict, Optional[np.ndarray]]:
+    """Retorna (dados codificados, metadados do codec, lengths ou None)"""
+    X = np.asarray(X, dtype=np.float32)
+    if codec == 'float32':
+        return X, {'codec': codec}, None
+    if codec == 'float16':
+        return X.astype(np.float16), {'codec': codec}, None
+    if codec != 'uint8':
+        raise ValueError(f"Codec desconhecido: {codec}")
+
+    # Sequências (amostras, frames, features) têm padding; vetores (amostras, features) não
+    lengths = frame_lengths(X) if X.ndim == 3 else None
+    valid = np.arange(X.shape[1])[None, :] < lengths[:, None] if lengths is not None else np.ones(len(X), dtype=bool)
+    frames = X[valid]
+    offset = frames.min(axis=0) if len(frames) else np.zeros(X.shape[-1], dtype=np.float32)
+    span = (frames.max(axis=0) - offset) if len(frames) else np.ones(X.shape[-1], dtype=np.float32)
+    scale = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+
+    codes = np.clip(np.round((X - offset) / scale), 0, 255).astype(np.uint8)
+    codes[~valid] = 0
+    meta = {'codec': codec, 'offset': offset.tolist(), 'scale': scale.tolist()}
+    return codes, meta, lengths
+
+
+def decode_features(data: np.ndarray, meta: Dict, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+    """Volta para float32 (zerando os frames de padding no uint8)"""
+    codec = meta['codec']
+    if codec in ('float32', 'float16'):
+        return np.asarray(data, dtype=np.float32)
+    if codec != 'uint8':
+        raise ValueError(f"Codec desconhecido: {codec}")
+
+    offset = np.asarray(meta['offset'], dtype=np.float32)
+    scale = np.asarray(meta['scale'], dtype=np.float32)
+    X = offset + data.astype(np.float32) * scale
+    if lengths is not None:
+        X[np.arange(X.shape[1])[None, :] >= np.asarray(lengths)[:, None]] = 0
+    return X
+
+
+def codec_arrays(X: np.ndarray, codec: str) -> Dict[str, np.ndarray]:
+    """Entradas do .npz para X codificado (X, codec e, no uint8, lengths)"""
+    encoded, meta, lengths = encode_features(X, codec)
+    arrays = {'X': encoded, 'codec': json.dumps(meta)}
+    if lengths is not None:
+        arrays['lengths'] = lengths
+    return arrays
+
+
+def load_features(data) -> np.ndarray:
+    """X decodificado de um .npz carregado (datasets sem codec são float32)"""
+    if 'codec' not in data.files:
+        return data['X']
+    lengths = data['lengths'] if 'lengths' in data.files else None
+    return decode_features(data['X'], json.loads(str(data['codec'])), lengths)
+
+
+def compressed_size(arrays: Dict[str, np.ndarray]) -> int:
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getbuffer().nbytes
+
+
+def audit(data_path: str, codecs=CODECS, epochs: int = 15, batch_size: int = 32) -> Dict:
+    """Tamanho, erro de reconstrução e acurácia do mesmo modelo para cada codec"""
+    from calibrate_feature_profiles import train_and_evaluate
+    from prepare_training_data import normalize_features
+
+    data = np.load(data_path, allow_pickle=True)
+    X = load_features(data)
+    y = data['y']
+    num_classes = len(data['chord_vocab'])
+    normalization = json.loads(str(data['normalization'])) if 'normalization' in data.files else None
+
+    report = {}
+    for codec in codecs:
+        encoded, meta, lengths = encode_features(X, codec)
+        decoded = decode_features(encoded, meta, lengths)
+        arrays = {'X': encoded} if lengths is None else {'X': encoded, 'lengths': lengths}
+        error = np.abs(decoded - X)
+        features = normalize_features(decoded, normalization) if normalization else decoded
+
+        print(f"\n🧪 Codec {codec}")
+        metrics = train_and_evaluate(features, y, num_classes, epochs, batch_size, f"models/codec_audit/{codec}")
+        report[codec] = {
+            'size_mb': round(compressed_size(arrays) / (1024 * 1024), 3),
+            'raw_mb': round(arrays['X'].nbytes / (1024 * 1024), 3),
+            'max_abs_error': error.max(axis=(0, 1)).round(6).tolist(),
+            **metrics,
+        }
+
+    baseline = report[codecs[0]]
+    for result in report.values():
+        result['accuracy_delta'] = round(result['accuracy'] - baseline['accuracy'], 4)
+        result['size_ratio'] = round(baseline['size_mb'] / max(result['size_mb'], 1e-9), 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audita tamanho e acurácia dos codecs de features')
+    parser.add_argument('--data', default='datasets/processed/training_data.npz',
+                        help='Dataset de referência')
+    parser.add_argument('--codecs', nargs='+', choices=CODECS, default=list(CODECS),
+                        help='Codecs a comparar (o primeiro é a referência)')
+    parser.add_argument('--epochs', type=int, default=15,
+                        help='Epochs de treinamento por codec')
+    parser.add_argument('--output', default='datasets/processed/codec_audit.json',
+                        help='Relatório JSON')
+    args = parser.parse_args()
+
+    report = audit(args.data, args.codecs, args.epochs)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n📊 Auditoria dos codecs:")
+    for codec, result in report.items():
+        print(f"   {codec:<8} {result['size_mb']:>8.2f} MB ({result['size_ratio']:.1f}x menor)  "
+              f"acurácia {result['accuracy'] * 100:.2f}% ({result['accuracy_delta'] * 100:+.2f}%)")
+    print(f"\n💾 Relatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Preenche notas ausentes da biblioteca de notas com pitch shift offline
+=====================================================================
+
+Compara o manifest de client/public/samples/notes com MIDI_TO_NOTE (E2–A5),
+encontra as alturas sem sample (ex.: F2 descartado pela validação em
+extract_notes.py) e as renderiza a partir do vizinho mais próximo com afinação
+verificada (pitchStatus 'ok' de verify_pitch.py, executado antes se faltar):
+
+- resample: reamostragem polifásica de alta qualidade (muda a duração junto,
+  como uma corda mais curta/longa – natural para notas dedilhadas)
+- vocoder: phase vocoder vetorizado + reamostragem (preserva a duração)
+
+As entradas geradas ficam marcadas no manifest (generated, sourceNote,
+semitoneShift, method), e o cliente toca todas as notas sem DSP em tempo real.
+
+Uso:
+python fill_note_gaps.py --method resample --max-shift 3
+"""
+
+import argparse
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import resample_poly
+
+from music_notes import MIDI_TO_NOTE, note_to_midi
+from sample_manifest import SAMPLES_DIR, load_manifest, save_manifest
+
+NOTES_DIR = SAMPLES_DIR / "notes"
+
+
+def note_file_name(note: str) -> str:
+    """Mesma convenção dos arquivos existentes: A#2 -> Asharp2.wav"""
+    return f"{note.replace('#', 'sharp')}.wav"
+
+
+def shift_resample(audio: np.ndarray, semitones: float) -> np.ndarray:
+    """Pitch shift por reamostragem polifásica (a duração escala junto)"""
+    ratio = Fraction(2 ** (-semitones / 12)).limit_denominator(1000)
+    return resample_poly(audio, ratio.numerator, ratio.denominator, axis=0).astype(np.float32)
+
+
+def phase_vocoder_stretch(audio: np.ndarray, rate: float, n_fft: int = 2048, hop: int = 512) -> np.ndarray:
+    """Time stretch (rate > 1 = mais curto) com phase vocoder; frames processados em bloco"""
+    window = np.hanning(n_fft).astype(np.float64)
+    padded = np.pad(audio.astype(np.float64), (n_fft // 2, n_fft // 2 + n_fft))
+    frames = sliding_window_view(padded, n_fft)[::hop] * window
+    stft = np.fft.rfft(frames, axis=1)
+
+    steps = np.arange(0, len(stft) - 1, rate)
+    base = np.floor(steps).astype(int)
+    frac = (steps - base)[:, None]
+    magnitude = (1 - frac) * np.abs(stft[base]) + frac * np.abs(stft[base + 1])
+
+    # Avanço de fase por bin, com o desvio em relação ao avanço esperado
+    expected = 2 * np.pi * hop * np.arange(stft.shape[1]) / n_fft
+    delta = np.angle(stft[base + 1]) - np.angle(stft[base]) - expected
+    delta -= 2 * np.pi * np.round(delta / (2 * np.pi))
+    phase = np.angle(stft[0]) + np.cumsum(np.vstack([np.zeros((1, stft.shape[1])), (expected + delta)[:-1]]), axis=0)
+
+    frames_out = np.fft.irfft(magnitude * np.exp(1j * phase), n_fft, axis=1) * window
+    length = len(frames_out) * hop + n_fft
+    output = np.zeros(length)
+    norm = np.zeros(length)
+    for i, frame in enumerate(frames_out):
+        output[i * hop:i * hop + n_fft] += frame
+        norm[i * hop:i * hop + n_fft] += window ** 2
+    output /= np.maximum(norm, 1e-8)
+    target = int(round(len(audio) / rate))
+    return output[n_fft // 2:n_fft // 2 + target].astype(np.float32)
+
+
+def shift_vocoder(audio: np.ndarray, semitones: float) -> np.ndarray:
+    """Pitch shift preservando a duração: stretch pelo fator e reamostragem de volta"""
+    factor = 2 ** (semitones / 12)
+    stretched = phase_vocoder_stretch(audio, 1 / factor)
+    shifted = shift_resample(stretched, semitones)
+    return shifted[:len(audio)] if len(shifted) >= len(audio) else np.pad(shifted, (0, len(audio) - len(shifted)))
+
+
+METHODS = {
+    'resample': shift_resample,
+    'vocoder': shift_vocoder,
+}
+
+
+def find_gaps(manifest: Dict) -> List[int]:
+    present = {note_to_midi(name) for name in manifest}
+    return [midi for midi in sorted(MIDI_TO_NOTE) if midi not in present]
+
+
+def unverified_notes(manifest: Dict) -> List[str]:
+    """Notas reais ainda sem resultado de verify_pitch.py"""
+    return [name for name, entry in manifest.items()
+            if note_to_midi(name) is not None and not entry.get('generated') and 'pitchStatus' not in entry]
+
+
+def validated_sources(manifest: Dict, notes_dir: Path) -> Dict[int, str]:
+    """Notas reais (não geradas) com afinação verificada (pitchStatus 'ok') utilizáveis como fonte"""
+    sources = {}
+    for name, entry in manifest.items():
+        midi = note_to_midi(name)
+        if midi is None or entry.get('generated'):
+            continue
+        # Sem verificação não há fonte: uma nota desafinada propagaria o erro
+        if entry.get('pitchStatus') != 'ok':
+            continue
+        if (notes_dir / entry['file']).exists():
+            sources[midi] = name
+    return sources
+
+
+def nearest_source(midi: int, sources: Dict[int, str], max_shift: int) -> Optional[Tuple[str, int]]:
+    """Vizinho mais próximo; em empate prefere a nota abaixo (shift para cima mantém o ataque)"""
+    candidates = sorted(sources, key=lambda m: (abs(m - midi), m > midi))
+    if not candidates or abs(candidates[0] - midi) > max_shift:
+        return None
+    source = candidates[0]
+    return sources[source], midi - source
+
+
+def fill_gaps(notes_dir=NOTES_DIR, method: str = 'resample', max_shift: int = 3) -> Dict:
+    notes_dir = Path(notes_dir)
+    manifest_path = notes_dir / 'manifest.json'
+    manifest = load_manifest(manifest_path)
+
+    if unverified_notes(manifest):
+        # Fontes precisam de pitchStatus: verifica a biblioteca antes de escolher
+        from verify_pitch import verify_library
+
+        print("  🔎 Notas sem verificação de afinação: rodando verify_pitch...")
+        verify_library(notes_dir)
+        manifest = load_manifest(manifest_path)
+
+    gaps = find_gaps(manifest)
+    sources = validated_sources(manifest, notes_dir)
+    shift = METHODS[method]
+
+    # Cada fonte é lida uma única vez, mesmo que gere várias notas
+    plan = {}
+    for midi in gaps:
+        found = nearest_source(midi, sources, max_shift)
+        if found is None:
+            print(f"  ❌ {MIDI_TO_NOTE[midi]}: nenhum vizinho validado a até {max_shift} semitons")
+            continue
+        plan.setdefault(found[0], []).append((midi, found[1]))
+
+    generated = {}
+    for source_name, targets in plan.items():
+        audio, sr = sf.read(str(notes_dir / manifest[source_name]['file']), dtype='float32')
+        for midi, semitones in targets:
+            note = MIDI_TO_NOTE[midi]
+            rendered = shift(audio, semitones)
+            peak = np.max(np.abs(rendered))
+            if peak > 0:
+                rendered = rendered / peak * 0.8
+
+            file_name = note_file_name(note)
+            if (notes_dir / file_name).exists():
+                # Arquivo fora do manifest (não validado): não sobrescrever
+                file_name = file_name.replace('.wav', '_generated.wav')
+            sf.write(str(notes_dir / file_name), rendered, sr)
+            manifest[note] = {
+                'file': file_name,
+                'duration': round(len(rendered) / sr, 3),
+                'generated': True,
+                'sourceNote': source_name,
+                'semitoneShift': semitones,
+                'method': method,
+            }
+            generated[note] = manifest[note]
+            print(f"  ✅ {note}: gerada de {source_name} ({semitones:+d} semitons, {method})")
+
+    save_manifest(manifest_path, manifest)
+    return generated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera notas ausentes por pitch shift dos vizinhos')
+    parser.add_argument('--notes-dir', default=str(NOTES_DIR),
+                        help='Diretório da biblioteca de notas')
+    parser.add_argument('--method', choices=sorted(METHODS), default='resample',
+                        help='Algoritmo de pitch shift')
+    parser.add_argument('--max-shift', type=int, default=3,
+                        help='Distância máxima (semitons) até a nota de origem')
+    args = parser.parse_args()
+
+    print("🎼 Preenchendo notas ausentes...")
+    generated = fill_gaps(args.notes_dir, args.method, args.max_shift)
+    print(f"✅ {len(generated)} notas geradas")
+
+
+if __name__ == "__main__":
+    main()
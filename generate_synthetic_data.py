@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos para o vocabulário estendido de acordes
+===================================================================
+
+O GuitarSet tem poucos exemplos de 6, 9, maj7, mMaj7, m6, m7, sus, aug e dim.
+Este script renderiza voicings desses acordes a partir da biblioteca de notas
+(ou dos voicings dos MIDIs em client/public/midi/chords) com inversão, voicing,
+strum, ganho, ruído e resposta de sala aleatórios, extrai as mesmas features de
+prepare_training_data.py (mesmos --backend/--profile) e grava janelas de tamanho
+fixo direto em shards .npz no formato do training_data.npz (save_training_data:
+feature_config, normalização e codec). Os rótulos usam EXTENDED_CHORD_VOCAB;
+--merge junta os shards com um training_data.npz (vocabulário de 35 acordes, que
+é o início do estendido) em um dataset de treino com o vocabulário estendido.
+
+Cada janela usa um gerador aleatório derivado de (seed, índice global), então o
+resultado é determinístico por seed independentemente do número de processos.
+
+Uso:
+python generate_synthetic_data.py --windows 200000 --shard-size 10000 --seed 42
+python generate_synthetic_data.py --windows 0 --merge datasets/processed/training_data.npz
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from midi_file import MidiNote, read_midi_notes
+from music_notes import PITCH_CLASSES, parse_pitch_class
+from sample_manifest import SAMPLES_DIR
+
+# Intervalos (semitons a partir da tônica) de cada qualidade
+QUALITY_INTERVALS = {
+    '': [0, 4, 7],
+    'm': [0, 3, 7],
+    '7': [0, 4, 7, 10],
+    '6': [0, 4, 7, 9],
+    '9': [0, 4, 7, 10, 14],
+    'maj7': [0, 4, 7, 11],
+    'mMaj7': [0, 3, 7, 11],
+    'm6': [0, 3, 7, 9],
+    'm7': [0, 3, 7, 10],
+    '7sus': [0, 5, 7, 10],
+    'aug': [0, 4, 8],
+    'dim': [0, 3, 6, 9],
+}
+
+# Tessitura do violão na biblioteca de notas (E2–A5)
+LOWEST_NOTE = 40
+HIGHEST_NOTE = 81
+
+
+def chord_voicing(root_pc: int, quality: str, rng: np.random.Generator) -> List[int]:
+    """Voicing aleatório: baixo na região grave, inversão e dobramentos, até 6 notas"""
+    intervals = QUALITY_INTERVALS[quality]
+    bass = LOWEST_NOTE + (root_pc - LOWEST_NOTE) % 12
+    if rng.random() < 0.5 and bass + 12 <= 55:
+        bass += 12
+
+    pitches = [bass + i for i in intervals]
+    inversion = rng.integers(0, len(pitches))
+    pitches = sorted(pitches[inversion:] + [p + 12 for p in pitches[:inversion]])
+
+    # Dobramentos de tônica/quinta uma oitava acima (como em shapes de violão);
+    # a quinta é a da qualidade (aumentada em aug, diminuta em dim)
+    for extra in (bass + 12, bass + 12 + intervals[2], bass + 24):
+        if len(pitches) < 6 and rng.random() < 0.5 and extra not in pitches:
+            pitches.append(extra)
+
+    return sorted(p for p in pitches if LOWEST_NOTE <= p <= HIGHEST_NOTE)
+
+
+def midi_voicings(midi_dir) -> Dict[str, List[List[int]]]:
+    """Voicings dos arquivos MIDI, indexados pelo rótulo do vocabulário estendido"""
+    from convert_midi_to_mp3 import normalize_chord_name
+
+    # Nome do arquivo de sample -> rótulo do vocabulário
+    suffix_labels = {'minMaj7': 'mMaj7'}
+    voicings = {}
+    for path in sorted(Path(midi_dir).glob("*.mid")):
+        name = normalize_chord_name(path.name)
+        root_pc = parse_pitch_class(name)
+        if root_pc is None:
+            continue
+        root_length = 2 if len(name) > 1 and name[1] == '#' else 1
+        suffix = suffix_labels.get(name[root_length:], name[root_length:])
+        if suffix not in QUALITY_INTERVALS:
+            continue
+        pitches = [n.pitch for n in read_midi_notes(path)]
+        voicings.setdefault(PITCH_CLASSES[root_pc] + suffix, []).append(pitches)
+    return voicings
+
+
+def room_impulse(rng: np.random.Generator, sr: int) -> np.ndarray:
+    """Resposta de sala sintética: ruído com decaimento exponencial (RT60 aleatório)"""
+    rt60 = rng.uniform(0.1, 0.8)
+    length = int(rt60 * sr)
+    t = np.arange(length) / sr
+    ir = rng.standard_normal(length)
+    ir *= np.exp(-6.9 * t / rt60)
+    ir[0] = 1.0
+    return (ir / np.sqrt(np.sum(ir ** 2))).astype(np.float32)
+
+
+class SyntheticRenderer:
+    """Renderiza janelas aleatórias (determinísticas por índice) de acordes"""
+
+    def __init__(self, notes_dir, labels: List[str], vocab: List[str], source: str = 'notes',
+                 midi_dir=None, window_seconds: float = 2.4, backend: str = 'librosa',
+                 profile: str = 'default'):
+        from midi_renderer import NoteBank
+        from prepare_training_data import FEATURE_PROFILES
+
+        self.backend = backend
+        self.profile = profile
+        self.sample_rate = FEATURE_PROFILES[profile]['sample_rate']
+        self.bank = NoteBank(notes_dir, self.sample_rate)
+        self.vocab = vocab
+        self.window = int(window_seconds * self.sample_rate)
+        self.voicings = midi_voicings(midi_dir) if source == 'midi' else {}
+        # Com MIDI, só rótulos que têm voicing no diretório
+        self.labels = [l for l in labels if source != 'midi' or l in self.voicings]
+        if not self.labels:
+            raise ValueError("Nenhum rótulo disponível para gerar")
+
+    def render(self, seed: int, index: int) -> Tuple[np.ndarray, str, Dict]:
+        from midi_renderer import finalize, render_notes
+
+        rng = np.random.default_rng([seed, index])
+        label = self.labels[rng.integers(len(self.labels))]
+        root_length = 2 if len(label) > 1 and label[1] == '#' else 1
+        root_pc = PITCH_CLASSES.index(label[:root_length])
+        quality = label[root_length:]
+
+        if self.voicings:
+            options = self.voicings[label]
+            pitches = options[rng.integers(len(options))]
+        else:
+            pitches = chord_voicing(root_pc, quality, rng)
+
+        # Strum: para baixo (grave -> agudo) ou para cima, 5–40 ms entre cordas
+        strum_ms = rng.uniform(5, 40)
+        if rng.random() < 0.3:
+            pitches = pitches[::-1]
+        start = rng.uniform(0, 0.3)
+        notes = [
+            MidiNote(p, int(rng.integers(60, 128)), start + i * strum_ms / 1000, start + 2.0)
+            for i, p in enumerate(pitches)
+        ]
+        audio = render_notes(notes, self.bank, 0.0, 0.1, self.window / self.sample_rate)[:self.window]
+
+        # Sala, ganho e ruído
+        if rng.random() < 0.7:
+            from scipy.signal import fftconvolve
+            audio = fftconvolve(audio, room_impulse(rng, self.sample_rate))[:self.window]
+        audio = finalize(audio.astype(np.float32), self.sample_rate, peak=rng.uniform(0.1, 0.9))
+        snr_db = rng.uniform(10, 50)
+        signal_power = np.mean(audio ** 2) + 1e-12
+        audio = audio + rng.standard_normal(len(audio)).astype(np.float32) * np.sqrt(signal_power / 10 ** (snr_db / 10))
+
+        metadata = {
+            'file': 'synthetic',
+            'chord': label,
+            'seed': seed,
+            'window': index,
+            'pitches': [int(p) for p in pitches],
+            'strum_ms': round(float(strum_ms), 1),
+            'snr_db': round(float(snr_db), 1),
+        }
+        return audio.astype(np.float32), label, metadata
+
+
+_renderer: Optional[SyntheticRenderer] = None
+
+
+def _init_worker(*args):
+    global _renderer
+    _renderer = SyntheticRenderer(*args)
+
+
+def write_shard(job: Dict) -> Dict:
+    """Gera as janelas [start, stop) e grava um shard no formato de save_training_data"""
+    from prepare_training_data import (FEATURE_NAMES, TARGET_TIME_STEPS, extract_features,
+                                       feature_normalization, fit_time_steps, frame_statistics,
+                                       save_training_data, training_feature_config)
+
+    renderer = _renderer
+    features, labels, metadata = [], [], []
+    for index in range(job['start'], job['stop']):
+        audio, label, meta = renderer.render(job['seed'], index)
+        features.append(fit_time_steps(extract_features(audio, renderer.sample_rate, renderer.backend, renderer.profile)))
+        labels.append(renderer.vocab.index(label))
+        metadata.append(meta)
+
+    X = np.array(features, dtype=np.float32).reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES))
+    stats = frame_statistics(X)
+    save_training_data(
+        job['path'], X, np.array(labels, dtype=np.int32), np.array(renderer.vocab, dtype=object), metadata,
+        training_feature_config(renderer.backend, renderer.profile),
+        feature_normalization(stats) if stats.count else None, job['codec']
+    )
+    return {'path': job['path'], 'windows': len(labels)}
+
+
+def merge_synthetic(training_file, shard_dir, output_file) -> Dict:
+    """
+    Junta training_data.npz e os shards sintéticos em um dataset com o
+    vocabulário estendido: rótulos remapeados por nome, normalização recalculada
+    sobre o conjunto e o codec do arquivo de treino.
+    """
+    from feature_codecs import load_features
+    from prepare_training_data import (EXTENDED_CHORD_VOCAB, FEATURE_NAMES, TARGET_TIME_STEPS,
+                                       feature_normalization, frame_statistics, save_training_data)
+
+    shards = sorted(p for p in Path(shard_dir).glob("synthetic_*.npz") if not p.name.endswith('.tmp.npz'))
+    if not shards:
+        raise FileNotFoundError(f"Nenhum shard sintético em {shard_dir}")
+
+    features, labels, metadata = [], [], []
+    feature_config = codec = None
+    for path in [Path(training_file)] + shards:
+        with np.load(path, allow_pickle=True) as data:
+            config = json.loads(str(data['feature_config']))
+            file_codec = json.loads(str(data['codec']))['codec'] if 'codec' in data.files else 'float32'
+            if feature_config is None:
+                feature_config, codec = config, file_codec
+            elif config != feature_config:
+                raise ValueError(f"{path.name} foi gerado com outra configuração de features "
+                                 f"({config} != {feature_config}); use os mesmos --backend/--profile")
+            vocab = list(data['chord_vocab'])
+            missing = sorted(set(vocab) - set(EXTENDED_CHORD_VOCAB))
+            if missing:
+                raise ValueError(f"{path.name}: acordes fora do vocabulário estendido: {missing}")
+            features.extend(load_features(data))
+            labels.extend(EXTENDED_CHORD_VOCAB.index(vocab[label]) for label in data['y'])
+            metadata.extend(data['metadata'])
+        print(f"   {path.name}: {len(labels)} amostras acumuladas")
+
+    X = np.array(features, dtype=np.float32).reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES))
+    y = np.array(labels, dtype=np.int32)
+    normalization = feature_normalization(frame_statistics(X))
+    save_training_data(output_file, X, y, np.array(EXTENDED_CHORD_VOCAB, dtype=object), metadata,
+                       feature_config, normalization, codec)
+    return {'samples': len(y), 'shards': len(shards)}
+
+
+def main():
+    from prepare_training_data import EXTENDED_CHORD_VOCAB, EXTENDED_QUALITIES, FEATURE_PROFILES
+
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos de acordes em shards')
+    parser.add_argument('--output-dir', default='datasets/processed/synthetic',
+                        help='Diretório dos shards')
+    parser.add_argument('--windows', type=int, default=100000,
+                        help='Número total de janelas')
+    parser.add_argument('--shard-size', type=int, default=5000,
+                        help='Janelas por shard')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Seed global (resultado determinístico)')
+    parser.add_argument('--source', choices=['notes', 'midi'], default='notes',
+                        help='Voicings gerados por intervalos ou lidos dos MIDIs')
+    parser.add_argument('--notes-dir', default=str(SAMPLES_DIR / 'notes'),
+                        help='Biblioteca de notas')
+    parser.add_argument('--midi-dir', default=str(SAMPLES_DIR.parent / 'midi' / 'chords'),
+                        help='Diretório dos MIDIs (com --source midi)')
+    parser.add_argument('--qualities', nargs='+', default=EXTENDED_QUALITIES,
+                        help='Qualidades a gerar (use "maj" para tríade maior)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('--backend', choices=['librosa', 'numpy'], default='librosa',
+                        help='Backend de features (o mesmo usado em prepare_training_data.py)')
+    parser.add_argument('--profile', choices=sorted(FEATURE_PROFILES), default='default',
+                        help='Perfil de features (o mesmo usado em prepare_training_data.py)')
+    parser.add_argument('--codec', choices=['float32', 'float16', 'uint8'], default='float32',
+                        help='Armazenamento de X nos shards')
+    parser.add_argument('--merge', default=None, metavar='TRAINING_NPZ',
+                        help='Depois de gerar, junta os shards com este training_data.npz')
+    parser.add_argument('--merged-output', default=None,
+                        help='Saída do --merge (padrão: <training>_extended.npz)')
+    args = parser.parse_args()
+
+    qualities = ['' if q == 'maj' else q for q in args.qualities]
+    labels = [l for l in EXTENDED_CHORD_VOCAB
+              if any(l == r + q for q in qualities for r in PITCH_CLASSES)]
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        {
+            'seed': args.seed,
+            'start': start,
+            'stop': min(start + args.shard_size, args.windows),
+            'path': str(output_dir / f"synthetic_{args.seed}_{start // args.shard_size:05d}.npz"),
+            'codec': args.codec,
+        }
+        for start in range(0, args.windows, args.shard_size)
+    ]
+
+    print(f"🎲 Gerando {args.windows} janelas de {len(labels)} acordes em {len(jobs)} shards...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.notes_dir, labels, EXTENDED_CHORD_VOCAB, args.source, args.midi_dir,
+                  2.4, args.backend, args.profile)
+    ) as pool:
+        total = 0
+        for result in pool.map(write_shard, jobs):
+            total += result['windows']
+            print(f"  💾 {Path(result['path']).name}: {result['windows']} janelas")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total} janelas em {elapsed:.1f}s ({total / max(elapsed, 1e-9) * 3600:,.0f} janelas/hora)")
+
+    if args.merge:
+        training_file = Path(args.merge)
+        merged = Path(args.merged_output) if args.merged_output else \
+            training_file.with_name(f"{training_file.stem}_extended.npz")
+        print(f"\n🧩 Juntando {training_file} e os shards de {output_dir} em {merged}...")
+        result = merge_synthetic(training_file, output_dir, merged)
+        print(f"✅ {result['samples']} amostras ({result['shards']} shards sintéticos)")
+
+
+if __name__ == "__main__":
+    main()
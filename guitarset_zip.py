@@ -0,0 +1,272 @@
+"""
+Acesso direto aos ZIPs do GuitarSet, sem extração.
+
+ZipDataset indexa os membros de um arquivo .zip e devolve ZipMember, que se
+comporta como um caminho para os loaders (name, stem, suffix e open_input):
+- membros armazenados (ZIP_STORED, o caso dos WAVs do GuitarSet) são lidos como
+  uma janela do próprio .zip, com seek e leitura sob demanda (o soundfile
+  decodifica em streaming sem copiar o membro);
+- membros comprimidos (deflate) são descompactados em um buffer limitado em
+  memória, que transborda para um arquivo temporário acima de buffer_bytes.
+
+Quando a extração é desejada, extract_archives extrai vários arquivos em
+paralelo (um job por membro), confere CRC-32 e tamanho de cada membro e só
+renomeia o arquivo final depois da verificação. Arquivos já presentes só são
+pulados se tamanho e CRC-32 (lido do disco) baterem com o membro.
+"""
+import fnmatch
+import io
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+# Membros comprimidos acima disso vão para disco durante a leitura
+BUFFER_BYTES = 64 * 1024 * 1024
+
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')  # zipfile.structFileHeader (30 bytes)
+
+
+class MemberView(io.RawIOBase):
+    """Janela somente leitura [start, start + size) de um arquivo aberto"""
+
+    def __init__(self, file, start: int, size: int):
+        self._file = file
+        self._start = start
+        self._size = size
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = min(max(offset, 0), self._size)
+        return self._position
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self._size - self._position)
+        if count <= 0:
+            return 0
+        data = os.pread(self._file.fileno(), count, self._start + self._position)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+class ZipMember:
+    """Membro de um ZIP, utilizável no lugar de um Path pelos loaders (ver open_input)"""
+
+    def __init__(self, archive_path: Path, info: zipfile.ZipInfo, buffer_bytes: int = BUFFER_BYTES):
+        self.archive_path = Path(archive_path)
+        self.info = info
+        self.buffer_bytes = buffer_bytes
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.info.filename).name
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.info.filename).stem
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.info.filename).suffix
+
+    @property
+    def stored(self) -> bool:
+        return self.info.compress_type == zipfile.ZIP_STORED
+
+    def exists(self) -> bool:
+        return True
+
+    def __str__(self):
+        return f"{self.archive_path}:{self.info.filename}"
+
+    def __repr__(self):
+        return f"ZipMember({str(self)!r})"
+
+    def __lt__(self, other: 'ZipMember'):
+        return (str(self.archive_path), self.info.filename) < (str(other.archive_path), other.info.filename)
+
+    def open(self):
+        """Arquivo binário com seek: janela do .zip (stored) ou buffer limitado (deflate)"""
+        if self.stored:
+            file = open(self.archive_path, 'rb')
+            try:
+                header = _LOCAL_HEADER.unpack(os.pread(file.fileno(), _LOCAL_HEADER.size, self.info.header_offset))
+                if header[0] != zipfile.stringFileHeader:
+                    raise zipfile.BadZipFile(f"Cabeçalho local inválido em {self}")
+                start = self.info.header_offset + _LOCAL_HEADER.size + header[10] + header[11]
+            except Exception:
+                file.close()
+                raise
+            return io.BufferedReader(MemberView(file, start, self.info.file_size), buffer_size=1 << 16)
+
+        # Deflate não tem acesso aleatório: descompacta uma vez (o ZipExtFile confere o CRC no fim)
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.buffer_bytes)
+        with zipfile.ZipFile(self.archive_path) as archive, archive.open(self.info) as source:
+            shutil.copyfileobj(source, buffer, 1 << 20)
+        buffer.seek(0)
+        return buffer
+
+    def verify(self) -> bool:
+        """Confere CRC-32 e tamanho lendo o membro inteiro em streaming"""
+        crc, size = 0, 0
+        with self.open() as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+        return crc == self.info.CRC and size == self.info.file_size
+
+
+class ZipDataset:
+    """Índice dos membros de um ZIP por nome de arquivo (o GuitarSet não repete nomes)"""
+
+    def __init__(self, path, buffer_bytes: int = BUFFER_BYTES):
+        self.path = Path(path)
+        with zipfile.ZipFile(self.path) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+        self.members: Dict[str, ZipMember] = {}
+        for info in infos:
+            member = ZipMember(self.path, info, buffer_bytes)
+            # Ignora metadados do macOS (__MACOSX/._arquivo)
+            if not member.name.startswith('._'):
+                self.members[member.name] = member
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    def glob(self, pattern: str) -> List[ZipMember]:
+        """Membros cujo nome casa com o padrão (em qualquer pasta do ZIP), ordenados"""
+        return sorted(m for name, m in self.members.items() if fnmatch.fnmatch(name, pattern))
+
+    rglob = glob
+
+    def find(self, name: str) -> Optional[ZipMember]:
+        return self.members.get(name)
+
+    def __str__(self):
+        return str(self.path)
+
+
+def open_dataset(path):
+    """Diretório como Path ou arquivo .zip como ZipDataset (mesma interface glob)"""
+    path = Path(path)
+    if path.suffix.lower() == '.zip' and path.is_file():
+        return ZipDataset(path)
+    return path
+
+
+def find_file(source, name: str):
+    """Arquivo `name` de um diretório ou de um ZipDataset (None se não existir)"""
+    if isinstance(source, ZipDataset):
+        return source.find(name)
+    path = Path(source) / name
+    return path if path.exists() else None
+
+
+@contextmanager
+def open_input(path):
+    """Entrada para soundfile/librosa/jams: membro de ZIP vira arquivo aberto; caminho vira str"""
+    if isinstance(path, ZipMember):
+        with path.open() as f:
+            yield f
+    else:
+        yield str(path)
+
+
+_handles = threading.local()
+
+
+def _thread_archive(path: Path) -> zipfile.ZipFile:
+    """Um ZipFile por thread e arquivo: leituras paralelas sem disputar o mesmo handle"""
+    archives = getattr(_handles, 'archives', None)
+    if archives is None:
+        archives = _handles.archives = {}
+    if path not in archives:
+        archives[path] = zipfile.ZipFile(path)
+    return archives[path]
+
+
+def file_crc32(path: Path) -> int:
+    """CRC-32 de um arquivo em disco, lido em blocos"""
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def extract_member(archive_path: Path, info: zipfile.ZipInfo, dest_dir: Path) -> str:
+    """
+    Extrai um membro conferindo CRC-32 e tamanho; 'skipped' se o destino já tem
+    o tamanho e o CRC-32 do membro (arquivo corrompido é extraído de novo)
+    """
+    dest_dir = Path(dest_dir).resolve()
+    target = (dest_dir / info.filename).resolve()
+    if dest_dir not in target.parents:
+        raise zipfile.BadZipFile(f"Caminho fora do destino: {info.filename}")
+    if target.exists() and target.stat().st_size == info.file_size and file_crc32(target) == info.CRC:
+        return 'skipped'
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.part")
+    crc, size = 0, 0
+    with _thread_archive(archive_path).open(info) as source, open(tmp_path, 'wb') as out:
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            out.write(chunk)
+    if crc != info.CRC or size != info.file_size:
+        tmp_path.unlink(missing_ok=True)
+        raise zipfile.BadZipFile(f"{info.filename}: CRC/tamanho não conferem")
+    os.replace(tmp_path, target)
+    return 'extracted'
+
+
+def extract_archives(archives: Dict[Path, Path], workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Extrai {zip: destino} em paralelo (threads; zlib e E/S liberam o GIL), com
+    um job por membro. Membros já extraídos com tamanho e CRC-32 certos são pulados.
+    """
+    jobs = []
+    for archive_path, dest_dir in archives.items():
+        with zipfile.ZipFile(archive_path) as archive:
+            jobs += [(Path(archive_path), info, Path(dest_dir)) for info in archive.infolist() if not info.is_dir()]
+    # Maiores primeiro: o pool termina mais perto do mesmo tempo
+    jobs.sort(key=lambda job: -job[1].file_size)
+
+    counts = {'extracted': 0, 'skipped': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 2)) as pool:
+        futures = {pool.submit(extract_member, *job): job for job in jobs}
+        for future, (archive_path, info, _) in futures.items():
+            try:
+                counts[future.result()] += 1
+            except Exception as e:
+                counts['failed'] += 1
+                print(f"  [AVISO] {archive_path.name}/{info.filename}: {e}")
+    return counts
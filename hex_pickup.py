@@ -0,0 +1,142 @@
+"""
+Caminho multicanal para as gravações hex-pickup do GuitarSet.
+
+Os arquivos audio_hex-pickup_* têm um canal por corda (canal 0 = corda 6/Mi
+grave, canal 5 = corda 1/Mi agudo, na mesma ordem das anotações note_midi).
+Aqui os seis canais são decodificados juntos e um único STFT em lote (frames por
+stride, sem cópias, e uma chamada de rfft no eixo de todos os canais) produz
+chroma, RMS e altura por corda.
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+STRING_COUNT = 6
+
+# Afinação padrão (MIDI) das cordas soltas, na ordem dos canais
+OPEN_STRINGS = (40, 45, 50, 55, 59, 64)
+# Casas alcançáveis acima da corda solta (limita a busca de altura por corda)
+FRET_RANGE = 20
+
+
+def is_hex_file(path) -> bool:
+    return '_hex' in (path.stem if hasattr(path, 'stem') else Path(path).stem)
+
+
+def hex_file_for(file_id: str, hex_dir) -> Optional[Path]:
+    """Arquivo hex de uma gravação (prefere o debleeded _hex_cln)"""
+    hex_dir = Path(hex_dir)
+    for suffix in ('_hex_cln', '_hex'):
+        path = hex_dir / f"{file_id}{suffix}.wav"
+        if path.exists():
+            return path
+    return None
+
+
+def annotation_string(annotation) -> Optional[int]:
+    """Corda (canal) de uma anotação note_midi/pitch_contour do GuitarSet"""
+    try:
+        return int(annotation.annotation_metadata.data_source)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def load_hex(path, sample_rate: int = 44100) -> Tuple[np.ndarray, int]:
+    """Decodifica todos os canais: retorna (canais, amostras) float32"""
+    import soundfile as sf
+    from guitarset_zip import open_input
+
+    with open_input(path) as source:  # caminho ou membro de ZIP (guitarset_zip.py)
+        audio, sr = sf.read(source, dtype='float32', always_2d=True)
+    if sr != sample_rate:
+        from fill_note_gaps import shift_resample
+        # Reamostragem de todos os canais de uma vez (eixo 0 = tempo)
+        audio = shift_resample(audio, -12 * np.log2(sample_rate / sr))
+        sr = sample_rate
+    return np.ascontiguousarray(audio.T), sr
+
+
+def mix_strings(strings: np.ndarray) -> np.ndarray:
+    """
+    Mix mono dos canais por corda (média, na escala de um canal). Só para
+    gravações sem o microfone correspondente: com mono-mic, o mix é o do mic.
+    """
+    return strings.mean(axis=0)
+
+
+def batched_stft(audio: np.ndarray, n_fft: int = 2048, hop_length: int = 512) -> np.ndarray:
+    """
+    STFT de todos os canais em uma chamada: (canais, amostras) ->
+    (canais, frames, bins). Frames centralizados, como no librosa.
+    """
+    audio = np.atleast_2d(audio)
+    padded = np.pad(audio, ((0, 0), (n_fft // 2, n_fft // 2)))
+    frames = sliding_window_view(padded, n_fft, axis=1)[:, ::hop_length]
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+    return np.fft.rfft(frames * window, axis=-1)
+
+
+def chroma_filterbank(sr: int, n_fft: int, fmin: float = 60.0) -> np.ndarray:
+    """Matriz (bins, 12) que soma cada bin na sua classe de altura (A4 = 440 Hz)"""
+    freqs = np.fft.rfftfreq(n_fft, 1 / sr)
+    weights = np.zeros((len(freqs), 12), dtype=np.float32)
+    valid = freqs >= fmin
+    pitch_class = np.round(69 + 12 * np.log2(freqs[valid] / 440.0)).astype(int) % 12
+    weights[np.nonzero(valid)[0], pitch_class] = 1.0
+    return weights
+
+
+def string_features(audio: np.ndarray, sr: int, n_fft: int = 2048, hop_length: int = 512) -> Dict[str, np.ndarray]:
+    """
+    Features por corda a partir de um único STFT em lote:
+    chroma (canais, frames, 12), rms (canais, frames) e pitch (canais, frames,
+    MIDI fracionário; nan em frames silenciosos).
+    """
+    spectrum = np.abs(batched_stft(audio, n_fft, hop_length))
+    power = spectrum ** 2
+
+    chroma = power @ chroma_filterbank(sr, n_fft)
+    chroma /= np.maximum(chroma.max(axis=-1, keepdims=True), 1e-10)
+
+    rms = np.sqrt(power.sum(axis=-1) * 2 / n_fft ** 2)
+
+    # Pico espectral dentro da tessitura de cada corda, com interpolação parabólica
+    freqs = np.fft.rfftfreq(n_fft, 1 / sr)
+    if spectrum.shape[0] > STRING_COUNT:
+        raise ValueError(f"Esperado até {STRING_COUNT} canais, recebido {spectrum.shape[0]}")
+    open_strings = np.array(OPEN_STRINGS[:spectrum.shape[0]])
+    low_hz = 440.0 * 2 ** ((open_strings - 69 - 0.5) / 12)
+    high_hz = 440.0 * 2 ** ((open_strings + FRET_RANGE - 69 + 0.5) / 12)
+    in_range = (freqs >= low_hz[:, None]) & (freqs <= high_hz[:, None])
+    masked = np.where(in_range[:, None, :], spectrum, 0)
+    peak = np.clip(masked.argmax(axis=-1), 1, spectrum.shape[-1] - 2)
+
+    left = np.take_along_axis(spectrum, (peak - 1)[..., None], axis=-1)[..., 0]
+    center = np.take_along_axis(spectrum, peak[..., None], axis=-1)[..., 0]
+    right = np.take_along_axis(spectrum, (peak + 1)[..., None], axis=-1)[..., 0]
+    denominator = left - 2 * center + right
+    offset = np.divide(0.5 * (left - right), denominator, out=np.zeros_like(center), where=denominator != 0)
+    peak_hz = (peak + offset) * sr / n_fft
+
+    pitch = 69 + 12 * np.log2(np.maximum(peak_hz, 1e-6) / 440.0)
+    silent = rms < max(rms.max() * 0.01, 1e-6)
+    pitch[silent] = np.nan
+
+    return {'chroma': chroma, 'rms': rms, 'pitch': pitch}
+
+
+def summarize_strings(features: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """Resumo por corda (média no tempo) para o dataset JSON"""
+    pitch = features['pitch']
+    voiced = ~np.isnan(pitch)
+    median_pitch = [
+        round(float(np.median(p[v])), 2) if v.any() else None
+        for p, v in zip(pitch, voiced)
+    ]
+    return {
+        'string_chroma': features['chroma'].mean(axis=1).round(4).tolist(),
+        'string_rms': features['rms'].mean(axis=1).round(6).tolist(),
+        'string_pitch': median_pitch,
+    }
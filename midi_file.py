@@ -0,0 +1,119 @@
+"""
+Leitor mínimo de arquivos MIDI (Standard MIDI File, formatos 0 e 1).
+
+Extrai apenas o necessário para renderizar acordes: notas com início/fim em
+segundos (respeitando mudanças de tempo), velocity e canal.
+"""
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+
+@dataclass
+class MidiNote:
+    pitch: int
+    velocity: int
+    start: float
+    end: float
+    channel: int = 0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _read_varlen(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def _parse_track(data: bytes):
+    """Eventos (tick absoluto, tipo, canal, a, b) de uma trilha"""
+    events = []
+    pos = 0
+    tick = 0
+    status = 0
+    while pos < len(data):
+        delta, pos = _read_varlen(data, pos)
+        tick += delta
+        byte = data[pos]
+        if byte == 0xFF:
+            meta_type = data[pos + 1]
+            length, pos = _read_varlen(data, pos + 2)
+            if meta_type == 0x51:  # tempo (microssegundos por semínima)
+                events.append((tick, 'tempo', 0, int.from_bytes(data[pos:pos + 3], 'big'), 0))
+            elif meta_type == 0x2F:
+                break
+            pos += length
+            continue
+        if byte in (0xF0, 0xF7):
+            length, pos = _read_varlen(data, pos + 1)
+            pos += length
+            continue
+        if byte & 0x80:
+            status = byte
+            pos += 1
+        kind = status & 0xF0
+        channel = status & 0x0F
+        if kind in (0xC0, 0xD0):
+            pos += 1
+            continue
+        a, b = data[pos], data[pos + 1]
+        pos += 2
+        if kind == 0x90 and b > 0:
+            events.append((tick, 'on', channel, a, b))
+        elif kind == 0x80 or (kind == 0x90 and b == 0):
+            events.append((tick, 'off', channel, a, b))
+    return events
+
+
+def read_midi_notes(path) -> List[MidiNote]:
+    """Lê as notas de um arquivo .mid, ordenadas pelo início"""
+    data = Path(path).read_bytes()
+    if data[:4] != b'MThd':
+        raise ValueError(f"Arquivo MIDI inválido: {path}")
+    header_length = struct.unpack('>I', data[4:8])[0]
+    _, n_tracks, division = struct.unpack('>HHH', data[8:14])
+    if division & 0x8000:
+        raise ValueError(f"Divisão SMPTE não suportada: {path}")
+
+    pos = 8 + header_length
+    events = []
+    for _ in range(n_tracks):
+        if data[pos:pos + 4] != b'MTrk':
+            break
+        length = struct.unpack('>I', data[pos + 4:pos + 8])[0]
+        events.extend(_parse_track(data[pos + 8:pos + 8 + length]))
+        pos += 8 + length
+
+    # Converter ticks em segundos seguindo o mapa de tempo (tempo padrão: 120 bpm)
+    events.sort(key=lambda e: (e[0], e[1] != 'tempo', e[1] == 'on'))
+    tempo = 500000
+    last_tick = 0
+    seconds = 0.0
+    active = {}
+    notes = []
+    for tick, kind, channel, a, b in events:
+        seconds += (tick - last_tick) * tempo / (division * 1_000_000)
+        last_tick = tick
+        if kind == 'tempo':
+            tempo = a
+        elif kind == 'on':
+            active.setdefault((channel, a), []).append((seconds, b))
+        elif kind == 'off' and active.get((channel, a)):
+            start, velocity = active[(channel, a)].pop(0)
+            notes.append(MidiNote(a, velocity, start, seconds, channel))
+
+    # Notas sem note-off terminam no último evento
+    for (channel, pitch), pending in active.items():
+        for start, velocity in pending:
+            notes.append(MidiNote(pitch, velocity, start, max(seconds, start), channel))
+
+    notes.sort(key=lambda n: (n.start, n.pitch))
+    return notes
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Renderizador MIDI baseado em samples (NumPy puro)
+=================================================
+
+Renderiza os .mid de client/public/midi/chords misturando as notas da nossa
+biblioteca (client/public/samples/notes, via manifest), sem FluidSynth nem
+soundfont. Cada nota é posicionada com deslocamento de strum, ganho por velocity
+e release curto, e cada nota é acumulada direto no buffer de saída
+(overlap-add, memória proporcional à duração da saída). A saída segue o formato do SampleExtractor: WAV mono 44.1 kHz,
+pico em 0.8, fades de 10 ms e manifest.json.
+
+Também pode ser usado como biblioteca (NoteBank + render_notes) para gerar
+acompanhamentos de prática.
+
+Uso:
+python midi_renderer.py --output-dir client/public/samples/chords_rendered --strum-ms 25
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+
+from midi_file import MidiNote, read_midi_notes
+from music_notes import note_to_midi
+from sample_manifest import SAMPLES_DIR, library_files, load_manifest, save_manifest
+
+MIDI_DIR = SAMPLES_DIR.parent / "midi" / "chords"
+
+
+class NoteBank:
+    """Notas da biblioteca decodificadas uma única vez, indexadas por número MIDI"""
+
+    def __init__(self, notes_dir=SAMPLES_DIR / "notes", sample_rate: int = 44100):
+        self.notes_dir = Path(notes_dir)
+        self.sample_rate = sample_rate
+        self._samples: Dict[int, np.ndarray] = {}
+        self._shifted: Dict[int, np.ndarray] = {}
+
+        manifest = load_manifest(self.notes_dir / 'manifest.json')
+        files = library_files(self.notes_dir)
+        for name, entry in manifest.items():
+            midi = note_to_midi(name)
+            if midi is None or entry.get('file') not in files:
+                continue
+            self._samples[midi] = self._load(files[entry['file']])
+        if not self._samples:
+            raise ValueError(f"Nenhuma nota utilizável em {self.notes_dir}")
+        self._available = np.array(sorted(self._samples))
+
+    def _load(self, path: Path) -> np.ndarray:
+        audio, sr = sf.read(str(path), dtype='float32', always_2d=True)
+        audio = audio.mean(axis=1)
+        if sr != self.sample_rate:
+            from fill_note_gaps import shift_resample
+            # Reamostragem para a taxa alvo = shift de 12*log2(sr/alvo) semitons
+            audio = shift_resample(audio, -12 * np.log2(self.sample_rate / sr))
+        return audio
+
+    def get(self, midi: int) -> np.ndarray:
+        """Sample da nota; fora da biblioteca, transpõe a nota mais próxima (com cache)"""
+        if midi in self._samples:
+            return self._samples[midi]
+        if midi not in self._shifted:
+            from fill_note_gaps import shift_resample
+            source = int(self._available[np.argmin(np.abs(self._available - midi))])
+            self._shifted[midi] = shift_resample(self._samples[source], midi - source)
+        return self._shifted[midi]
+
+
+def render_notes(
+    notes: Sequence[MidiNote],
+    bank: NoteBank,
+    strum_ms: float = 0.0,
+    release: float = 0.1,
+    total_duration: Optional[float] = None
+) -> np.ndarray:
+    """
+    Mistura as notas em um buffer mono.
+
+    Notas que começam juntas são espalhadas em strum (graves primeiro, strum_ms
+    entre cordas). Cada nota dura até seu note-off + release, limitada ao sample.
+    """
+    sr = bank.sample_rate
+    if not notes:
+        return np.zeros(int((total_duration or 0) * sr), dtype=np.float32)
+
+    # Strum: índice da nota dentro do grupo com o mesmo início
+    starts = np.array([n.start for n in notes])
+    order = np.lexsort(([n.pitch for n in notes], starts))
+    strum_index = np.zeros(len(notes), dtype=int)
+    for pos in range(1, len(order)):
+        prev, cur = order[pos - 1], order[pos]
+        strum_index[cur] = strum_index[prev] + 1 if starts[cur] == starts[prev] else 0
+
+    offsets = np.round((starts + strum_index * strum_ms / 1000) * sr).astype(np.int64)
+    samples = [bank.get(n.pitch) for n in notes]
+    lengths = np.array([
+        min(len(s), int((n.duration + release) * sr)) for s, n in zip(samples, notes)
+    ])
+    gains = np.array([n.velocity / 127 for n in notes], dtype=np.float32)
+
+    total = int((total_duration or 0) * sr)
+    return overlap_add(samples, offsets, lengths, gains, max(1, int(release * sr)), total)
+
+
+def overlap_add(
+    samples: List[np.ndarray],
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    gains: np.ndarray,
+    release_samples: int,
+    total: int = 0
+) -> np.ndarray:
+    """
+    Soma samples[i][:lengths[i]] * gains[i], com release linear nos últimos
+    release_samples, começando em offsets[i]. Cada segmento é acumulado direto
+    no buffer de saída (memória proporcional à saída, não a segmentos x maior segmento).
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    gains = np.asarray(gains, dtype=np.float64)
+
+    total = int(max((offsets + lengths).max(), total)) if len(offsets) else int(total)
+    mix = np.zeros(total, dtype=np.float64)
+    for sample, offset, length, gain in zip(samples, offsets, lengths, gains):
+        length = int(length)
+        envelope = np.clip((length - np.arange(length)) / release_samples, 0, 1)
+        mix[offset:offset + length] += sample[:length] * (envelope * gain)
+    return mix.astype(np.float32)
+
+
+def finalize(audio: np.ndarray, sample_rate: int, peak: float = 0.8) -> np.ndarray:
+    """Normalização e fades iguais aos do SampleExtractor"""
+    max_abs = np.max(np.abs(audio)) if len(audio) else 0
+    if max_abs > 0:
+        audio = audio / max_abs * peak
+    fade_samples = min(int(0.01 * sample_rate), len(audio) // 2)
+    if fade_samples:
+        audio[:fade_samples] *= np.linspace(0, 1, fade_samples)
+        audio[-fade_samples:] *= np.linspace(1, 0, fade_samples)
+    return audio
+
+
+def render_midi_file(path, bank: NoteBank, strum_ms: float = 0.0, release: float = 0.1) -> np.ndarray:
+    return finalize(render_notes(read_midi_notes(path), bank, strum_ms, release), bank.sample_rate)
+
+
+def render_directory(midi_dir, output_dir, bank: NoteBank, strum_ms: float = 25.0, release: float = 0.1) -> Dict:
+    """
+    Renderiza todos os .mid do diretório e escreve os WAVs e o manifest.
+    MIDIs com o mesmo nome normalizado são resolvidos como em
+    convert_midi_to_mp3.py (source_priority).
+    """
+    from convert_midi_to_mp3 import normalize_chord_name, output_file_name, source_priority
+
+    midi_dir = Path(midi_dir)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    sources = {}
+    for midi_path in sorted(midi_dir.glob("*.mid"), key=lambda p: source_priority(p, midi_dir)):
+        chord_name = normalize_chord_name(midi_path.name)
+        if chord_name in sources:
+            print(f"  {chord_name}: usando {sources[chord_name].name} (alias ignorado: {midi_path.name})")
+            continue
+        sources[chord_name] = midi_path
+
+    manifest = {}
+    for chord_name, midi_path in sorted(sources.items()):
+        audio = render_midi_file(midi_path, bank, strum_ms, release)
+        file_name = output_file_name(chord_name, 'wav')
+        sf.write(str(output_dir / file_name), audio, bank.sample_rate)
+        manifest[chord_name] = {
+            'file': file_name,
+            'duration': round(len(audio) / bank.sample_rate, 3),
+        }
+
+    save_manifest(output_dir / 'manifest.json', manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Renderiza acordes MIDI com a biblioteca de notas')
+    parser.add_argument('--midi-dir', default=str(MIDI_DIR),
+                        help='Diretório com arquivos .mid')
+    parser.add_argument('--notes-dir', default=str(SAMPLES_DIR / 'notes'),
+                        help='Biblioteca de notas (com manifest.json)')
+    parser.add_argument('--output-dir', default=str(SAMPLES_DIR / 'chords_rendered'),
+                        help='Diretório de saída')
+    parser.add_argument('--sample-rate', type=int, default=44100,
+                        help='Taxa de amostragem')
+    parser.add_argument('--strum-ms', type=float, default=25.0,
+                        help='Atraso entre cordas no strum (ms)')
+    parser.add_argument('--release', type=float, default=0.1,
+                        help='Release após o note-off (s)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bank = NoteBank(args.notes_dir, args.sample_rate)
+    manifest = render_directory(args.midi_dir, args.output_dir, bank, args.strum_ms, args.release)
+    print(f"✅ {len(manifest)} acordes renderizados em {time.perf_counter() - start:.2f}s -> {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Nomes de notas, números MIDI e frequências compartilhados pelos scripts de samples.
+"""
+import re
+from typing import Optional
+
+# Mapeamento MIDI -> Nome da nota
+MIDI_TO_NOTE = {
+    40: 'E2', 41: 'F2', 42: 'F#2', 43: 'G2', 44: 'G#2', 45: 'A2',
+    46: 'A#2', 47: 'B2', 48: 'C3', 49: 'C#3', 50: 'D3', 51: 'D#3',
+    52: 'E3', 53: 'F3', 54: 'F#3', 55: 'G3', 56: 'G#3', 57: 'A3',
+    58: 'A#3', 59: 'B3', 60: 'C4', 61: 'C#4', 62: 'D4', 63: 'D#4',
+    64: 'E4', 65: 'F4', 66: 'F#4', 67: 'G4', 68: 'G#4', 69: 'A4',
+    70: 'A#4', 71: 'B4', 72: 'C5', 73: 'C#5', 74: 'D5', 75: 'D#5',
+    76: 'E5', 77: 'F5', 78: 'F#5', 79: 'G5', 80: 'G#5', 81: 'A5',
+}
+
+NOTE_TO_MIDI = {name: midi for midi, name in MIDI_TO_NOTE.items()}
+
+PITCH_CLASSES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+FLAT_TO_SHARP = {'Db': 'C#', 'Eb': 'D#', 'Fb': 'E', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#', 'Cb': 'B'}
+
+# Tônica no início do nome (aceita A#, Bb, Asharp, As) e oitava opcional no fim
+NOTE_NAME_PATTERN = re.compile(r'^([A-G])(#|b|sharp|s)?(-?\d+)?')
+
+
+def parse_pitch_class(name: str) -> Optional[int]:
+    """Classe de altura (0-11) da tônica de um nome de nota/acorde: 'A#m7' -> 10"""
+    match = NOTE_NAME_PATTERN.match(name)
+    if not match:
+        return None
+    note = match.group(1)
+    accidental = match.group(2)
+    if accidental in ('#', 'sharp', 's'):
+        note += '#'
+    elif accidental == 'b':
+        note = FLAT_TO_SHARP[note + 'b']
+    return PITCH_CLASSES.index(note)
+
+
+def note_to_midi(name: str) -> Optional[int]:
+    """Número MIDI de um nome de nota com oitava ('A#2', 'Asharp2', 'Bb3'); None se não houver oitava"""
+    match = NOTE_NAME_PATTERN.match(name)
+    if not match or match.group(3) is None:
+        return None
+    return (int(match.group(3)) + 1) * 12 + parse_pitch_class(name)
+
+
+def midi_to_note(midi: int) -> str:
+    return f"{PITCH_CLASSES[midi % 12]}{midi // 12 - 1}"
+
+
+def midi_to_hz(midi: float) -> float:
+    return 440.0 * 2 ** ((midi - 69) / 12)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+musictutor-data: ponto de entrada único do pipeline de dados e treinamento
+=========================================================================
+
+Subcomandos:
+  prepare          GuitarSet -> training_data.npz (prepare_training_data.py)
+  process          GuitarSet + IDMT -> JSON/npz (process_datasets.py)
+  extract-chords   samples de acordes (extract_samples.py)
+  extract-notes    samples de notas (extract_notes.py)
+  manifest         manifest.json de uma biblioteca de samples
+  merge            junta os shards de prepare/process/extract (dataset_shards.py)
+  train            treina o modelo (train_model.py)
+  evaluate         avalia um modelo salvo
+  export           exporta um modelo salvo para TensorFlow.js
+  startup-benchmark  mede o tempo de `--help` (limite: 200 ms)
+
+Este arquivo só importa a biblioteca padrão: librosa, jams, scipy, TensorFlow,
+scikit-learn e matplotlib são carregados dentro do subcomando que precisa deles.
+Os subcomandos encaminhados (prepare, process, merge, train, evaluate, export)
+aceitam os mesmos argumentos do script original.
+
+Uso:
+python musictutor_data.py prepare --output datasets/processed/training_data.npz
+python musictutor_data.py train --epochs 30
+"""
+
+import argparse
+import importlib
+import subprocess
+import sys
+import time
+
+# Subcomando -> (módulo, função main(argv), descrição)
+FORWARDED = {
+    'prepare': ('prepare_training_data', 'main', 'Prepara training_data.npz a partir do GuitarSet'),
+    'process': ('process_datasets', 'main', 'Processa GuitarSet e IDMT-SMT-Guitar'),
+    'merge': ('dataset_shards', 'main', 'Junta os shards de prepare/process/extract'),
+    'train': ('train_model', 'main', 'Treina o modelo de detecção de acordes'),
+    'evaluate': ('train_model', 'evaluate_main', 'Avalia um modelo salvo'),
+    'export': ('train_model', 'export_main', 'Exporta um modelo salvo para TensorFlow.js'),
+}
+
+# Módulos que não podem ser carregados por `--help`
+HEAVY_MODULES = ('numpy', 'scipy', 'librosa', 'jams', 'soundfile', 'tensorflow', 'sklearn', 'matplotlib')
+
+HELP_BUDGET_MS = 200.0
+
+
+def extract_chords(args):
+    from extract_samples import SampleExtractor
+
+    SampleExtractor(
+        audio_dir=args.audio_dir,
+        annot_dir=args.annot_dir,
+        output_dir=args.output_dir,
+        build_sprites=args.sprites,
+        shard_index=args.shard_index,
+        num_shards=args.num_shards,
+        prefetch=args.prefetch,
+        workers=args.workers
+    ).extract_samples()
+
+
+def extract_notes(args):
+    from extract_notes import NoteExtractor
+
+    NoteExtractor(
+        audio_dir=args.audio_dir,
+        annot_dir=args.annot_dir,
+        output_dir=args.output_dir,
+        build_sprites=args.sprites,
+        hex_dir=args.hex_dir,
+        shard_index=args.shard_index,
+        num_shards=args.num_shards,
+        prefetch=args.prefetch,
+        workers=args.workers
+    ).extract_notes()
+
+
+def manifest(args):
+    from create_notes_manifest import create_manifest
+
+    create_manifest(args.library_dir)
+
+
+def startup_benchmark(args) -> int:
+    """Executa `--help` em processos novos e falha se a mediana passar do limite"""
+    command = [sys.executable, __file__, '--help']
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    median = timings[len(timings) // 2]
+
+    # Confere também que nenhum módulo pesado é importado para montar o parser
+    probe = (
+        "import sys, musictutor_data; musictutor_data.build_parser(); "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, '-c', probe], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    print(f"⏱️ --help: mediana {median:.0f} ms em {args.runs} execuções "
+          f"(mín {timings[0]:.0f} ms, máx {timings[-1]:.0f} ms, limite {args.limit_ms:.0f} ms)")
+    if loaded:
+        print(f"❌ Módulos pesados importados no parser: {loaded}")
+        return 1
+    if median > args.limit_ms:
+        print("❌ Tempo de inicialização acima do limite")
+        return 1
+    print("✅ Inicialização dentro do limite")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='musictutor-data',
+        description='Pipeline de dados e treinamento do MusicTutor'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='<comando>')
+
+    # Encaminhados: os argumentos são analisados pelo main() do próprio script
+    for name, (_, _, description) in FORWARDED.items():
+        subparsers.add_parser(name, help=description, add_help=False)
+
+    for name, handler, description, output_dir in (
+        ('extract-chords', extract_chords, 'Extrai samples de acordes do GuitarSet', 'client/public/samples/chords'),
+        ('extract-notes', extract_notes, 'Extrai samples de notas do GuitarSet', 'client/public/samples/notes'),
+    ):
+        command = subparsers.add_parser(name, help=description, description=description)
+        command.add_argument('--audio-dir', default='datasets/audio_mono-mic',
+                             help='Diretório com arquivos de áudio')
+        command.add_argument('--annot-dir', default='datasets/annotations',
+                             help='Diretório com anotações JAMS')
+        command.add_argument('--output-dir', default=output_dir,
+                             help='Diretório de saída')
+        command.add_argument('--sprites', action='store_true',
+                             help='Também gerar o sprite da biblioteca')
+        command.add_argument('--shard-index', type=int, default=0,
+                             help='Shard processado por esta máquina (0 a num-shards - 1)')
+        command.add_argument('--num-shards', type=int, default=1,
+                             help='Total de shards (junte depois com o subcomando merge)')
+        command.add_argument('--prefetch', type=int, default=4,
+                             help='Gravações decodificadas antecipadamente em segundo plano (0 = desligado)')
+        command.add_argument('--workers', type=int, default=0,
+                             help='Processos de análise (só metadados voltam; 0 = no processo principal)')
+        if name == 'extract-notes':
+            command.add_argument('--hex-dir', default=None,
+                                 help='audio_hex-pickup_debleeded (extrai do canal da corda)')
+        command.set_defaults(handler=handler)
+
+    command = subparsers.add_parser('manifest', help='Gera manifest.json de uma biblioteca de samples')
+    command.add_argument('--library-dir', default='client/public/samples/notes',
+                         help='Diretório da biblioteca')
+    command.set_defaults(handler=manifest)
+
+    command = subparsers.add_parser('startup-benchmark', help='Mede o tempo de inicialização do `--help`')
+    command.add_argument('--runs', type=int, default=5,
+                         help='Número de execuções')
+    command.add_argument('--limit-ms', type=float, default=HELP_BUDGET_MS,
+                         help='Limite para a mediana (ms)')
+    command.set_defaults(handler=startup_benchmark)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in FORWARDED:
+        module_name, function, _ = FORWARDED[argv[0]]
+        sys.argv[0] = f"musictutor-data {argv[0]}"
+        getattr(importlib.import_module(module_name), function)(argv[1:])
+        return 0
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 0
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Leitura antecipada (prefetch) de gravações para os scripts de pré-processamento.
+
+PrefetchReader decodifica as próximas `depth` gravações em um pool de threads
+(soundfile e a leitura de disco liberam o GIL) enquanto o processo principal
+calcula as features da atual. A janela é limitada (no máximo `depth`
+gravações decodificadas em memória: backpressure) e a ordem de saída é sempre
+a ordem de entrada. Útil principalmente com o dataset em disco de rede.
+Com executor= a janela usa um pool externo (ex.: processos que calculam as
+features inteiras, ver shared_results.py); com discard=, os resultados que o
+consumidor não chegou a usar (break/erro) são entregues a essa função depois
+de terminarem, para liberar recursos como blocos de memória compartilhada.
+
+    for audio_file, loaded in PrefetchReader(files, load, depth=4):
+        audio = loaded.get()  # já decodificado (ou decodifica de novo se falhou)
+"""
+from collections import deque
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_DEPTH = 4
+
+
+class Prefetched:
+    """Resultado de load(item) decodificado em segundo plano."""
+
+    def __init__(self, future: Future, load: Callable, item):
+        self._future = future
+        self._load = load
+        self._item = item
+
+    def get(self):
+        """
+        Na primeira chamada devolve o resultado antecipado (ou levanta o erro
+        dele); chamadas seguintes decodificam de novo, então retentativas
+        (PreprocessCheckpoint.attempt) não reaproveitam uma leitura que falhou.
+        """
+        if self._future is not None:
+            future, self._future = self._future, None
+            return future.result()
+        return self._load(self._item)
+
+
+class PrefetchReader:
+    """Iterador ordenado de (item, Prefetched) com no máximo `depth` leituras adiante."""
+
+    def __init__(self, items: Iterable, load: Callable, depth: int = DEFAULT_DEPTH,
+                 workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 fallback: Optional[Callable] = None, discard: Optional[Callable] = None):
+        """
+        executor: pool externo (ex.: ProcessPoolExecutor) no lugar das threads
+        próprias; fallback: função usada nas retentativas, no processo atual
+        (padrão: a própria load); discard: chamada com cada resultado não
+        consumido quando a iteração é interrompida.
+        """
+        self.items = items
+        self.load = load
+        self.depth = max(0, depth)
+        self.workers = workers or max(1, min(self.depth, 4))
+        self.executor = executor
+        self.fallback = fallback or load
+        self.discard = discard
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[Tuple[object, Prefetched]]:
+        current = None
+        if self.depth == 0:
+            # Sem prefetch: decodifica na hora, na thread principal
+            try:
+                for item in self.items:
+                    future = Future()
+                    try:
+                        future.set_result(self.load(item))
+                    except Exception as e:
+                        future.set_exception(e)
+                    current = Prefetched(future, self.fallback, item)
+                    yield item, current
+            finally:
+                self._drop([], current)
+            return
+
+        items = iter(self.items)
+        window = deque()
+        pool = self.executor or ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prefetch')
+        try:
+            for item in items:
+                window.append((item, pool.submit(self.load, item)))
+                if len(window) > self.depth:
+                    item, future = window.popleft()
+                    current = Prefetched(future, self.fallback, item)
+                    yield item, current
+            while window:
+                item, future = window.popleft()
+                current = Prefetched(future, self.fallback, item)
+                yield item, current
+        finally:
+            # Consumidor parou no meio (break/erro): descarta as leituras pendentes
+            self._drop([future for _, future in window], current)
+            window.clear()
+            if self.executor is None:
+                pool.shutdown(wait=True)
+
+    def _drop(self, futures: List[Future], current: Optional[Prefetched]):
+        """Cancela as leituras não consumidas; com discard, espera as que já rodam e as entrega"""
+        if current is not None and current._future is not None:
+            # Entregue ao consumidor, mas get() nunca foi chamado
+            futures.append(current._future)
+            current._future = None
+        for future in futures:
+            if future.cancel() or self.discard is None:
+                continue
+            try:
+                result = future.result()
+            except (CancelledError, Exception):
+                continue
+            self.discard(result)
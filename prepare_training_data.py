@@ -4,14 +4,16 @@ Prepara dados de treinamento do GuitarSet para o modelo de detecção de acordes
 Processa os arquivos de áudio e anotações JAMS para criar features e labels.
 """
 
-import librosa
 import numpy as np
-import jams
 from pathlib import Path
 import json
 from collections import defaultdict
 import argparse
-from tqdm import tqdm
+
+from chord_stats import RunningStats
+
+# librosa, jams e tqdm são importados dentro das funções: `--help` e os workers
+# que só usam as constantes não pagam o custo de importação (segundos)
 
 # Mapeamento de acordes do GuitarSet para nosso vocabulário
 CHORD_MAPPING = {
@@ -37,8 +39,40 @@ CHORD_VOCAB = [
     'no_chord'
 ]
 
+# Vocabulário estendido (6, 9, maj7, mMaj7, m6, m7, 7sus, aug, dim) usado pelos dados
+# sintéticos. Fica depois de CHORD_VOCAB para não alterar os índices já treinados.
+EXTENDED_QUALITIES = ['6', '9', 'maj7', 'mMaj7', 'm6', 'm7', '7sus', 'aug', 'dim']
+EXTENDED_CHORD_VOCAB = CHORD_VOCAB + [
+    root + quality
+    for quality in EXTENDED_QUALITIES
+    for root in ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+]
+
+# Janela fixa de features (100 time steps = ~2.3s com hop 512 a 22050 Hz)
+TARGET_TIME_STEPS = 100
+
+# Perfis de features: taxa de decodificação e janela/hop da STFT. O hop em segundos
+# é o mesmo em todos (~23 ms), então TARGET_TIME_STEPS cobre a mesma duração.
+# 'fast' decodifica a 11025 Hz (banda até ~5.5 kHz, suficiente para o chroma) e
+# corta pela metade o custo de decodificação, reamostragem e FFT.
+FEATURE_PROFILES = {
+    'default': {'sample_rate': 22050, 'n_fft': 2048, 'hop_length': 512},
+    'fast': {'sample_rate': 11025, 'n_fft': 1024, 'hop_length': 256},
+}
+
+# Colunas das features: 12 bins de chroma + 4 escalares por frame
+FEATURE_NAMES = [f'chroma_{pc}' for pc in ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']] + [
+    'rms', 'spectral_centroid', 'spectral_rolloff', 'zcr'
+]
+
+# Versão do formato das features: 1 = escalares normalizados por min/max de cada
+# segmento; 2 = escalares brutos + normalização global (média/desvio do corpus)
+FEATURE_VERSION = 2
+
 def extract_chromagram(audio, sr=22050, hop_length=512, n_fft=2048):
     """Extrai cromagrama do áudio"""
+    import librosa
+    
     # Calcular cromagrama usando librosa
     chroma = librosa.feature.chroma_stft(
         y=audio,
@@ -50,58 +84,235 @@ def extract_chromagram(audio, sr=22050, hop_length=512, n_fft=2048):
     # Transpor para formato [time_steps, 12]
     return chroma.T
 
-def extract_features(audio, sr=22050):
-    """Extrai features completas do áudio"""
-    hop_length = 512
-    n_fft = 2048
-    
-    # Cromagrama (12 bins - uma para cada nota)
-    chroma = librosa.feature.chroma_stft(
-        y=audio,
-        sr=sr,
-        hop_length=hop_length,
-        n_fft=n_fft
-    )
+def extract_features(audio, sr=22050, backend='librosa', profile='default'):
+    """Extrai features completas do áudio (backend 'librosa' ou 'numpy', ver feature_backend.py)"""
+    hop_length = FEATURE_PROFILES[profile]['hop_length']
+    n_fft = FEATURE_PROFILES[profile]['n_fft']
     
-    # RMS Energy
-    rms = librosa.feature.rms(y=audio, hop_length=hop_length)[0]
+    # Cromagrama (12 bins), RMS, centroide, rolloff e zero crossing rate
+    if backend == 'numpy':
+        from feature_backend import basic_features
+        raw = basic_features(audio, sr, n_fft, hop_length)
+    else:
+        from feature_backend import librosa_basic_features
+        raw = librosa_basic_features(audio, sr, n_fft, hop_length)
     
-    # Spectral Centroid
-    spectral_centroid = librosa.feature.spectral_centroid(y=audio, sr=sr, hop_length=hop_length)[0]
-    
-    # Spectral Rolloff
-    spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr, hop_length=hop_length)[0]
-    
-    # Zero Crossing Rate
-    zcr = librosa.feature.zero_crossing_rate(audio, hop_length=hop_length)[0]
-    
-    # Normalizar features
-    def normalize(feature):
-        if feature.max() > feature.min():
-            return (feature - feature.min()) / (feature.max() - feature.min())
-        return feature
+    chroma = raw['chroma']
+    rms = raw['rms']
+    spectral_centroid = raw['spectral_centroid']
+    spectral_rolloff = raw['spectral_rolloff']
+    zcr = raw['zcr']
     
     # Combinar features: [time_steps, 12 (chroma) + 4 (outras)]
+    # Os escalares ficam em escala bruta: a normalização é global (ver
+    # normalize_features), então cada frame não depende dos frames futuros
     time_steps = chroma.shape[1]
     features = np.zeros((time_steps, 16))
     
     # Preencher chroma (12 features)
     features[:, :12] = chroma.T
     
-    # Preencher outras features (normalizadas e interpoladas)
-    features[:, 12] = normalize(rms)[:time_steps] if len(rms) >= time_steps else np.pad(normalize(rms), (0, time_steps - len(rms)), 'constant')[:time_steps]
-    features[:, 13] = normalize(spectral_centroid)[:time_steps] if len(spectral_centroid) >= time_steps else np.pad(normalize(spectral_centroid), (0, time_steps - len(spectral_centroid)), 'constant')[:time_steps]
-    features[:, 14] = normalize(spectral_rolloff)[:time_steps] if len(spectral_rolloff) >= time_steps else np.pad(normalize(spectral_rolloff), (0, time_steps - len(spectral_rolloff)), 'constant')[:time_steps]
-    features[:, 15] = normalize(zcr)[:time_steps] if len(zcr) >= time_steps else np.pad(normalize(zcr), (0, time_steps - len(zcr)), 'constant')[:time_steps]
+    # Preencher outras features (alinhadas ao número de frames do chroma)
+    for column, feature in enumerate([rms, spectral_centroid, spectral_rolloff, zcr], start=12):
+        features[:, column] = feature[:time_steps] if len(feature) >= time_steps else np.pad(feature, (0, time_steps - len(feature)), 'constant')
     
     return features
 
-def process_guitarset_dataset(audio_dir, annot_dir, output_file, min_duration=1.0, max_duration=3.0):
-    """Processa dataset GuitarSet e cria arquivo de treinamento"""
+def feature_normalization(stats):
+    """Estatísticas globais (RunningStats dos frames do corpus) no formato exportado"""
+    if stats.count == 0:
+        raise ValueError("Nenhum frame para calcular a normalização")
+    result = stats.to_dict()
+    result['std'] = np.maximum(stats.std, 1e-8).tolist()
+    return {'version': FEATURE_VERSION, 'features': FEATURE_NAMES, **result}
+
+def frame_statistics(X):
+    """RunningStats dos frames reais (linhas não nulas) de cada amostra, em ordem"""
+    stats = RunningStats()
+    for features in X:
+        stats.update_batch(features[np.any(features != 0, axis=1)])
+    return stats
+
+def normalize_features(X, normalization):
+    """
+    Transformação afim fixa (x - média) / desvio, frame a frame. Frames de
+    padding (linhas totalmente nulas) continuam zero.
+    """
+    mean = np.asarray(normalization['mean'], dtype=np.float32)
+    std = np.asarray(normalization['std'], dtype=np.float32)
+    X = np.asarray(X, dtype=np.float32)
+    valid = np.any(X != 0, axis=-1, keepdims=True)
+    return np.where(valid, (X - mean) / std, 0).astype(np.float32)
+
+def fit_time_steps(features, target_time_steps=TARGET_TIME_STEPS):
+    """Pad com zeros ou truncate para o número fixo de time steps"""
+    if features.shape[0] < target_time_steps:
+        # Pad com zeros
+        padding = np.zeros((target_time_steps - features.shape[0], features.shape[1]))
+        features = np.vstack([features, padding])
+    elif features.shape[0] > target_time_steps:
+        # Truncate
+        features = features[:target_time_steps]
+    return features
+
+def load_recording(audio_file, annot_dir, backend='librosa', profile='default'):
+    """
+    Parte de E/S de uma gravação: (anotações de acorde, áudio, sr), ou None se
+    o arquivo não tiver anotação de acordes. audio_file e annot_dir podem ser
+    caminhos ou vir de um ZIP do GuitarSet (ver guitarset_zip.py).
+    """
+    import jams
+    from feature_backend import load_audio
+    from guitarset_zip import find_file, open_input
     
-    audio_dir = Path(audio_dir)
-    annot_dir = Path(annot_dir)
-    output_file = Path(output_file)
+    # Carregar anotação JAMS
+    stem_name = audio_file.stem.replace('_mic', '')
+    jams_path = find_file(annot_dir, f"{stem_name}.jams")
+    
+    if jams_path is None:
+        return None
+    
+    with open_input(jams_path) as source:
+        jam = jams.load(source)
+    chord_ann = jam.search(namespace='chord')
+    
+    if not chord_ann:
+        return None
+    
+    # Carregar áudio
+    sr = FEATURE_PROFILES[profile]['sample_rate']
+    if backend == 'numpy':
+        audio = load_audio(audio_file, sr)
+    else:
+        import librosa
+        with open_input(audio_file) as source:
+            audio, sr = librosa.load(source, sr=sr, mono=True)
+    
+    return chord_ann, audio, sr
+
+def recording_segments(audio_file, recording, min_duration=1.0, max_duration=3.0,
+                       backend='librosa', profile='default'):
+    """Segmentos de acorde de uma gravação já carregada como (features, label, metadata)"""
+    chord_ann, audio, sr = recording
+    samples = []
+    
+    # Processar cada segmento de acorde
+    for ann in chord_ann:
+        for obs in ann.data:
+            chord_jams = obs.value
+            
+            # Mapear acorde
+            if chord_jams not in CHORD_MAPPING:
+                continue
+            
+            chord = CHORD_MAPPING[chord_jams]
+            
+            # Verificar duração
+            duration = obs.duration
+            if duration < min_duration or duration > max_duration:
+                continue
+            
+            # Extrair segmento de áudio
+            start_sample = int(obs.time * sr)
+            end_sample = int((obs.time + duration) * sr)
+            
+            if end_sample > len(audio):
+                continue
+            
+            segment = audio[start_sample:end_sample]
+            
+            # Extrair features
+            features = extract_features(segment, sr, backend, profile)
+            
+            # Pad ou truncate para tamanho fixo (100 time steps = ~2.3s)
+            features = fit_time_steps(features)
+            
+            # Obter label (índice do acorde no vocabulário)
+            if chord not in CHORD_VOCAB:
+                continue
+            
+            samples.append((features, CHORD_VOCAB.index(chord), {
+                'file': audio_file.name,
+                'chord': chord,
+                'time': obs.time,
+                'duration': duration
+            }))
+    
+    return samples
+
+def process_recording(audio_file, annot_dir, min_duration=1.0, max_duration=3.0,
+                      backend='librosa', profile='default'):
+    """Segmentos de uma gravação (None se não tiver anotação de acordes)"""
+    recording = load_recording(audio_file, annot_dir, backend, profile)
+    if recording is None:
+        return None
+    return recording_segments(audio_file, recording, min_duration, max_duration, backend, profile)
+
+# Configuração de cada processo do pool de features (ver _init_recording_worker)
+_RECORDING_WORKER = {}
+
+def _init_recording_worker(annot_dir, min_duration, max_duration, backend, profile):
+    _RECORDING_WORKER.update(annot_dir=annot_dir, min_duration=min_duration, max_duration=max_duration,
+                             backend=backend, profile=profile)
+
+def recording_arrays(audio_file, annot_dir, min_duration=1.0, max_duration=3.0,
+                     backend='librosa', profile='default', share=False):
+    """
+    Segmentos de uma gravação em arrays: {'X', 'labels', 'metadata'} (None se
+    não tiver anotação). Com share=True, X vai para memória compartilhada e só
+    a referência volta pelo pickle (ver shared_results.py).
+    """
+    samples = process_recording(audio_file, annot_dir, min_duration, max_duration, backend, profile)
+    if samples is None:
+        return None
+    X = np.array([features for features, _, _ in samples], dtype=np.float32)
+    X = X.reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES))
+    if share:
+        from shared_results import share_array
+        X = share_array(X)
+    return {'X': X, 'labels': [label for _, label, _ in samples], 'metadata': [meta for _, _, meta in samples]}
+
+def _shared_recording_arrays(audio_file):
+    """recording_arrays no worker, com X em memória compartilhada"""
+    return recording_arrays(audio_file, share=True, **_RECORDING_WORKER)
+
+def process_guitarset_dataset(audio_dir, annot_dir, output_file, min_duration=1.0, max_duration=3.0,
+                              augment_budget=0.0, augment_epoch=0, augment_seed=42,
+                              max_shift=2, workers=None, backend='librosa', profile='default',
+                              codec='float32', shard_index=0, num_shards=1,
+                              resume=False, checkpoint_every=25, retries=1, prefetch=4,
+                              feature_workers=0):
+    """
+    Processa dataset GuitarSet e cria arquivo de treinamento.
+    
+    Com augment_budget > 0, adiciona em média augment_budget variantes por
+    segmento (ver augment_audio.py), sorteadas por (augment_seed, augment_epoch).
+    Com backend='numpy', decodificação e features não usam o librosa.
+    profile escolhe taxa de amostragem e STFT (FEATURE_PROFILES) e fica
+    registrado em feature_config no arquivo de saída. codec define o
+    armazenamento de X (float32, float16 ou uint8, ver feature_codecs.py).
+    Com num_shards > 1, processa só os arquivos do shard shard_index e grava
+    output_file com o sufixo do shard (junte com `dataset_shards.py prepare`).
+    As amostras são gravadas em blocos a cada checkpoint_every arquivos; com
+    resume=True, os arquivos já concluídos são pulados (ver preprocess_checkpoint.py).
+    As próximas `prefetch` gravações são decodificadas em segundo plano
+    enquanto as features da atual são calculadas (ver prefetch_reader.py).
+    Com feature_workers > 0, decodificação e features rodam em um pool de
+    processos que devolve X por memória compartilhada (ver shared_results.py).
+    audio_dir e annot_dir podem ser os ZIPs do GuitarSet, lidos sem extração.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from tqdm import tqdm
+    from dataset_shards import select_shard, shard_path, write_shard_manifest
+    from preprocess_checkpoint import PreprocessCheckpoint
+    from guitarset_zip import find_file, open_dataset
+    from prefetch_reader import PrefetchReader
+    from shared_results import SharedArrays, release_refs
+    
+    # Diretórios ou arquivos .zip (mesma interface glob)
+    audio_dir = open_dataset(audio_dir)
+    annot_dir = open_dataset(annot_dir)
+    output_file = shard_path(output_file, shard_index, num_shards)
     
     # Criar diretório de saída
     output_file.parent.mkdir(parents=True, exist_ok=True)
@@ -111,104 +322,147 @@ def process_guitarset_dataset(audio_dir, annot_dir, output_file, min_duration=1.
     print(f"   Anotações: {annot_dir}")
     print(f"   Saída: {output_file}")
     
-    # Coletar todos os arquivos
-    audio_files = list(audio_dir.glob("*.wav"))
+    # Coletar os arquivos (ordem estável; com shards, só os deste shard)
+    audio_files = select_shard(audio_dir.glob("*.wav"), shard_index, num_shards)
     print(f"   Encontrados {len(audio_files)} arquivos de áudio")
+    if num_shards > 1:
+        print(f"   Shard {shard_index + 1} de {num_shards}")
     
-    # Processar cada arquivo
-    all_features = []
-    all_labels = []
-    all_metadata = []
+    checkpoint = PreprocessCheckpoint(
+        output_file, resume, checkpoint_every, retries,
+        config={'min_duration': min_duration, 'max_duration': max_duration,
+                'backend': backend, 'profile': profile, 'feature_version': FEATURE_VERSION}
+    )
+    remaining = [f for f in audio_files if not checkpoint.is_done(f.name)]
+    if len(remaining) < len(audio_files):
+        print(f"   ⏩ Retomando: {len(audio_files) - len(remaining)} arquivos já concluídos")
+    
+    # Amostras desde o último bloco gravado
+    chunk_features, chunk_labels, chunk_metadata = [], [], []
+    
+    def write_chunk(path):
+        np.savez(
+            path,
+            X=np.array(chunk_features, dtype=np.float32).reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES)),
+            y=np.array(chunk_labels, dtype=np.int32),
+            metadata=np.array(chunk_metadata, dtype=object)
+        )
+    
+    def commit():
+        checkpoint.commit(write_chunk, samples=len(chunk_labels))
+        chunk_features.clear()
+        chunk_labels.clear()
+        chunk_metadata.clear()
+    
+    def process_loaded(audio_file, loaded):
+        recording = loaded.get()
+        if recording is None:
+            return None
+        return recording_segments(audio_file, recording, min_duration, max_duration, backend, profile)
+    
+    def process_shared(audio_file, loaded):
+        result = loaded.get()
+        if result is None:
+            return None
+        # Uma cópia do bloco do worker, desmapeado em seguida (nenhuma view sobrevive)
+        shared = SharedArrays()
+        X = shared.view(result['X']).copy()
+        shared.release()
+        return list(zip(X, result['labels'], result['metadata']))
     
-    chord_stats = defaultdict(int)
     skipped = 0
     
-    for audio_file in tqdm(audio_files, desc="Processando"):
-        try:
-            # Carregar anotação JAMS
-            stem_name = audio_file.stem.replace('_mic', '')
-            jams_path = annot_dir / f"{stem_name}.jams"
-            
-            if not jams_path.exists():
-                skipped += 1
+    if feature_workers > 0:
+        # Gravações inteiras nos workers; volta só a referência ao bloco com X
+        pool = ProcessPoolExecutor(
+            max_workers=feature_workers, initializer=_init_recording_worker,
+            initargs=(annot_dir, min_duration, max_duration, backend, profile)
+        )
+        reader = PrefetchReader(
+            remaining, _shared_recording_arrays, depth=max(prefetch, 2 * feature_workers), executor=pool,
+            fallback=lambda audio_file: recording_arrays(audio_file, annot_dir, min_duration, max_duration,
+                                                         backend, profile),
+            discard=release_refs
+        )
+        process = process_shared
+    else:
+        # E/S (JAMS + decodificação) das próximas gravações em paralelo com as features da atual
+        pool = None
+        reader = PrefetchReader(
+            remaining, lambda audio_file: load_recording(audio_file, annot_dir, backend, profile), depth=prefetch
+        )
+        process = process_loaded
+    recordings = iter(reader)
+    try:
+        for audio_file, loaded in tqdm(recordings, total=len(reader), desc="Processando"):
+            ok, samples = checkpoint.attempt(audio_file.name, process, audio_file, loaded)
+            if not ok:
                 continue
-            
-            jam = jams.load(str(jams_path))
-            chord_ann = jam.search(namespace='chord')
-            
-            if not chord_ann:
+            if samples is None:
                 skipped += 1
-                continue
-            
-            # Carregar áudio
-            audio, sr = librosa.load(audio_file, sr=22050, mono=True)
-            
-            # Processar cada segmento de acorde
-            for ann in chord_ann:
-                for obs in ann.data:
-                    chord_jams = obs.value
-                    
-                    # Mapear acorde
-                    if chord_jams not in CHORD_MAPPING:
-                        continue
-                    
-                    chord = CHORD_MAPPING[chord_jams]
-                    
-                    # Verificar duração
-                    duration = obs.duration
-                    if duration < min_duration or duration > max_duration:
-                        continue
-                    
-                    # Extrair segmento de áudio
-                    start_sample = int(obs.time * sr)
-                    end_sample = int((obs.time + duration) * sr)
-                    
-                    if end_sample > len(audio):
-                        continue
-                    
-                    segment = audio[start_sample:end_sample]
-                    
-                    # Extrair features
-                    features = extract_features(segment, sr)
-                    
-                    # Pad ou truncate para tamanho fixo (100 time steps = ~2.3s)
-                    target_time_steps = 100
-                    if features.shape[0] < target_time_steps:
-                        # Pad com zeros
-                        padding = np.zeros((target_time_steps - features.shape[0], features.shape[1]))
-                        features = np.vstack([features, padding])
-                    elif features.shape[0] > target_time_steps:
-                        # Truncate
-                        features = features[:target_time_steps]
-                    
-                    # Obter label (índice do acorde no vocabulário)
-                    if chord not in CHORD_VOCAB:
-                        continue
-                    
-                    label = CHORD_VOCAB.index(chord)
-                    
-                    # Adicionar aos dados
+            else:
+                for features, label, meta in samples:
+                    chunk_features.append(features)
+                    chunk_labels.append(label)
+                    chunk_metadata.append(meta)
+            if checkpoint.file_done(audio_file.name):
+                commit()
+        commit()
+    finally:
+        # Interrompido no meio: leituras antecipadas não usadas são removidas
+        # antes de encerrar o pool (nada fica em /dev/shm)
+        recordings.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    
+    # Amostras de todos os blocos (desta execução e das anteriores), na ordem dos arquivos
+    names = {f.name for f in audio_files}
+    all_features, all_labels, all_metadata = [], [], []
+    for path in checkpoint.chunk_paths():
+        with np.load(path, allow_pickle=True) as data:
+            for features, label, meta in zip(data['X'], data['y'], data['metadata']):
+                if meta['file'] in names:
                     all_features.append(features)
-                    all_labels.append(label)
-                    all_metadata.append({
-                        'file': audio_file.name,
-                        'chord': chord,
-                        'time': obs.time,
-                        'duration': duration
-                    })
-                    
-                    chord_stats[chord] += 1
-                    
-        except Exception as e:
-            print(f"⚠️ Erro processando {audio_file.name}: {e}")
-            skipped += 1
-            continue
+                    all_labels.append(int(label))
+                    all_metadata.append(meta)
+    order = sorted(range(len(all_metadata)), key=lambda i: all_metadata[i]['file'])
+    all_features = [all_features[i] for i in order]
+    all_labels = [all_labels[i] for i in order]
+    all_metadata = [all_metadata[i] for i in order]
+    segments = [{'path': find_file(audio_dir, meta['file']), **meta} for meta in all_metadata]
+    
+    chord_stats = defaultdict(int)
+    for meta in all_metadata:
+        chord_stats[meta['chord']] += 1
+    
+    # Variantes aumentadas (cacheadas entre execuções)
+    if augment_budget > 0 and segments:
+        from augment_audio import augment_segments
+        
+        print(f"\n🔁 Gerando variantes (orçamento {augment_budget}/segmento, época {augment_epoch})...")
+        aug_features, aug_labels, aug_metadata = augment_segments(
+            segments, CHORD_VOCAB, augment_budget, augment_epoch, augment_seed,
+            max_shift, FEATURE_PROFILES[profile]['sample_rate'], workers=workers, backend=backend, profile=profile
+        )
+        all_features.extend(aug_features)
+        all_labels.extend(aug_labels)
+        all_metadata.extend(aug_metadata)
+        for meta in aug_metadata:
+            chord_stats[meta['chord']] += 1
     
     # Converter para arrays numpy
-    X = np.array(all_features, dtype=np.float32)
+    X = np.array(all_features, dtype=np.float32).reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES))
     y = np.array(all_labels, dtype=np.int32)
     chord_vocab = np.array(CHORD_VOCAB, dtype=object)
     
+    # Média/desvio globais por feature, sobre os frames que o modelo vê
+    # (um shard pode ficar vazio; o merge recalcula sobre o corpus inteiro)
+    stats = frame_statistics(X)
+    if not stats.count and num_shards == 1:
+        raise ValueError(f"Nenhuma amostra extraída de {len(audio_files)} arquivos de áudio "
+                         f"({skipped} pulados); confira --audio-dir e --annot-dir")
+    normalization = feature_normalization(stats) if stats.count else None
+    
     print(f"\n✅ Processamento concluído!")
     print(f"   Total de amostras: {len(X)}")
     print(f"   Shape dos features: {X.shape}")
@@ -220,34 +474,141 @@ def process_guitarset_dataset(audio_dir, annot_dir, output_file, min_duration=1.
         print(f"   ⚠️ {skipped} arquivos pulados")
     
     # Salvar dados
+    feature_config = training_feature_config(backend, profile)
+    save_training_data(output_file, X, y, chord_vocab, all_metadata, feature_config, normalization, codec)
+    if num_shards > 1:
+        write_shard_manifest(output_file, shard_index, num_shards, audio_files,
+                             samples=len(X), skipped=skipped, failed=checkpoint.failed)
+    
+    # Blocos só são apagados quando nenhum arquivo ficou pendente
+    checkpoint.report()
+    if not checkpoint.failed:
+        checkpoint.cleanup()
+    
+    return (normalize_features(X, normalization) if normalization else X), y, chord_vocab
+
+def training_feature_config(backend='librosa', profile='default'):
+    """feature_config gravado com os dados (merges recusam misturar configurações diferentes)"""
+    return {
+        'profile': profile,
+        'backend': backend,
+        'time_steps': TARGET_TIME_STEPS,
+        'feature_version': FEATURE_VERSION,
+        **FEATURE_PROFILES[profile]
+    }
+
+def save_training_data(output_file, X, y, chord_vocab, metadata, feature_config, normalization, codec='float32'):
+    """Grava o .npz de treinamento e as estatísticas de normalização em JSON"""
+    from feature_codecs import codec_arrays
+    
+    output_file = Path(output_file)
     print(f"\n💾 Salvando dados em {output_file}...")
+    # Arquivo temporário + rename: uma queda na gravação não deixa um .npz corrompido
+    tmp_file = output_file.with_name(f"{output_file.stem}.tmp.npz")
     np.savez_compressed(
-        output_file,
-        X=X,
+        tmp_file,
+        **codec_arrays(X, codec),
         y=y,
         chord_vocab=chord_vocab,
-        metadata=all_metadata
+        metadata=metadata,
+        feature_config=json.dumps(feature_config),
+        normalization=json.dumps(normalization)
     )
+    tmp_file.replace(output_file)
+    
+    # Estatísticas também em JSON ao lado do dataset (exportadas com o modelo)
+    stats_file = output_file.with_name(f"{output_file.stem}_feature_stats.json")
+    with open(stats_file, 'w') as f:
+        json.dump(normalization, f, indent=2)
     
     print(f"✅ Dados salvos com sucesso!")
     print(f"   Tamanho do arquivo: {output_file.stat().st_size / (1024*1024):.2f} MB")
+    print(f"   Normalização: {stats_file}")
+
+def merge_training_shards(output_file):
+    """
+    Junta os shards de process_guitarset_dataset no mesmo dataset de uma execução
+    em um único nó: amostras originais na ordem dos arquivos, depois as variantes
+    aumentadas, e normalização recalculada sobre o corpus inteiro. Com codec
+    float32 o resultado é idêntico; float16/uint8 são recodificados a partir dos
+    shards já quantizados.
+    """
+    from dataset_shards import find_shards
+    from feature_codecs import load_features
+    
+    output_file = Path(output_file)
+    shards = find_shards(output_file)
+    print(f"🧩 Juntando {len(shards)} shards em {output_file}...")
     
+    features, labels, metadata = [], [], []
+    feature_config = codec = chord_vocab = None
+    for path in shards:
+        with np.load(path, allow_pickle=True) as data:
+            config = json.loads(str(data['feature_config']))
+            shard_codec = json.loads(str(data['codec']))['codec'] if 'codec' in data.files else 'float32'
+            if feature_config is None:
+                feature_config, codec, chord_vocab = config, shard_codec, data['chord_vocab']
+            elif config != feature_config or shard_codec != codec:
+                raise ValueError(f"{path.name} foi gerado com outra configuração de features")
+            features.extend(load_features(data))
+            labels.extend(data['y'])
+            metadata.extend(data['metadata'])
+        print(f"   {path.name}: {len(labels)} amostras acumuladas")
+    
+    # Mesma ordem da execução em um nó: originais por arquivo, depois variantes por arquivo
+    order = sorted(range(len(metadata)), key=lambda i: ('augmentation' in metadata[i], metadata[i]['file']))
+    X = np.array([features[i] for i in order], dtype=np.float32).reshape(-1, TARGET_TIME_STEPS, len(FEATURE_NAMES))
+    y = np.array([labels[i] for i in order], dtype=np.int32)
+    metadata = [metadata[i] for i in order]
+    
+    normalization = feature_normalization(frame_statistics(X))
+    save_training_data(output_file, X, y, chord_vocab, metadata, feature_config, normalization, codec)
     return X, y, chord_vocab
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Prepara dados de treinamento do GuitarSet')
     parser.add_argument('--audio-dir', default='datasets/audio_mono-mic',
-                       help='Diretório com arquivos de áudio')
+                       help='Diretório com arquivos de áudio (ou audio_mono-mic.zip, lido sem extração)')
     parser.add_argument('--annot-dir', default='datasets/annotations',
-                       help='Diretório com anotações JAMS')
+                       help='Diretório com anotações JAMS (ou annotation.zip)')
     parser.add_argument('--output', default='datasets/processed/training_data.npz',
                        help='Arquivo de saída')
     parser.add_argument('--min-duration', type=float, default=1.0,
                        help='Duração mínima do segmento (segundos)')
     parser.add_argument('--max-duration', type=float, default=3.0,
                        help='Duração máxima do segmento (segundos)')
+    parser.add_argument('--augment-budget', type=float, default=0.0,
+                       help='Variantes aumentadas por segmento nesta época (0 = desligado)')
+    parser.add_argument('--augment-epoch', type=int, default=0,
+                       help='Época do sorteio das variantes')
+    parser.add_argument('--augment-seed', type=int, default=42,
+                       help='Seed do sorteio das variantes')
+    parser.add_argument('--max-shift', type=int, default=2,
+                       help='Pitch shift máximo das variantes (semitons)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processos para o aumento de dados (padrão: número de CPUs)')
+    parser.add_argument('--backend', choices=['librosa', 'numpy'], default='librosa',
+                       help='Backend de features (numpy: sem librosa, ver feature_backend.py)')
+    parser.add_argument('--codec', choices=['float32', 'float16', 'uint8'], default='float32',
+                       help='Armazenamento de X (float16/uint8 reduzem o arquivo 2–4x)')
+    parser.add_argument('--profile', choices=sorted(FEATURE_PROFILES), default='default',
+                       help='Perfil de features (fast: 11025 Hz, ver calibrate_feature_profiles.py)')
+    parser.add_argument('--shard-index', type=int, default=0,
+                       help='Shard processado por esta máquina (0 a num-shards - 1)')
+    parser.add_argument('--num-shards', type=int, default=1,
+                       help='Total de shards (junte depois com dataset_shards.py prepare)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Retoma uma execução interrompida, pulando os arquivos já concluídos')
+    parser.add_argument('--checkpoint-every', type=int, default=25,
+                       help='Arquivos por bloco gravado em disco')
+    parser.add_argument('--retries', type=int, default=1,
+                       help='Novas tentativas por arquivo antes de registrá-lo como falha')
+    parser.add_argument('--prefetch', type=int, default=4,
+                       help='Gravações decodificadas antecipadamente em segundo plano (0 = desligado)')
+    parser.add_argument('--feature-workers', type=int, default=0,
+                       help='Processos que calculam as features (resultados por memória compartilhada; 0 = no processo principal)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("🎸 MusicTutor - Preparação de Dados de Treinamento")
     print("=" * 50)
@@ -258,7 +619,22 @@ def main():
             args.annot_dir,
             args.output,
             args.min_duration,
-            args.max_duration
+            args.max_duration,
+            args.augment_budget,
+            args.augment_epoch,
+            args.augment_seed,
+            args.max_shift,
+            args.workers,
+            args.backend,
+            args.profile,
+            args.codec,
+            args.shard_index,
+            args.num_shards,
+            args.resume,
+            args.checkpoint_every,
+            args.retries,
+            args.prefetch,
+            args.feature_workers
         )
         
         print("\n📊 Estatísticas:")
@@ -272,9 +648,17 @@ def main():
             chord_name = chord_vocab[idx]
             print(f"      {chord_name}: {count} amostras")
         
-        print(f"\n✅ Pronto para treinamento!")
-        print(f"   Execute: python train_model.py --data {args.output}")
+        if args.num_shards > 1:
+            print(f"\n🧩 Shard {args.shard_index} pronto. Depois de todos os shards:")
+            print(f"   Execute: python dataset_shards.py prepare --output {args.output}")
+        else:
+            print(f"\n✅ Pronto para treinamento!")
+            print(f"   Execute: python train_model.py --data {args.output}")
         
+    except ValueError as e:
+        # Dados de entrada inválidos (ex.: nenhuma amostra): mensagem sem traceback
+        print(f"❌ Erro: {e}")
+        raise SystemExit(1)
     except Exception as e:
         print(f"❌ Erro: {e}")
         import traceback
@@ -0,0 +1,131 @@
+"""
+Checkpoint e retomada para execuções longas de pré-processamento.
+
+Os resultados são gravados em blocos (chunks) atômicos a cada N arquivos em
+<saída>.parts/, e um journal (JSON lines) registra quais arquivos cada bloco
+cobre. Com resume=True, arquivos já registrados são pulados e os blocos são
+reaproveitados; um bloco gravado sem entrada no journal (queda no meio do
+commit) é simplesmente refeito. Falhas por arquivo são tentadas de novo e
+registradas em <saída>_errors.jsonl em vez de serem ignoradas em silêncio.
+"""
+import json
+import os
+import shutil
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, List, Set, Tuple
+
+
+class PreprocessCheckpoint:
+    """Journal de progresso, commits atômicos de blocos e log de erros por arquivo."""
+
+    def __init__(self, output_path, resume: bool = False, every: int = 25, retries: int = 1,
+                 suffix: str = '.npz', config: dict = None):
+        output_path = Path(output_path)
+        self.parts_dir = output_path.with_name(f"{output_path.stem}.parts")
+        self.journal_path = self.parts_dir / 'journal.jsonl'
+        self.error_log = output_path.with_name(f"{output_path.stem}_errors.jsonl")
+        self.every = max(1, every)
+        self.retries = max(0, retries)
+        self.suffix = suffix
+
+        if not resume:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+            self.error_log.unlink(missing_ok=True)
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+
+        # Blocos de uma execução com outra configuração não podem ser misturados
+        config_path = self.parts_dir / 'config.json'
+        if config is not None:
+            config = json.loads(json.dumps(config))
+            if config_path.exists():
+                with open(config_path, encoding='utf-8') as f:
+                    if json.load(f) != config:
+                        raise ValueError(f"{self.parts_dir} foi gerado com outra configuração; rode sem --resume")
+            else:
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=2)
+
+        self.chunks: List[str] = []
+        self.completed: Set[str] = set()
+        self.pending: List[str] = []
+        self.failed: List[str] = []
+        if self.journal_path.exists():
+            valid = []
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # linha truncada por uma queda: o bloco dela é refeito
+                    valid.append(line if line.endswith('\n') else line + '\n')
+                    self.chunks.append(entry['chunk'])
+                    self.completed.update(entry['files'])
+            # Reescreve só as entradas válidas para os próximos commits não colarem na linha truncada
+            tmp_path = self.journal_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(valid)
+            os.replace(tmp_path, self.journal_path)
+
+    def is_done(self, file_id: str) -> bool:
+        return file_id in self.completed
+
+    def attempt(self, file_id: str, function: Callable, *args) -> Tuple[bool, object]:
+        """Executa function(*args) com até `retries` novas tentativas; (ok, resultado)"""
+        for attempt in range(1, self.retries + 2):
+            try:
+                return True, function(*args)
+            except Exception as e:
+                self.log_error(file_id, attempt, e)
+                print(f"⚠️ Erro processando {file_id} (tentativa {attempt}/{self.retries + 1}): {e}")
+        self.failed.append(file_id)
+        return False, None
+
+    def log_error(self, file_id: str, attempt: int, error: Exception):
+        entry = {
+            'file': file_id,
+            'attempt': attempt,
+            'error': f"{type(error).__name__}: {error}",
+            'traceback': traceback.format_exc(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with open(self.error_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def file_done(self, file_id: str) -> bool:
+        """Marca o arquivo como concluído (no próximo commit); True se é hora de commitar"""
+        self.pending.append(file_id)
+        return len(self.pending) >= self.every
+
+    def commit(self, write_chunk: Callable[[Path], None], **info):
+        """
+        Grava o bloco com write_chunk(caminho temporário), renomeia de forma
+        atômica e só então registra os arquivos pendentes no journal.
+        """
+        if not self.pending:
+            return
+        name = f"chunk-{len(self.chunks):05d}{self.suffix}"
+        tmp_path = self.parts_dir / f"chunk-{len(self.chunks):05d}.tmp{self.suffix}"
+        write_chunk(tmp_path)
+        os.replace(tmp_path, self.parts_dir / name)
+
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'chunk': name, 'files': self.pending, **info}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.chunks.append(name)
+        self.completed.update(self.pending)
+        self.pending = []
+
+    def chunk_paths(self) -> List[Path]:
+        return [self.parts_dir / name for name in self.chunks]
+
+    def cleanup(self):
+        """Remove blocos e journal depois que a saída final foi gravada"""
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+    def report(self):
+        if self.failed:
+            print(f"   ❌ {len(self.failed)} arquivos falharam (detalhes em {self.error_log}); "
+                  f"rode de novo com --resume para tentar só eles")
@@ -17,17 +17,32 @@ python process_datasets.py
 import os
 import json
 import numpy as np
-import librosa
-import scipy.signal
 from pathlib import Path
 import argparse
 from typing import Dict, List, Tuple, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+from dataset_shards import find_shards, select_shard, shard_path, stable_hash, write_shard_manifest
+from prefetch_reader import PrefetchReader
+from preprocess_checkpoint import PreprocessCheckpoint
+
+# Ordem dos datasets na saída (a mesma do main, usada também no merge dos shards)
+SOURCES = ('GuitarSet', 'IDMT-SMT-Guitar')
+
 class DatasetProcessor:
-    def __init__(self, base_dir: str = "datasets"):
+    def __init__(self, base_dir: str = "datasets", backend: str = "librosa",
+                 shard_index: int = 0, num_shards: int = 1):
         self.base_dir = Path(base_dir)
+        self.backend = backend  # 'librosa' ou 'numpy' (feature_backend.py, sem librosa)
+        # Com num_shards > 1, só os arquivos do shard (hash estável do nome)
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.processed_files: List[Path] = []
+        # PreprocessCheckpoint opcional (blocos periódicos, --resume e log de erros)
+        self.checkpoint = None
+        # Arquivos decodificados antecipadamente em segundo plano (prefetch_reader.py)
+        self.prefetch = 4
         self.sample_rate = 22050  # Reduzido para processamento mais rápido
         self.hop_length = 512
         self.n_fft = 2048
@@ -52,53 +67,49 @@ class DatasetProcessor:
             print("❌ Diretório GuitarSet/audio não encontrado")
             return []
 
-        samples = []
-
-        # Estrutura: audio/player_style/chord_file.wav
-        for audio_file in audio_dir.rglob("*.wav"):
-            try:
-                # Extrair informações do nome do arquivo
-                parts = audio_file.stem.split('_')
-                if len(parts) < 3:
-                    continue
-
-                player, chord, style = parts[0], parts[1], parts[2]
-
-                # Carregar áudio
-                audio, sr = librosa.load(audio_file, sr=self.sample_rate, mono=True)
-
-                # Extrair features
-                features = self.extract_features(audio)
-
-                # Criar sample
-                sample = {
-                    'id': f'GuitarSet_{player}_{chord}_{style}',
-                    'chord': chord,
-                    'instrument': 'guitar',
-                    'quality': 'studio',
-                    'audio_file': str(audio_file),
-                    'duration': len(audio) / self.sample_rate,
-                    'features': features,
-                    'metadata': {
-                        'player': player,
-                        'style': style,
-                        'sample_rate': sr,
-                        'source': 'GuitarSet'
-                    }
-                }
-
-                samples.append(sample)
-
-                if len(samples) % 50 == 0:
-                    print(f"📊 Processados: {len(samples)} arquivos")
-
-            except Exception as e:
-                print(f"⚠️ Erro processando {audio_file}: {e}")
-                continue
+        # Estrutura: audio/player_style/chord_file.wav (nomes fora do padrão nem são decodificados)
+        audio_files = select_shard(audio_dir.rglob("*.wav"), self.shard_index, self.num_shards)
+        audio_files = [f for f in audio_files if len(f.stem.split('_')) >= 3]
+        samples = self.process_files(audio_files, self.guitarset_sample, progress_every=50)
 
         print(f"✅ GuitarSet: {len(samples)} amostras processadas")
         return samples
 
+    def guitarset_sample(self, audio_file: Path, loaded=None) -> Optional[Dict]:
+        """
+        Amostra de um arquivo do GuitarSet (None se o nome não segue
+        player_chord_style). loaded é o áudio já decodificado pelo PrefetchReader.
+        """
+        # Extrair informações do nome do arquivo
+        parts = audio_file.stem.split('_')
+        if len(parts) < 3:
+            return None
+
+        player, chord, style = parts[0], parts[1], parts[2]
+
+        # Carregar áudio
+        audio, sr = loaded.get() if loaded is not None else self.load_audio(audio_file)
+
+        # Extrair features
+        features = self.extract_features(audio)
+
+        # Criar sample
+        return {
+            'id': f'GuitarSet_{player}_{chord}_{style}',
+            'chord': chord,
+            'instrument': 'guitar',
+            'quality': 'studio',
+            'audio_file': str(audio_file),
+            'duration': len(audio) / self.sample_rate,
+            'features': features,
+            'metadata': {
+                'player': player,
+                'style': style,
+                'sample_rate': sr,
+                'source': 'GuitarSet'
+            }
+        }
+
     def process_idmt_guitar(self) -> List[Dict]:
         """Processa o dataset IDMT-SMT-Guitar"""
         print("🎸 Processando IDMT-SMT-Guitar...")
@@ -109,112 +120,139 @@ class DatasetProcessor:
             print("❌ Diretório IDMT-Guitar não encontrado")
             return []
 
-        samples = []
-
         # Procurar por arquivos WAV
-        for audio_file in dataset_dir.rglob("*.wav"):
-            try:
-                # Extrair informações do arquivo
-                # Formato típico: guitar_XXX.wav ou variações
-                filename = audio_file.stem
-
-                # Tentar extrair informações do nome
-                # Nota: pode precisar ajustar baseado na estrutura real
-                chord = self.infer_chord_from_filename(filename)
-
-                # Carregar áudio
-                audio, sr = librosa.load(audio_file, sr=self.sample_rate, mono=True)
-
-                # Extrair features
-                features = self.extract_features(audio)
-
-                sample = {
-                    'id': f'IDMT_{filename}',
-                    'chord': chord,
-                    'instrument': 'guitar',
-                    'quality': 'mixed',
-                    'audio_file': str(audio_file),
-                    'duration': len(audio) / self.sample_rate,
-                    'features': features,
-                    'metadata': {
-                        'filename': filename,
-                        'sample_rate': sr,
-                        'source': 'IDMT-SMT-Guitar'
-                    }
-                }
+        audio_files = select_shard(dataset_dir.rglob("*.wav"), self.shard_index, self.num_shards)
+        samples = self.process_files(audio_files, self.idmt_sample, progress_every=100)
 
-                samples.append(sample)
+        print(f"✅ IDMT-Guitar: {len(samples)} amostras processadas")
+        return samples
 
-                if len(samples) % 100 == 0:
-                    print(f"📊 Processados: {len(samples)} arquivos")
+    def idmt_sample(self, audio_file: Path, loaded=None) -> Dict:
+        """Amostra de um arquivo do IDMT-SMT-Guitar (loaded: áudio já decodificado)"""
+        # Extrair informações do arquivo
+        # Formato típico: guitar_XXX.wav ou variações
+        filename = audio_file.stem
+
+        # Tentar extrair informações do nome
+        # Nota: pode precisar ajustar baseado na estrutura real
+        chord = self.infer_chord_from_filename(filename)
+
+        # Carregar áudio
+        audio, sr = loaded.get() if loaded is not None else self.load_audio(audio_file)
+
+        # Extrair features
+        features = self.extract_features(audio)
+
+        return {
+            'id': f'IDMT_{filename}',
+            'chord': chord,
+            'instrument': 'guitar',
+            'quality': 'mixed',
+            'audio_file': str(audio_file),
+            'duration': len(audio) / self.sample_rate,
+            'features': features,
+            'metadata': {
+                'filename': filename,
+                'sample_rate': sr,
+                'source': 'IDMT-SMT-Guitar'
+            }
+        }
 
-            except Exception as e:
-                print(f"⚠️ Erro processando {audio_file}: {e}")
+    def process_files(self, audio_files: List[Path], make_sample, progress_every: int = 50) -> List[Dict]:
+        """
+        Aplica make_sample(arquivo, áudio antecipado) a cada arquivo, decodificando
+        os próximos em segundo plano. Com checkpoint, pula os arquivos já
+        concluídos, grava blocos periódicos e tenta de novo os que falharem.
+        """
+        self.processed_files.extend(audio_files)
+        if self.checkpoint is None:
+            samples = []
+            for audio_file, loaded in PrefetchReader(audio_files, self.load_audio, self.prefetch):
+                try:
+                    sample = make_sample(audio_file, loaded)
+                except Exception as e:
+                    print(f"⚠️ Erro processando {audio_file}: {e}")
+                    continue
+                if sample is not None:
+                    samples.append(sample)
+                    if len(samples) % progress_every == 0:
+                        print(f"📊 Processados: {len(samples)} arquivos")
+            return samples
+
+        checkpoint = self.checkpoint
+        chunk = []
+
+        def write_chunk(path):
+            with open(path, 'w') as f:
+                json.dump(chunk, f)
+
+        def commit():
+            checkpoint.commit(write_chunk, samples=len(chunk))
+            chunk.clear()
+
+        remaining = [f for f in audio_files if not checkpoint.is_done(str(f))]
+        if len(remaining) < len(audio_files):
+            print(f"⏩ Retomando: {len(audio_files) - len(remaining)} arquivos já concluídos")
+        for audio_file, loaded in PrefetchReader(remaining, self.load_audio, self.prefetch):
+            ok, sample = checkpoint.attempt(str(audio_file), make_sample, audio_file, loaded)
+            if not ok:
                 continue
-
-        print(f"✅ IDMT-Guitar: {len(samples)} amostras processadas")
+            if sample is not None:
+                chunk.append(sample)
+            if checkpoint.file_done(str(audio_file)):
+                commit()
+                print(f"📊 Processados: {len(checkpoint.completed)} arquivos (bloco salvo)")
+        commit()
+
+        # Amostras de todos os blocos (desta execução e das anteriores), na ordem dos arquivos
+        wanted = {str(f) for f in audio_files}
+        samples = []
+        for path in checkpoint.chunk_paths():
+            with open(path) as f:
+                samples.extend(s for s in json.load(f) if s['audio_file'] in wanted)
+        samples.sort(key=lambda s: Path(s['audio_file']))
         return samples
 
+    def load_audio(self, audio_file: Path) -> Tuple[np.ndarray, int]:
+        """Decodifica em mono na taxa do processador"""
+        if self.backend == 'numpy':
+            from feature_backend import load_audio
+            return load_audio(audio_file, self.sample_rate), self.sample_rate
+        import librosa
+        return librosa.load(audio_file, sr=self.sample_rate, mono=True)
+
+    def extract_features_numpy(self, audio: np.ndarray) -> Dict:
+        """Mesmas features de extract_features, calculadas com feature_backend (um único STFT)"""
+        import feature_backend as fb
+
+        magnitude = fb.stft_magnitude(audio, self.n_fft, self.hop_length)
+        return {
+            'chroma': fb.chroma_stft(magnitude, self.sample_rate, self.n_fft, self.n_chroma),
+            'mel_spectrogram': fb.power_to_db(
+                fb.melspectrogram(magnitude, self.sample_rate, self.n_fft, self.n_mels), ref=np.max
+            ),
+            'mfcc': fb.mfcc(magnitude, self.sample_rate, self.n_fft, 13),
+            'spectral_centroid': fb.spectral_centroid(magnitude, self.sample_rate, self.n_fft)[None, :],
+            'rms': fb.rms(audio, self.n_fft, self.hop_length)[None, :],
+            'zcr': fb.zero_crossing_rate(audio, self.n_fft, self.hop_length)[None, :],
+        }
+
     def extract_features(self, audio: np.ndarray) -> Dict:
         """Extrai features do áudio para treinamento"""
         try:
-            # Cromagrama (12 bins para notas musicais)
-            chroma = librosa.feature.chroma_stft(
-                y=audio,
-                sr=self.sample_rate,
-                n_fft=self.n_fft,
-                hop_length=self.hop_length,
-                n_chroma=self.n_chroma
-            )
-
-            # Mel spectrogram
-            mel_spec = librosa.feature.melspectrogram(
-                y=audio,
-                sr=self.sample_rate,
-                n_fft=self.n_fft,
-                hop_length=self.hop_length,
-                n_mels=self.n_mels
-            )
-            mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-
-            # MFCCs
-            mfccs = librosa.feature.mfcc(
-                y=audio,
-                sr=self.sample_rate,
-                n_mfcc=13,
-                n_fft=self.n_fft,
-                hop_length=self.hop_length
-            )
-
-            # Spectral centroid
-            spectral_centroid = librosa.feature.spectral_centroid(
-                y=audio,
-                sr=self.sample_rate,
-                n_fft=self.n_fft,
-                hop_length=self.hop_length
-            )
-
-            # RMS energy
-            rms = librosa.feature.rms(
-                y=audio,
-                frame_length=self.n_fft,
-                hop_length=self.hop_length
-            )
-
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(
-                y=audio,
-                frame_length=self.n_fft,
-                hop_length=self.hop_length
-            )
+            if self.backend == 'numpy':
+                raw = self.extract_features_numpy(audio)
+            else:
+                raw = self.extract_features_librosa(audio)
+            chroma = raw['chroma']
 
             return {
                 'chroma': chroma.T.tolist(),  # [time, 12]
-                'mel_spectrogram': mel_spec_db.T.tolist(),  # [time, 128]
-                'mfcc': mfccs.T.tolist(),  # [time, 13]
-                'spectral_centroid': spectral_centroid.T.tolist(),  # [time, 1]
-                'rms': rms.T.tolist(),  # [time, 1]
-                'zcr': zcr.T.tolist(),  # [time, 1]
+                'mel_spectrogram': raw['mel_spectrogram'].T.tolist(),  # [time, 128]
+                'mfcc': raw['mfcc'].T.tolist(),  # [time, 13]
+                'spectral_centroid': raw['spectral_centroid'].T.tolist(),  # [time, 1]
+                'rms': raw['rms'].T.tolist(),  # [time, 1]
+                'zcr': raw['zcr'].T.tolist(),  # [time, 1]
                 'shape': {
                     'time_steps': chroma.shape[1],
                     'chroma_bins': self.n_chroma,
@@ -227,6 +265,69 @@ class DatasetProcessor:
             print(f"❌ Erro extraindo features: {e}")
             return {}
 
+    def extract_features_librosa(self, audio: np.ndarray) -> Dict:
+        """Features calculadas pelo librosa (backend padrão)"""
+        import librosa
+
+        # Cromagrama (12 bins para notas musicais)
+        chroma = librosa.feature.chroma_stft(
+            y=audio,
+            sr=self.sample_rate,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length,
+            n_chroma=self.n_chroma
+        )
+
+        # Mel spectrogram
+        mel_spec = librosa.feature.melspectrogram(
+            y=audio,
+            sr=self.sample_rate,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length,
+            n_mels=self.n_mels
+        )
+        mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
+
+        # MFCCs
+        mfccs = librosa.feature.mfcc(
+            y=audio,
+            sr=self.sample_rate,
+            n_mfcc=13,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length
+        )
+
+        # Spectral centroid
+        spectral_centroid = librosa.feature.spectral_centroid(
+            y=audio,
+            sr=self.sample_rate,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length
+        )
+
+        # RMS energy
+        rms = librosa.feature.rms(
+            y=audio,
+            frame_length=self.n_fft,
+            hop_length=self.hop_length
+        )
+
+        # Zero crossing rate
+        zcr = librosa.feature.zero_crossing_rate(
+            y=audio,
+            frame_length=self.n_fft,
+            hop_length=self.hop_length
+        )
+
+        return {
+            'chroma': chroma,
+            'mel_spectrogram': mel_spec_db,
+            'mfcc': mfccs,
+            'spectral_centroid': spectral_centroid,
+            'rms': rms,
+            'zcr': zcr,
+        }
+
     def infer_chord_from_filename(self, filename: str) -> str:
         """Tenta inferir o acorde do nome do arquivo"""
         # Mapeamentos simples baseados em padrões comuns
@@ -244,8 +345,9 @@ class DatasetProcessor:
             if pattern in filename_lower:
                 return chord
 
-        # Fallback para acorde aleatório comum
-        return np.random.choice(['C', 'D', 'E', 'G', 'A', 'Am', 'Em', 'Dm'])
+        # Fallback para um acorde comum, escolhido pelo hash do nome (estável entre execuções e shards)
+        fallback = ['C', 'D', 'E', 'G', 'A', 'Am', 'Em', 'Dm']
+        return fallback[stable_hash(filename) % len(fallback)]
 
     def save_processed_data(self, samples: List[Dict], output_file: str):
         """Salva dados processados em formato JSON"""
@@ -263,7 +365,7 @@ class DatasetProcessor:
         metadata = {
             'total_samples': len(samples),
             'unique_chords': len(set(chords)),
-            'chord_distribution': dict(zip(*np.unique(chords, return_counts=True))),
+            'chord_distribution': {str(c): int(n) for c, n in zip(*np.unique(chords, return_counts=True))},
             'instruments': list(set(instruments)),
             'qualities': list(set(qualities)),
             'processing_date': str(np.datetime64('now')),
@@ -272,7 +374,8 @@ class DatasetProcessor:
                 'hop_length': self.hop_length,
                 'n_fft': self.n_fft,
                 'n_mels': self.n_mels,
-                'n_chroma': self.n_chroma
+                'n_chroma': self.n_chroma,
+                'backend': self.backend
             }
         }
 
@@ -281,8 +384,11 @@ class DatasetProcessor:
             'samples': samples
         }
 
-        with open(output_file, 'w') as f:
+        # Arquivo temporário + rename: uma queda na gravação não deixa um JSON truncado
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=2)
+        tmp_path.replace(output_path)
 
         print(f"✅ Dados salvos: {output_file}")
 
@@ -319,18 +425,96 @@ class DatasetProcessor:
 
         return X, y
 
-def main():
+def write_training_outputs(processor: DatasetProcessor, samples: List[Dict], output_dir: str, codec: str = 'float32'):
+    """Grava o JSON processado e o training_data.npz a partir das amostras"""
+    output_file = f"{output_dir}/musictutor_training_data.json"
+    processor.save_processed_data(samples, output_file)
+
+    # Preparar dados para treinamento
+    try:
+        X, y = processor.prepare_training_data(samples)
+
+        # Salvar em formato numpy para uso posterior
+        from feature_codecs import codec_arrays
+        np.savez(f"{output_dir}/training_data.npz", **codec_arrays(X, codec),
+                 y=y, chord_vocab=processor.chord_vocab)
+
+        print("✅ Dados de treinamento salvos!")
+        print(f"📁 Arquivos gerados:")
+        print(f"   • {output_file}")
+        print(f"   • {output_dir}/training_data.npz")
+
+    except Exception as e:
+        print(f"⚠️ Erro preparando dados de treinamento: {e}")
+        print("ℹ️ Dados JSON salvos, mas numpy arrays não puderam ser criados")
+
+def merge_processed_shards(output_dir: str = 'datasets/processed', codec: str = 'float32'):
+    """
+    Junta os JSONs dos shards na ordem de uma execução em um único nó (GuitarSet
+    e depois IDMT, arquivos em ordem) e gera as mesmas saídas do main.
+    """
+    shards = find_shards(Path(output_dir) / "musictutor_training_data.json")
+    print(f"🧩 Juntando {len(shards)} shards em {output_dir}...")
+
+    samples = []
+    feature_config = None
+    for path in shards:
+        with open(path) as f:
+            data = json.load(f)
+        config = data['metadata']['feature_config']
+        if feature_config is None:
+            feature_config = config
+        elif config != feature_config:
+            raise ValueError(f"{path.name} foi gerado com outra configuração de features")
+        samples.extend(data['samples'])
+        print(f"   {path.name}: {len(data['samples'])} amostras")
+
+    if not samples:
+        print("❌ Nenhuma amostra nos shards.")
+        return
+
+    samples.sort(key=lambda s: (SOURCES.index(s['metadata']['source']), Path(s['audio_file'])))
+    processor = DatasetProcessor(backend=feature_config['backend'])
+    write_training_outputs(processor, samples, output_dir, codec)
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Processador de Datasets para MusicTutor IA')
     parser.add_argument('--datasets', nargs='+', default=['guitarset', 'idmt-guitar'],
                        help='Datasets para processar')
     parser.add_argument('--output-dir', default='datasets/processed',
                        help='Diretório de saída')
-    args = parser.parse_args()
+    parser.add_argument('--backend', choices=['librosa', 'numpy'], default='librosa',
+                       help='Backend de features (numpy: sem librosa, ver feature_backend.py)')
+    parser.add_argument('--codec', choices=['float32', 'float16', 'uint8'], default='float32',
+                       help='Armazenamento de X no training_data.npz (ver feature_codecs.py)')
+    parser.add_argument('--shard-index', type=int, default=0,
+                       help='Shard processado por esta máquina (0 a num-shards - 1)')
+    parser.add_argument('--num-shards', type=int, default=1,
+                       help='Total de shards (junte depois com dataset_shards.py process)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Retoma uma execução interrompida, pulando os arquivos já concluídos')
+    parser.add_argument('--checkpoint-every', type=int, default=25,
+                       help='Arquivos por bloco gravado em disco')
+    parser.add_argument('--retries', type=int, default=1,
+                       help='Novas tentativas por arquivo antes de registrá-lo como falha')
+    parser.add_argument('--prefetch', type=int, default=4,
+                       help='Arquivos decodificados antecipadamente em segundo plano (0 = desligado)')
+    args = parser.parse_args(argv)
 
     print("🎸 MusicTutor - Processamento de Datasets")
     print("=" * 45)
 
-    processor = DatasetProcessor()
+    processor = DatasetProcessor(backend=args.backend, shard_index=args.shard_index,
+                                 num_shards=args.num_shards)
+    processor.prefetch = args.prefetch
+    output_file = shard_path(f"{args.output_dir}/musictutor_training_data.json",
+                             args.shard_index, args.num_shards)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    processor.checkpoint = PreprocessCheckpoint(
+        output_file, args.resume, args.checkpoint_every, args.retries, suffix='.json',
+        config={'datasets': args.datasets, 'backend': args.backend,
+                'sample_rate': processor.sample_rate, 'hop_length': processor.hop_length, 'n_fft': processor.n_fft}
+    )
 
     all_samples = []
 
@@ -343,33 +527,33 @@ def main():
         idmt_samples = processor.process_idmt_guitar()
         all_samples.extend(idmt_samples)
 
+    checkpoint = processor.checkpoint
+    if args.num_shards > 1:
+        # Só o JSON do shard; o merge gera o training_data.npz do corpus inteiro
+        processor.save_processed_data(all_samples, str(output_file))
+        write_shard_manifest(output_file, args.shard_index, args.num_shards,
+                             processor.processed_files, samples=len(all_samples), failed=checkpoint.failed)
+        checkpoint.report()
+        if not checkpoint.failed:
+            checkpoint.cleanup()
+        print(f"\n🧩 Shard {args.shard_index} pronto. Depois de todos os shards:")
+        print(f"   python dataset_shards.py process --output-dir {args.output_dir} --codec {args.codec}")
+        return
+
     if not all_samples:
         print("❌ Nenhum dataset foi processado. Verifique os downloads.")
+        checkpoint.report()
         return
 
-    # Salvar dados processados
-    output_file = f"{args.output_dir}/musictutor_training_data.json"
-    processor.save_processed_data(all_samples, output_file)
-
-    # Preparar dados para treinamento
-    try:
-        X, y = processor.prepare_training_data(all_samples)
-
-        # Salvar em formato numpy para uso posterior
-        np.savez(f"{args.output_dir}/training_data.npz", X=X, y=y, chord_vocab=processor.chord_vocab)
-
-        print("✅ Dados de treinamento salvos!")
-        print(f"📁 Arquivos gerados:")
-        print(f"   • {output_file}")
-        print(f"   • {args.output_dir}/training_data.npz")
-
-    except Exception as e:
-        print(f"⚠️ Erro preparando dados de treinamento: {e}")
-        print("ℹ️ Dados JSON salvos, mas numpy arrays não puderam ser criados")
+    write_training_outputs(processor, all_samples, args.output_dir, args.codec)
+    # Blocos só são apagados quando nenhum arquivo ficou pendente
+    checkpoint.report()
+    if not checkpoint.failed:
+        checkpoint.cleanup()
 
     print("\n🎯 Próximos passos:")
     print("1. Treine o modelo: python train_model.py")
     print("2. Teste no dashboard: http://localhost:3007/training")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,153 +2,252 @@
 """
 Script para processar samples do Philharmonia Orchestra
 Gera manifestos JSON para cada instrumento
+
+Os diretórios de instrumentos são varridos em paralelo (os.scandir) e os metadados
+são lidos apenas do cabeçalho (WAV/FLAC/MP3/OGG). Os resultados ficam em cache por
+(caminho, tamanho, mtime), então arquivos inalterados não são relidos.
+Variantes de dinâmica/articulação da mesma nota são mantidas como entradas indexadas.
 """
 
-import os
 import json
+import os
+import re
 import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # Diretório base
 BASE_DIR = Path(__file__).parent
 SAMPLES_DIR = BASE_DIR / "client" / "public" / "samples" / "philharmonia"
 OUTPUT_DIR = SAMPLES_DIR
+CACHE_FILE = SAMPLES_DIR / ".metadata_cache.json"
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3', '.ogg')
 
 # Mapeamento de nomes de arquivos para notas
 # Os samples do Philharmonia seguem padrões como:
 # - "violin_A4_15_forte_normal.wav" = Violin, A4, 15s, forte, normal
 # - "cello_C3_15_mezzo-forte_normal.wav" = Cello, C3, 15s, mezzo-forte, normal
+# - "flute_As4_1_piano_normal.mp3" = Flute, A#4 ('s' = sustenido)
 NOTE_PATTERNS = [
-    r'([A-G][#b]?)(\d+)',  # Padrão: C4, A#3, etc.
-    r'note_([A-G][#b]?)(\d+)',  # Padrão: note_C4
-    r'([A-G][#b]?)(\d+)_',  # Padrão: C4_15_forte
+    re.compile(r'note_([A-G](?:#|b|s)?)(\d+)'),  # Padrão: note_C4
+    re.compile(r'_([A-G](?:#|b|s)?)(\d+)_'),  # Padrão: _C4_15_forte
+    re.compile(r'([A-G](?:#|b|s)?)(\d+)'),  # Padrão: C4, A#3, etc.
 ]
 
-def get_audio_duration(file_path: Path) -> float:
-    """Obtém a duração de um arquivo de áudio WAV"""
+# Campos após a nota: duração, dinâmica, articulação
+VARIANT_PATTERN = re.compile(r'_[A-G](?:#|b|s)?\d+_([^_]+)_([^_]+)_(.+)$')
+
+FLAT_TO_SHARP = {'Db': 'C#', 'Eb': 'D#', 'Fb': 'E', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#', 'Cb': 'B'}
+
+
+def get_audio_metadata(file_path: Path) -> Dict:
+    """Lê duração/taxa/canais apenas do cabeçalho do arquivo"""
     try:
-        with wave.open(str(file_path), 'rb') as wav_file:
-            frames = wav_file.getnframes()
-            sample_rate = wav_file.getframerate()
-            duration = frames / float(sample_rate)
-            return round(duration, 2)
-    except Exception as e:
-        print(f"⚠️ Erro ao ler {file_path}: {e}")
-        return 2.0  # Duração padrão
-
-def parse_note_from_filename(filename: str) -> str | None:
+        import soundfile as sf
+        info = sf.info(str(file_path))
+        return {
+            'duration': round(info.frames / float(info.samplerate), 2),
+            'sample_rate': info.samplerate,
+            'channels': info.channels,
+        }
+    except Exception:
+        pass
+
+    if file_path.suffix.lower() == '.wav':
+        try:
+            with wave.open(str(file_path), 'rb') as wav_file:
+                frames = wav_file.getnframes()
+                sample_rate = wav_file.getframerate()
+                return {
+                    'duration': round(frames / float(sample_rate), 2),
+                    'sample_rate': sample_rate,
+                    'channels': wav_file.getnchannels(),
+                }
+        except Exception as e:
+            print(f"⚠️ Erro ao ler {file_path}: {e}")
+
+    return {'duration': 2.0}  # Duração padrão
+
+
+def get_audio_duration(file_path: Path) -> float:
+    """Obtém a duração de um arquivo de áudio"""
+    return get_audio_metadata(file_path)['duration']
+
+
+def parse_note_from_filename(filename: str) -> Optional[str]:
     """Extrai o nome da nota do nome do arquivo"""
-    import re
-    
     # Remover extensão
-    name = filename.replace('.wav', '').replace('.WAV', '')
-    
-    # Tentar diferentes padrões
-    patterns = [
-        r'([A-G][#b]?)(\d+)',  # C4, A#3, Bb2
-        r'note_([A-G][#b]?)(\d+)',  # note_C4
-        r'_([A-G][#b]?)(\d+)_',  # _C4_15_forte
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, name)
+    name = os.path.splitext(filename)[0]
+
+    for pattern in NOTE_PATTERNS:
+        match = pattern.search(name)
         if match:
             note = match.group(1)
             octave = match.group(2)
             # Normalizar sustenidos/bemóis
-            note = note.replace('b', '#').replace('Bb', 'A#').replace('Db', 'C#').replace('Eb', 'D#').replace('Gb', 'F#').replace('Ab', 'G#')
+            if note.endswith('s'):
+                note = note[0] + '#'
+            note = FLAT_TO_SHARP.get(note, note)
             return f"{note}{octave}"
-    
+
     return None
 
-def process_instrument(instrument_dir: Path) -> Dict[str, Dict]:
+
+def parse_variant_from_filename(filename: str) -> Dict:
+    """Extrai dinâmica e articulação do nome do arquivo (quando presentes)"""
+    match = VARIANT_PATTERN.search(os.path.splitext(filename)[0])
+    if not match:
+        return {}
+    return {
+        'length': match.group(1),
+        'dynamic': match.group(2),
+        'articulation': match.group(3),
+    }
+
+
+def load_cache() -> Dict:
+    if CACHE_FILE.exists():
+        try:
+            with open(CACHE_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_cache(cache: Dict):
+    tmp_path = CACHE_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def scan_audio_files(instrument_dir: Path) -> List[os.DirEntry]:
+    with os.scandir(instrument_dir) as it:
+        return sorted(
+            (e for e in it if e.is_file() and os.path.splitext(e.name)[1].lower() in AUDIO_EXTENSIONS),
+            key=lambda e: e.name
+        )
+
+
+def process_instrument(instrument_dir: Path, cache: Optional[Dict] = None, seen: Optional[set] = None) -> Dict[str, Dict]:
     """Processa um diretório de instrumento e retorna o manifesto"""
     manifest = {}
-    
+    cache = cache if cache is not None else {}
+    seen = seen if seen is not None else set()
+
     if not instrument_dir.exists():
         print(f"⚠️ Diretório não encontrado: {instrument_dir}")
         return manifest
-    
-    # Listar todos os arquivos WAV
-    wav_files = list(instrument_dir.glob("*.wav")) + list(instrument_dir.glob("*.WAV"))
-    
-    if not wav_files:
-        print(f"⚠️ Nenhum arquivo WAV encontrado em {instrument_dir}")
+
+    entries = scan_audio_files(instrument_dir)
+
+    if not entries:
+        print(f"⚠️ Nenhum arquivo de áudio encontrado em {instrument_dir}")
         return manifest
-    
-    print(f"📁 Processando {instrument_dir.name}: {len(wav_files)} arquivos")
-    
-    for wav_file in wav_files:
+
+    print(f"📁 Processando {instrument_dir.name}: {len(entries)} arquivos")
+
+    for entry in entries:
+        stat = entry.stat()
+        cache_key = entry.path
+        seen.add(cache_key)
+        cached = cache.get(cache_key)
+        if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+            metadata = cached['metadata']
+        else:
+            metadata = get_audio_metadata(Path(entry.path))
+            cache[cache_key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'metadata': metadata}
+
         # Tentar extrair nota do nome do arquivo
-        note_name = parse_note_from_filename(wav_file.name)
-        
+        note_name = parse_note_from_filename(entry.name)
+
         if not note_name:
             # Se não conseguir extrair, usar o nome do arquivo sem extensão
-            note_name = wav_file.stem
-        
-        # Obter duração
-        duration = get_audio_duration(wav_file)
-        
-        # Adicionar ao manifesto
-        manifest[note_name] = {
-            "file": wav_file.name,
-            "duration": duration
+            note_name = os.path.splitext(entry.name)[0]
+
+        variant = {
+            "file": entry.name,
+            "duration": metadata['duration'],
+            "bytes": stat.st_size,
+            **parse_variant_from_filename(entry.name),
         }
-    
+
+        # Primeira variante define o arquivo padrão da nota; todas ficam em 'variants'
+        note_entry = manifest.get(note_name)
+        if note_entry is None:
+            note_entry = {"file": entry.name, "duration": metadata['duration'], "variants": []}
+            manifest[note_name] = note_entry
+        variant['index'] = len(note_entry['variants'])
+        note_entry['variants'].append(variant)
+
     return manifest
 
+
 def main():
     """Processa todos os instrumentos do Philharmonia"""
     print("🎼 Processando samples do Philharmonia Orchestra...")
     print("")
-    
+
     if not SAMPLES_DIR.exists():
         print(f"❌ Diretório não encontrado: {SAMPLES_DIR}")
         print("💡 Execute primeiro o script de download!")
         return
-    
+
     # Listar todos os diretórios de instrumentos
-    instrument_dirs = [d for d in SAMPLES_DIR.iterdir() if d.is_dir()]
-    
+    with os.scandir(SAMPLES_DIR) as it:
+        instrument_dirs = sorted(Path(e.path) for e in it if e.is_dir())
+
     if not instrument_dirs:
         print(f"❌ Nenhum instrumento encontrado em {SAMPLES_DIR}")
         print("💡 Execute primeiro o script de download!")
         return
-    
+
     print(f"📦 Encontrados {len(instrument_dirs)} instrumentos")
     print("")
-    
-    # Processar cada instrumento
+
+    cache = load_cache()
+    seen = set()
+
+    # Processar instrumentos em paralelo (I/O de cabeçalhos e stat)
+    with ThreadPoolExecutor(max_workers=min(16, len(instrument_dirs))) as pool:
+        manifests = list(pool.map(lambda d: process_instrument(d, cache, seen), instrument_dirs))
+
     all_manifests = {}
-    
-    for instrument_dir in sorted(instrument_dirs):
-        manifest = process_instrument(instrument_dir)
-        
+
+    for instrument_dir, manifest in zip(instrument_dirs, manifests):
         if manifest:
             # Salvar manifesto individual
             manifest_path = instrument_dir / "manifest.json"
             with open(manifest_path, 'w', encoding='utf-8') as f:
                 json.dump(manifest, f, indent=2, ensure_ascii=False)
-            
+
+            variant_count = sum(len(e['variants']) for e in manifest.values())
             all_manifests[instrument_dir.name] = {
                 "count": len(manifest),
+                "variants": variant_count,
                 "notes": list(manifest.keys())[:10]  # Primeiras 10 notas como exemplo
             }
-            
-            print(f"  ✅ {instrument_dir.name}: {len(manifest)} notas processadas")
+
+            print(f"  ✅ {instrument_dir.name}: {len(manifest)} notas, {variant_count} variantes")
         else:
             print(f"  ⚠️ {instrument_dir.name}: Nenhuma nota encontrada")
-        print("")
-    
+
+    # Remover do cache arquivos que não existem mais
+    save_cache({k: v for k, v in cache.items() if k in seen})
+
     # Salvar manifesto geral
     general_manifest_path = SAMPLES_DIR / "manifest.json"
     with open(general_manifest_path, 'w', encoding='utf-8') as f:
         json.dump(all_manifests, f, indent=2, ensure_ascii=False)
-    
+
+    print("")
     print("✅ Processamento concluído!")
     print(f"📄 Manifesto geral salvo em: {general_manifest_path}")
     print(f"📊 Total de instrumentos processados: {len(all_manifests)}")
 
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Renderizador offline de acompanhamentos (progressões de acordes)
+===============================================================
+
+Recebe progressões (acordes, durações em tempos, andamento, padrão de strum) e
+mistura os samples de client/public/samples/chords em um único buffer por faixa.
+Os samples são decodificados uma única vez (ChordBank) e cada batida é acumulada
+direto no buffer da faixa (midi_renderer.overlap_add). As faixas são codificadas
+e descritas em um manifest com os tempos de início de cada acorde (para
+sincronizar a UI).
+
+Formato do arquivo de progressões (JSON, lista ou objeto único):
+[
+  {"name": "licao-01", "tempo": 90, "beatsPerBar": 4, "strum": "D-DU-UDU",
+   "chords": [["C", 4], ["G", 4], ["Am", 4], ["F", 4]], "repeat": 2}
+]
+
+Padrão de strum: um caractere por subdivisão do compasso (D = para baixo,
+U = para cima, - = pausa) ou um nome de PRESET_STRUMS.
+
+Uso:
+python render_backing_tracks.py --progressions lessons.json --output-dir client/public/backing_tracks
+"""
+
+import argparse
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from midi_renderer import finalize, overlap_add
+from music_notes import FLAT_TO_SHARP
+from sample_manifest import SAMPLES_DIR, library_files, load_manifest, save_manifest
+
+PRESET_STRUMS = {
+    'whole': 'D-------',
+    'quarters': 'D-D-D-D-',
+    'folk': 'D-DU-UDU',
+    'pop': 'D-D-UDU-',
+    'ballad': 'D---D-U-',
+}
+
+UP_GAIN = 0.7  # strum para cima soa mais leve (menos cordas)
+DOWN_GAIN = 1.0
+
+
+class ChordBank:
+    """Samples de acordes decodificados uma vez, procurados por nome do manifest ou do arquivo"""
+
+    def __init__(self, chords_dir=SAMPLES_DIR / "chords", sample_rate: int = 44100):
+        self.chords_dir = Path(chords_dir)
+        self.sample_rate = sample_rate
+        self._paths: Dict[str, Path] = {}
+        self._cache: Dict[Path, np.ndarray] = {}
+
+        files = library_files(self.chords_dir)
+        for path in files.values():
+            self._paths[path.stem] = path
+        for name, entry in load_manifest(self.chords_dir / 'manifest.json').items():
+            if entry.get('file') in files:
+                self._paths[name] = files[entry['file']]
+
+    def get(self, chord: str) -> np.ndarray:
+        # Bemóis viram o sustenido equivalente (Bb7 -> A#7): a biblioteca só usa sustenidos
+        if chord[:2] in FLAT_TO_SHARP:
+            chord = FLAT_TO_SHARP[chord[:2]] + chord[2:]
+        path = self._paths.get(chord) or self._paths.get(chord.replace('#', 'sharp'))
+        if path is None:
+            raise KeyError(f"Acorde sem sample: {chord}")
+        if path not in self._cache:
+            audio, sr = sf.read(str(path), dtype='float32', always_2d=True)
+            audio = audio.mean(axis=1)
+            if sr != self.sample_rate:
+                from fill_note_gaps import shift_resample
+                audio = shift_resample(audio, -12 * np.log2(self.sample_rate / sr))
+            self._cache[path] = audio
+        return self._cache[path]
+
+
+def strum_hits(pattern: str, beats_per_bar: int):
+    """(posição em tempos dentro do compasso, ganho) de cada batida do padrão"""
+    pattern = PRESET_STRUMS.get(pattern, pattern)
+    step = beats_per_bar / len(pattern)
+    return [
+        (i * step, DOWN_GAIN if c.upper() == 'D' else UP_GAIN)
+        for i, c in enumerate(pattern) if c.upper() in ('D', 'U')
+    ]
+
+
+def render_progression(progression: Dict, bank: ChordBank, release: float = 0.05):
+    """Renderiza uma progressão; retorna (áudio, linha do tempo dos acordes)"""
+    sr = bank.sample_rate
+    tempo = float(progression.get('tempo', 90))
+    beats_per_bar = int(progression.get('beatsPerBar', 4))
+    hits = strum_hits(progression.get('strum', 'quarters'), beats_per_bar)
+    seconds_per_beat = 60.0 / tempo
+    chords = progression['chords'] * int(progression.get('repeat', 1))
+
+    samples: List[np.ndarray] = []
+    starts: List[float] = []
+    gains: List[float] = []
+    timeline = []
+    beat = 0.0
+    for chord, beats in chords:
+        timeline.append({'chord': chord, 'start': round(beat * seconds_per_beat, 4), 'beats': beats})
+        audio = bank.get(chord)
+        # Padrão repetido por compasso, cortado na duração do acorde
+        bar = 0.0
+        while bar < beats:
+            for position, gain in hits:
+                if bar + position < beats:
+                    samples.append(audio)
+                    starts.append((beat + bar + position) * seconds_per_beat)
+                    gains.append(gain)
+            bar += beats_per_bar
+        beat += beats
+
+    total = int(round(beat * seconds_per_beat * sr))
+    if not samples:
+        return np.zeros(total, dtype=np.float32), timeline
+
+    # Cada batida soa até a próxima (abafa a anterior), com release curto
+    offsets = np.round(np.array(starts) * sr).astype(np.int64)
+    next_offsets = np.append(offsets[1:], total)
+    release_samples = max(1, int(release * sr))
+    lengths = np.minimum([len(s) for s in samples], next_offsets - offsets + release_samples)
+    lengths = np.minimum(lengths, total - offsets)
+
+    mix = overlap_add(samples, offsets, lengths, np.array(gains), release_samples, total)
+    return finalize(mix[:total], sr), timeline
+
+
+def encode(audio: np.ndarray, sample_rate: int, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=fmt.upper())
+    return buffer.getvalue()
+
+
+# Banco de samples por worker (carregado uma vez no initializer)
+_bank: Optional[ChordBank] = None
+
+
+def _init_worker(chords_dir: str, sample_rate: int):
+    global _bank
+    _bank = ChordBank(chords_dir, sample_rate)
+
+
+def render_job(job: Dict) -> Dict:
+    progression = job['progression']
+    try:
+        audio, timeline = render_progression(progression, _bank)
+    except KeyError as e:
+        return {'name': progression['name'], 'ok': False, 'error': str(e)}
+    file_name = f"{progression['name']}.{job['format']}"
+    (Path(job['output_dir']) / file_name).write_bytes(encode(audio, _bank.sample_rate, job['format']))
+    return {
+        'name': progression['name'],
+        'ok': True,
+        'entry': {
+            'file': file_name,
+            'duration': round(len(audio) / _bank.sample_rate, 3),
+            'tempo': progression.get('tempo', 90),
+            'strum': progression.get('strum', 'quarters'),
+            'chords': timeline,
+        }
+    }
+
+
+def render_all(progressions: List[Dict], output_dir, chords_dir=SAMPLES_DIR / "chords",
+               fmt: str = 'ogg', sample_rate: int = 44100, workers: Optional[int] = None) -> Dict:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [{'progression': p, 'format': fmt, 'output_dir': str(output_dir)} for p in progressions]
+
+    manifest = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(chords_dir), sample_rate)
+    ) as pool:
+        for result in pool.map(render_job, jobs, chunksize=8):
+            if result['ok']:
+                manifest[result['name']] = result['entry']
+            else:
+                print(f"  ⚠️ {result['name']}: {result['error']}")
+
+    save_manifest(output_dir / 'manifest.json', manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Renderiza progressões de acordes em faixas de acompanhamento')
+    parser.add_argument('--progressions', required=True,
+                        help='Arquivo JSON com as progressões')
+    parser.add_argument('--output-dir', default='client/public/backing_tracks',
+                        help='Diretório de saída')
+    parser.add_argument('--chords-dir', default=str(SAMPLES_DIR / 'chords'),
+                        help='Biblioteca de samples de acordes')
+    parser.add_argument('--format', choices=['ogg', 'mp3', 'flac', 'wav'], default='ogg',
+                        help='Formato de saída')
+    parser.add_argument('--sample-rate', type=int, default=44100,
+                        help='Taxa de amostragem')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos em paralelo (padrão: número de CPUs)')
+    args = parser.parse_args()
+
+    with open(args.progressions, encoding='utf-8') as f:
+        progressions = json.load(f)
+    if isinstance(progressions, dict):
+        progressions = [progressions]
+
+    print(f"🎸 Renderizando {len(progressions)} progressões...")
+    manifest = render_all(progressions, args.output_dir, args.chords_dir,
+                          args.format, args.sample_rate, args.workers)
+    print(f"✅ {len(manifest)} faixas geradas em {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
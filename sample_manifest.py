@@ -0,0 +1,100 @@
+"""
+Utilitários compartilhados para os manifests das bibliotecas de samples
+(client/public/samples/{chords,notes} e philharmonia).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import wave
+from pathlib import Path
+from typing import Dict, Iterable
+
+SAMPLES_DIR = Path(__file__).parent / "client" / "public" / "samples"
+
+# Arquivos que existem no diretório de samples mas não devem ir para o usuário
+EXCLUDED_SUFFIXES = ('_test', '_backup', '_old', '_tmp')
+EXCLUDED_DIR_MARKERS = ('backup',)
+
+
+def is_shippable(path: Path, root: Path = SAMPLES_DIR) -> bool:
+    """
+    Retorna False para arquivos de teste/backup esquecidos na pasta pública.
+    Só as pastas abaixo de root contam (um checkout em .../backup/... não
+    exclui tudo); fora de root, só a pasta da própria biblioteca.
+    """
+    path = Path(path)
+    if path.stem.endswith(EXCLUDED_SUFFIXES):
+        return False
+    try:
+        parts = path.resolve().parent.relative_to(Path(root).resolve()).parts
+    except ValueError:
+        parts = (path.parent.name,)
+    return not any(marker in part for part in parts for marker in EXCLUDED_DIR_MARKERS)
+
+
+def load_manifest(manifest_path) -> Dict:
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_path, manifest: Dict):
+    """Grava o manifest de forma atômica (arquivo temporário + rename)"""
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=manifest_path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def update_manifest_entries(manifest_path, updates: Dict[str, Dict]) -> Dict:
+    """Mescla campos novos nas entradas existentes do manifest e salva"""
+    manifest = load_manifest(manifest_path)
+    for name, fields in updates.items():
+        manifest.setdefault(name, {}).update(fields)
+    save_manifest(manifest_path, manifest)
+    return manifest
+
+
+def entries_by_file(manifest: Dict) -> Dict[str, list]:
+    """Agrupa os nomes do manifest pelo arquivo (vários aliases podem apontar para o mesmo)"""
+    grouped = {}
+    for name, entry in manifest.items():
+        if isinstance(entry, dict) and 'file' in entry:
+            grouped.setdefault(entry['file'], []).append(name)
+    return grouped
+
+
+def library_files(library_dir, extensions: Iterable[str] = ('.wav',)) -> Dict[str, Path]:
+    """Arquivos de áudio publicáveis de uma biblioteca, indexados pelo nome do arquivo"""
+    library_dir = Path(library_dir)
+    extensions = tuple(e.lower() for e in extensions)
+    return {
+        p.name: p
+        for p in sorted(library_dir.iterdir())
+        if p.is_file() and p.suffix.lower() in extensions and is_shippable(p)
+    }
+
+
+def audio_duration(file_path) -> float:
+    """Duração real do arquivo (soundfile quando disponível, senão wave)"""
+    try:
+        import soundfile as sf
+        info = sf.info(str(file_path))
+        return round(info.frames / float(info.samplerate), 3)
+    except ImportError:
+        with wave.open(str(file_path), 'rb') as wav_file:
+            return round(wav_file.getnframes() / float(wav_file.getframerate()), 3)
+
+
+def content_hash(file_path, length: int = 10) -> str:
+    """Hash do conteúdo para nomes de arquivo imutáveis (cache longo no CDN)"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
@@ -0,0 +1,132 @@
+"""
+Transporte de arrays entre workers e o processo principal por memória compartilhada.
+
+Um ProcessPoolExecutor normal serializa (pickle) cada array de features de
+volta para o processo principal, e para arquivos curtos esse custo domina.
+Aqui o worker copia o array para um bloco multiprocessing.shared_memory e
+devolve só uma referência (nome do bloco, shape e dtype) junto com os
+metadados; o processo principal usa o bloco como np.ndarray sem cópia e o
+desmapeia quando os dados já foram copiados para o destino.
+
+    # worker
+    return {'X': share_array(features), 'labels': labels}
+    # processo principal
+    arrays = SharedArrays()
+    X = arrays.view(result['X'])  # view do bloco (ndarray comum passa direto)
+    destino[...] = X
+    del X
+    arrays.release()  # desmapeia; levanta BufferError se ainda houver views
+
+O nome do bloco sai de /dev/shm já em view(); o mapeamento vale até release().
+
+Resultados que nunca chegam a ser usados (consumidor interrompido, erro no
+meio do pool) precisam ser removidos com release_refs/discard_futures, senão
+os blocos ficam em /dev/shm até o próximo boot.
+"""
+import sys
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Referência a um array em um bloco de memória compartilhada (é o que passa pelo pickle)."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def share_array(array: np.ndarray) -> Union[SharedArray, np.ndarray]:
+    """Copia o array para um bloco novo (executado no worker); arrays vazios voltam como estão"""
+    array = np.ascontiguousarray(array)
+    if array.nbytes == 0:
+        return array
+    if sys.version_info >= (3, 13):
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes, track=False)
+    else:
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        # O bloco passa a ser do processo principal: sem isso o resource_tracker
+        # do worker o removeria quando o worker terminasse
+        resource_tracker.unregister(block._name, 'shared_memory')
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    ref = SharedArray(block.name, tuple(array.shape), array.dtype.str)
+    block.close()  # o bloco continua existindo até o processo principal chamar unlink
+    return ref
+
+
+class SharedArrays:
+    """Blocos anexados pelo processo principal, desmapeados juntos em release()."""
+
+    def __init__(self):
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def view(self, ref: Union[SharedArray, np.ndarray]) -> np.ndarray:
+        """
+        ndarray sobre o bloco (sem cópia). O nome é removido de /dev/shm aqui
+        (o mapeamento continua válido); a view e arrays derivados dela precisam
+        ser descartados antes de release().
+        """
+        if isinstance(ref, np.ndarray):
+            return ref
+        block = shared_memory.SharedMemory(name=ref.name)
+        block.unlink()
+        self._blocks.append(block)
+        # frombuffer exporta o buffer do bloco: close() recusa desmapear enquanto houver views
+        count = int(np.prod(ref.shape))
+        return np.frombuffer(block.buf, np.dtype(ref.dtype), count).reshape(ref.shape)
+
+    def release(self):
+        """
+        Desmapeia os blocos. Com views ainda vivas levanta BufferError e mantém
+        esses blocos mapeados (release() pode ser chamado de novo depois).
+        """
+        busy = []
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                busy.append(block)
+        self._blocks = busy
+        if busy:
+            raise BufferError(f"{len(busy)} blocos compartilhados ainda têm views em uso")
+
+    def __len__(self):
+        return len(self._blocks)
+
+
+def unlink_shared(ref: SharedArray):
+    """Remove um bloco que o processo principal não anexou (resultado descartado)"""
+    try:
+        block = shared_memory.SharedMemory(name=ref.name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def release_refs(result):
+    """Remove os blocos referenciados em um resultado descartado (percorre dicts, listas e tuplas)"""
+    if isinstance(result, SharedArray):
+        unlink_shared(result)
+    elif isinstance(result, dict):
+        for value in result.values():
+            release_refs(value)
+    elif isinstance(result, (list, tuple)):
+        for value in result:
+            release_refs(value)
+
+
+def discard_futures(futures: Iterable[Future]):
+    """Cancela os futures pendentes, espera os que já estão rodando e remove os blocos dos resultados"""
+    for future in futures:
+        if future.cancel():
+            continue
+        try:
+            result = future.result()
+        except (CancelledError, Exception):
+            continue  # falhou ou foi cancelado pelo shutdown: não criou blocos para nós
+        release_refs(result)
@@ -0,0 +1,5 @@
+"""Os scripts ficam na raiz do repositório: torna-os importáveis nos testes."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
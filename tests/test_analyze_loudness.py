@@ -0,0 +1,20 @@
+"""Filtro K e loudness integrada conforme a ITU-R BS.1770-4."""
+import numpy as np
+import pytest
+
+from analyze_loudness import integrated_loudness, k_weighting
+
+
+def test_k_weighting_matches_bs1770_coefficients_at_48k():
+    (shelf_b, shelf_a), (hp_b, hp_a) = k_weighting(48000)
+    np.testing.assert_allclose(shelf_b, [1.53512485958697, -2.69169618940638, 1.19839281085285], atol=1e-10)
+    np.testing.assert_allclose(shelf_a, [1.0, -1.69065929318241, 0.73248077421585], atol=1e-10)
+    np.testing.assert_allclose(hp_b, [1.0, -2.0, 1.0], atol=1e-10)
+    np.testing.assert_allclose(hp_a, [1.0, -1.99004745483398, 0.99007225036621], atol=1e-10)
+
+
+@pytest.mark.parametrize('sr', [44100, 48000])
+def test_full_scale_997hz_sine_reads_minus_3_01_lufs(sr):
+    t = np.arange(5 * sr) / sr
+    sine = np.sin(2 * np.pi * 997 * t)[:, np.newaxis]
+    assert integrated_loudness(sine, sr) == pytest.approx(-3.01, abs=0.01)
@@ -0,0 +1,41 @@
+"""Voicings do gerador sintético batem com o rótulo que recebem."""
+from pathlib import Path
+
+import pytest
+
+from generate_synthetic_data import QUALITY_INTERVALS, chord_voicing, midi_voicings
+from music_notes import PITCH_CLASSES
+
+MIDI_DIR = Path(__file__).resolve().parent.parent / 'client' / 'public' / 'midi' / 'chords'
+
+
+def split_label(label):
+    root_length = 2 if len(label) > 1 and label[1] == '#' else 1
+    return PITCH_CLASSES.index(label[:root_length]), label[root_length:]
+
+
+def intervals_of(pitches, root_pc):
+    return {(pitch - root_pc) % 12 for pitch in pitches}
+
+
+@pytest.mark.skipif(not MIDI_DIR.is_dir(), reason='sem MIDIs de acordes')
+def test_midi_voicings_match_label_quality():
+    voicings = midi_voicings(MIDI_DIR)
+    assert voicings
+    for label, options in voicings.items():
+        root_pc, quality = split_label(label)
+        expected = {i % 12 for i in QUALITY_INTERVALS[quality]}
+        for pitches in options:
+            found = intervals_of(pitches, root_pc)
+            # Só a quinta justa pode ser omitida (ex.: acordes de 9 com 4 notas)
+            assert found <= expected and expected - found <= {7}, (label, pitches)
+
+
+def test_generated_voicings_use_only_quality_intervals():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    for quality, intervals in QUALITY_INTERVALS.items():
+        for root_pc in range(12):
+            pitches = chord_voicing(root_pc, quality, rng)
+            assert intervals_of(pitches, root_pc) <= {i % 12 for i in intervals}, (quality, pitches)
@@ -0,0 +1,25 @@
+"""Extração dos ZIPs do GuitarSet: destino só é pulado se estiver íntegro."""
+import zipfile
+
+from guitarset_zip import extract_member
+
+
+def test_same_size_corrupt_target_is_extracted_again(tmp_path):
+    archive_path = tmp_path / 'audio.zip'
+    payload = bytes(range(256)) * 64
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('audio/00_take_mic.wav', payload)
+    with zipfile.ZipFile(archive_path) as archive:
+        info = archive.getinfo('audio/00_take_mic.wav')
+
+    dest = tmp_path / 'out'
+    target = dest / 'audio' / '00_take_mic.wav'
+    assert extract_member(archive_path, info, dest) == 'extracted'
+    assert extract_member(archive_path, info, dest) == 'skipped'
+
+    # Mesmo tamanho, um byte trocado
+    corrupt = bytearray(payload)
+    corrupt[100] ^= 0xFF
+    target.write_bytes(bytes(corrupt))
+    assert extract_member(archive_path, info, dest) == 'extracted'
+    assert target.read_bytes() == payload
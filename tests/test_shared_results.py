@@ -0,0 +1,59 @@
+"""Blocos de memória compartilhada não sobrevivem a um consumidor interrompido."""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from prefetch_reader import PrefetchReader
+from shared_results import SharedArrays, release_refs, share_array
+
+SHM_DIR = Path('/dev/shm')
+
+pytestmark = pytest.mark.skipif(not SHM_DIR.is_dir(), reason='sem /dev/shm')
+
+
+def shared_blocks():
+    return {path.name for path in SHM_DIR.glob('psm_*')}
+
+
+def shared_result(index):
+    return {'X': share_array(np.full((64, 16), index, dtype=np.float32)), 'index': index}
+
+
+def test_break_out_of_process_reader_leaves_no_blocks():
+    before = shared_blocks()
+    arrays = SharedArrays()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        reader = PrefetchReader(range(20), shared_result, depth=4, executor=pool, discard=release_refs)
+        for index, loaded in reader:
+            result = loaded.get()
+            assert arrays.view(result['X'])[0, 0] == index
+            if index == 3:
+                break
+        arrays.release()
+    assert shared_blocks() - before == set()
+
+
+def test_unconsumed_result_is_discarded():
+    before = shared_blocks()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        reader = PrefetchReader(range(5), shared_result, depth=2, executor=pool, discard=release_refs)
+        for index, loaded in reader:
+            break  # get() nunca chamado
+    assert shared_blocks() - before == set()
+
+
+def test_release_refuses_to_unmap_live_views():
+    arrays = SharedArrays()
+    ref = share_array(np.arange(12, dtype=np.float32).reshape(3, 4))
+    view = arrays.view(ref)
+    assert ref.name not in shared_blocks()  # nome removido já ao anexar
+    rows = view[1:]  # arrays derivados também seguram o bloco
+    del view
+    with pytest.raises(BufferError):
+        arrays.release()
+    assert rows.sum() == sum(range(4, 12))  # continua mapeado: leitura segura
+    del rows
+    arrays.release()
+    assert len(arrays) == 0
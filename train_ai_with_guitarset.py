@@ -13,11 +13,19 @@ from typing import Dict, List, Tuple
 from collections import defaultdict
 import jams  # Para ler anotações JAMS do GuitarSet
 
+from chord_profile_assets import write_chord_profile_assets
+from chord_stats import ChordStatsAggregator
+from guitarset_zip import ZipDataset, extract_archives, open_input
+from hex_pickup import is_hex_file, load_hex, mix_strings, string_features, summarize_strings
+
 class GuitarSetTrainer:
     """Treina modelo de IA com dados do GuitarSet"""
     
-    def __init__(self, guitarset_path: str, output_dir: str = "training_data"):
+    def __init__(self, guitarset_path: str, output_dir: str = "training_data",
+                 read_from_zip: bool = False, workers: int = None):
         self.guitarset_path = Path(guitarset_path)
+        self.read_from_zip = read_from_zip  # Processa direto dos ZIPs, sem extrair
+        self.workers = workers  # Threads da extração paralela
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -31,7 +39,10 @@ class GuitarSetTrainer:
             dir_path.mkdir(parents=True, exist_ok=True)
     
     def extract_zip_files(self):
-        """Encontra diretórios extraídos do GuitarSet (sem extrair novamente)"""
+        """
+        Encontra diretórios extraídos do GuitarSet. ZIPs ainda não extraídos são
+        lidos diretamente (read_from_zip) ou extraídos em paralelo, com CRC conferido.
+        """
         print("[PROCURANDO] Procurando diretorios extraidos do GuitarSet...")
         
         zip_files = [
@@ -43,6 +54,7 @@ class GuitarSetTrainer:
         ]
         
         extracted_dirs = {}
+        pending = {}
         
         for zip_file in zip_files:
             zip_path = self.guitarset_path / zip_file
@@ -53,20 +65,31 @@ class GuitarSetTrainer:
                 print(f"  [OK] Usando diretorio ja extraido: {extract_dir.name}")
                 extracted_dirs[zip_file] = extract_dir
             elif zip_path.exists():
-                # Tentar extrair apenas se necessário
-                try:
-                    print(f"  Extraindo {zip_file}...")
-                    extract_dir.mkdir(exist_ok=True)
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(extract_dir)
-                    extracted_dirs[zip_file] = extract_dir
-                    print(f"  [OK] Extraido com sucesso")
-                except Exception as e:
-                    print(f"  [AVISO] Erro ao extrair {zip_file}: {e}")
-                    print(f"  [INFO] Tentando usar diretorio existente se disponivel...")
+                if self.read_from_zip:
+                    # Sem extração: WAV/JAMS lidos de dentro do ZIP (guitarset_zip.py)
+                    try:
+                        extracted_dirs[zip_file] = ZipDataset(zip_path)
+                        print(f"  [OK] Lendo direto do ZIP: {zip_file}")
+                    except zipfile.BadZipFile as e:
+                        print(f"  [AVISO] ZIP invalido {zip_file}: {e}")
+                else:
+                    pending[zip_file] = (zip_path, extract_dir)
             else:
                 print(f"  [AVISO] {zip_file} nao encontrado")
         
+        if pending:
+            # Todos os ZIPs de uma vez, um job por membro (CRC-32 conferido antes de renomear)
+            print(f"  Extraindo {len(pending)} ZIPs em paralelo...")
+            try:
+                counts = extract_archives(dict(pending.values()), self.workers)
+                print(f"  [OK] {counts['extracted']} extraidos, {counts['skipped']} ja existentes, "
+                      f"{counts['failed']} com erro")
+                for zip_file, (_, extract_dir) in pending.items():
+                    extracted_dirs[zip_file] = extract_dir
+            except Exception as e:
+                print(f"  [AVISO] Erro ao extrair: {e}")
+                print(f"  [INFO] Tentando usar diretorio existente se disponivel...")
+        
         return extracted_dirs
     
     def load_annotations(self, annotation_dir: Path) -> Dict:
@@ -78,7 +101,8 @@ class GuitarSetTrainer:
         
         for jams_file in jams_files:
             try:
-                jam = jams.load(str(jams_file))
+                with open_input(jams_file) as source:
+                    jam = jams.load(source)
                 file_id = jams_file.stem
                 annotations[file_id] = jam
             except Exception as e:
@@ -90,8 +114,14 @@ class GuitarSetTrainer:
     def extract_audio_features(self, audio_path: Path) -> Dict:
         """Extrai features de áudio para treinamento"""
         try:
-            # Carregar áudio
-            y, sr = librosa.load(str(audio_path), sr=22050, mono=True)
+            # Carregar áudio (hex-pickup: todos os canais, mix_strings para as features globais)
+            strings = None
+            if is_hex_file(audio_path):
+                strings, sr = load_hex(audio_path, 22050)
+                y = mix_strings(strings)
+            else:
+                with open_input(audio_path) as source:
+                    y, sr = librosa.load(source, sr=22050, mono=True)
             
             # Features para detecção de acordes
             features = {
@@ -119,20 +149,21 @@ class GuitarSetTrainer:
                 'sample_rate': sr
             }
             
+            # Features por corda (chroma, RMS e altura mediana), um STFT para os 6 canais
+            if strings is not None:
+                features.update(summarize_strings(string_features(strings, sr)))
+            
             return features
         except Exception as e:
             print(f"  [AVISO] Erro ao extrair features de {audio_path}: {e}")
             return None
     
-    def process_guitarset(self, audio_dir: Path, annotation_dir: Path):
-        """Processa todo o dataset GuitarSet"""
-        print("[PROCESSANDO] Processando GuitarSet para treinamento...")
-        
+    def iter_guitarset_samples(self, audio_dir: Path, annotation_dir: Path):
+        """Gera os samples de treinamento do GuitarSet um a um"""
         # Carregar anotações
         annotations = self.load_annotations(annotation_dir)
         
         # Processar cada arquivo de áudio
-        training_data = []
         audio_files = list(audio_dir.rglob("*.wav"))
         
         print(f"  Encontrados {len(audio_files)} arquivos de áudio")
@@ -184,7 +215,7 @@ class GuitarSetTrainer:
                 continue
             
             # Criar sample de treinamento
-            training_sample = {
+            yield {
                 'id': file_id,
                 'chord': chord_name,
                 'chord_original': main_chord,
@@ -197,7 +228,13 @@ class GuitarSetTrainer:
                     'chord_distribution': dict(chord_counts)
                 }
             }
-            
+    
+    def process_guitarset(self, audio_dir: Path, annotation_dir: Path):
+        """Processa todo o dataset GuitarSet"""
+        print("[PROCESSANDO] Processando GuitarSet para treinamento...")
+        
+        training_data = []
+        for training_sample in self.iter_guitarset_samples(audio_dir, annotation_dir):
             training_data.append(training_sample)
             
             if len(training_data) % 50 == 0:
@@ -206,6 +243,38 @@ class GuitarSetTrainer:
         print(f"[OK] Total: {len(training_data)} samples processados")
         return training_data
     
+    def process_guitarset_streaming(self, audio_dir: Path, annotation_dir: Path) -> ChordStatsAggregator:
+        """
+        Processa o GuitarSet em uma única passada, gravando o dataset em disco
+        à medida que os samples são produzidos e agregando estatísticas por acorde.
+        Nenhum sample fica retido em memória.
+        """
+        print("[PROCESSANDO] Processando GuitarSet para treinamento (streaming)...")
+        
+        aggregator = ChordStatsAggregator()
+        dataset_file = self.metadata_output / "training_dataset.json"
+        total = 0
+        
+        with open(dataset_file, 'w', encoding='utf-8') as f:
+            f.write('{\n  "samples": [')
+            for training_sample in self.iter_guitarset_samples(audio_dir, annotation_dir):
+                aggregator.update(training_sample['chord'], training_sample['features'])
+                f.write(',\n    ' if total else '\n    ')
+                json.dump(training_sample, f, ensure_ascii=False)
+                total += 1
+                
+                if total % 50 == 0:
+                    print(f"  Processados: {total} samples")
+            
+            stats = self.dataset_stats(aggregator)
+            f.write('\n  ],\n  "stats": ')
+            json.dump(stats, f, ensure_ascii=False)
+            f.write('\n}\n')
+        
+        print(f"[OK] Total: {total} samples processados")
+        print(f"  [SALVO] Dataset salvo em: {dataset_file}")
+        return aggregator
+    
     def normalize_chord_name(self, chord: str) -> str:
         """Normaliza nome do acorde do GuitarSet para formato simples"""
         # Mapeamento GuitarSet -> Nome simples
@@ -227,25 +296,24 @@ class GuitarSetTrainer:
         
         return chord_map.get(chord, chord.split(':')[0])
     
+    def dataset_stats(self, aggregator: ChordStatsAggregator) -> Dict:
+        """Estatísticas gerais do dataset a partir do agregador por acorde"""
+        chord_distribution = {chord: aggregator.count(chord) for chord in aggregator.chords()}
+        total_samples = sum(chord_distribution.values())
+        
+        return {
+            'total_samples': total_samples,
+            'unique_chords': len(chord_distribution),
+            'chord_distribution': chord_distribution,
+            'avg_samples_per_chord': total_samples / len(chord_distribution) if chord_distribution else 0
+        }
+    
     def create_training_dataset(self, training_data: List[Dict]):
         """Cria dataset de treinamento estruturado"""
         print("[CRIANDO] Criando dataset de treinamento...")
         
-        # Agrupar por acorde
-        chord_groups = defaultdict(list)
-        for sample in training_data:
-            chord_groups[sample['chord']].append(sample)
-        
-        # Estatísticas
-        stats = {
-            'total_samples': len(training_data),
-            'unique_chords': len(chord_groups),
-            'chord_distribution': {chord: len(samples) for chord, samples in chord_groups.items()},
-            'avg_samples_per_chord': len(training_data) / len(chord_groups) if chord_groups else 0
-        }
-        
-        print(f"  [OK] {stats['unique_chords']} acordes únicos")
-        print(f"  [OK] Média de {stats['avg_samples_per_chord']:.1f} samples por acorde")
+        aggregator = ChordStatsAggregator.from_samples(training_data)
+        stats = self.dataset_stats(aggregator)
         
         # Salvar dataset completo
         dataset_file = self.metadata_output / "training_dataset.json"
@@ -257,43 +325,68 @@ class GuitarSetTrainer:
         
         print(f"  [SALVO] Dataset salvo em: {dataset_file}")
         
-        # Salvar features para cada acorde (para uso rápido)
-        features_by_chord = {}
-        for chord, samples in chord_groups.items():
-            features_by_chord[chord] = [s['features'] for s in samples]
+        features_by_chord = self.save_chord_features(aggregator)
+        
+        return stats, features_by_chord
+    
+    def save_chord_features(self, aggregator: ChordStatsAggregator) -> Dict:
+        """
+        Salva o perfil de features de cada acorde (para uso rápido).
+        
+        features_by_chord.json mantém o formato lido pelo GuitarSetAITrainingService
+        (lista de features por acorde), mas com um único perfil médio por acorde;
+        sampleCount nesse perfil guarda quantos samples ele resume. As
+        estatísticas completas (contagem, desvio, mín/máx) vão para chord_stats.json.
+        """
+        stats = self.dataset_stats(aggregator)
+        print(f"  [OK] {stats['unique_chords']} acordes únicos")
+        print(f"  [OK] Média de {stats['avg_samples_per_chord']:.1f} samples por acorde")
+        
+        features_by_chord = {
+            chord: [{**aggregator.mean(chord), 'sampleCount': aggregator.count(chord)}]
+            for chord in aggregator.chords()
+        }
         
         features_file = self.features_output / "features_by_chord.json"
         with open(features_file, 'w', encoding='utf-8') as f:
             json.dump(features_by_chord, f, indent=2)
         
+        stats_file = self.features_output / "chord_stats.json"
+        with open(stats_file, 'w', encoding='utf-8') as f:
+            json.dump(aggregator.to_dict(), f, indent=2)
+        
         print(f"  [SALVO] Features salvas em: {features_file}")
+        print(f"  [SALVO] Estatísticas salvas em: {stats_file}")
         
-        return stats, features_by_chord
+        return features_by_chord
     
-    def generate_ai_training_prompts(self, training_data: List[Dict]):
-        """Gera prompts de treinamento para a IA baseados nos dados"""
+    def generate_ai_training_prompts(self, training_data):
+        """
+        Gera prompts de treinamento para a IA baseados nos dados.
+        Aceita a lista de samples ou um ChordStatsAggregator já preenchido.
+        """
         print("[GERANDO] Gerando prompts de treinamento para IA...")
         
-        # Agrupar por acorde
-        chord_groups = defaultdict(list)
-        for sample in training_data:
-            chord_groups[sample['chord']].append(sample)
+        if isinstance(training_data, ChordStatsAggregator):
+            aggregator = training_data
+        else:
+            aggregator = ChordStatsAggregator.from_samples(training_data)
         
         # Criar exemplos de treinamento
         training_examples = []
         
-        for chord, samples in chord_groups.items():
+        for chord in aggregator.chords():
             # Pegar características médias do acorde
-            avg_features = self.calculate_average_features(samples)
+            avg_features = aggregator.mean(chord)
             
             example = {
                 'chord': chord,
                 'description': self.generate_chord_description(chord, avg_features),
-                'common_errors': self.identify_common_errors(chord, samples),
+                'common_errors': self.identify_common_errors(chord, aggregator),
                 'practice_tips': self.generate_practice_tips(chord, avg_features),
                 'audio_characteristics': {
-                    'typical_duration': np.mean([s['features']['duration'] for s in samples]),
-                    'typical_rms': np.mean([s['features']['rms'] for s in samples]),
+                    'typical_duration': avg_features['duration'],
+                    'typical_rms': avg_features['rms'],
                     'chroma_profile': avg_features['chroma']
                 }
             }
@@ -317,20 +410,11 @@ class GuitarSetTrainer:
         if not samples:
             return {}
         
-        features_list = [s['features'] for s in samples]
-        
-        avg = {
-            'chroma': np.mean([f['chroma'] for f in features_list], axis=0).tolist(),
-            'mfcc': np.mean([f['mfcc'] for f in features_list], axis=0).tolist(),
-            'tonnetz': np.mean([f['tonnetz'] for f in features_list], axis=0).tolist(),
-            'spectral_centroid': np.mean([f['spectral_centroid'] for f in features_list]),
-            'spectral_rolloff': np.mean([f['spectral_rolloff'] for f in features_list]),
-            'zero_crossing_rate': np.mean([f['zero_crossing_rate'] for f in features_list]),
-            'rms': np.mean([f['rms'] for f in features_list]),
-            'duration': np.mean([f['duration'] for f in features_list])
-        }
+        aggregator = ChordStatsAggregator()
+        for sample in samples:
+            aggregator.update('_', sample['features'])
         
-        return avg
+        return aggregator.mean('_')
     
     def generate_chord_description(self, chord: str, features: Dict) -> str:
         """Gera descrição do acorde baseada nas features"""
@@ -353,26 +437,24 @@ class GuitarSetTrainer:
         
         return description
     
-    def identify_common_errors(self, chord: str, samples: List[Dict]) -> List[str]:
+    def identify_common_errors(self, chord: str, aggregator: ChordStatsAggregator) -> List[str]:
         """Identifica erros comuns baseado na variação das features"""
         # Análise de variação pode indicar erros comuns
         errors = []
         
-        if len(samples) < 3:
+        if aggregator.count(chord) < 3:
             return errors
         
         # Verificar variação de RMS (pode indicar cordas abafadas)
-        rms_values = [s['features']['rms'] for s in samples]
-        rms_std = np.std(rms_values)
+        rms_std = aggregator.std(chord, 'rms')
         
-        if rms_std > 0.1:
+        if rms_std is not None and rms_std > 0.1:
             errors.append("Variação de volume - algumas cordas podem estar abafadas")
         
         # Verificar variação de chroma (pode indicar notas erradas)
-        chroma_values = [s['features']['chroma'] for s in samples]
-        chroma_std = np.std(chroma_values, axis=0)
+        chroma_std = aggregator.std(chord, 'chroma')
         
-        if np.max(chroma_std) > 0.2:
+        if chroma_std is not None and np.max(chroma_std) > 0.2:
             errors.append("Variação nas notas - verificar posição dos dedos")
         
         return errors
@@ -413,7 +495,7 @@ class GuitarSetTrainer:
                 jams_files = list(extract_dir.rglob("*.jams"))
                 print(f"[DEBUG] Encontrados {len(jams_files)} arquivos JAMS")
                 if jams_files:
-                    annotation_dir = jams_files[0].parent
+                    annotation_dir = extract_dir if isinstance(extract_dir, ZipDataset) else jams_files[0].parent
                     print(f"[DEBUG] Diretorio de anotacoes: {annotation_dir}")
                     break
         
@@ -426,7 +508,7 @@ class GuitarSetTrainer:
                     wav_files = list(extract_dir.rglob("*.wav"))
                     print(f"[DEBUG] Encontrados {len(wav_files)} arquivos WAV")
                     if wav_files:
-                        audio_dir = wav_files[0].parent
+                        audio_dir = extract_dir if isinstance(extract_dir, ZipDataset) else wav_files[0].parent
                         print(f"[DEBUG] Diretorio de audio: {audio_dir}")
                         break
             if audio_dir:
@@ -464,18 +546,22 @@ class GuitarSetTrainer:
         print(f"[DIR] Audio: {audio_dir}")
         print(f"[DIR] Anotacoes: {annotation_dir}\n")
         
-        # 3. Processar dataset
-        training_data = self.process_guitarset(audio_dir, annotation_dir)
+        # 3. Processar dataset (uma passada, estatísticas agregadas por acorde)
+        aggregator = self.process_guitarset_streaming(audio_dir, annotation_dir)
         
-        if not training_data:
+        if not aggregator.chords():
             print("[ERRO] Nenhum dado de treinamento foi gerado")
             return
         
-        # 4. Criar dataset estruturado
-        stats, features = self.create_training_dataset(training_data)
+        # 4. Salvar perfis por acorde
+        stats = self.dataset_stats(aggregator)
+        features = self.save_chord_features(aggregator)
         
         # 5. Gerar prompts de treinamento para IA
-        training_examples = self.generate_ai_training_prompts(training_data)
+        training_examples = self.generate_ai_training_prompts(aggregator)
+        
+        # 6. Variantes compactas para carregamento sob demanda no app
+        write_chord_profile_assets(features, training_examples, self.features_output)
         
         print("\n[OK] Treinamento concluido!")
         print(f"\n[STATS] Estatisticas:")
@@ -486,6 +572,7 @@ class GuitarSetTrainer:
         print(f"  - Dataset: {self.metadata_output / 'training_dataset.json'}")
         print(f"  - Features: {self.features_output / 'features_by_chord.json'}")
         print(f"  - Prompts IA: {self.metadata_output / 'ai_training_prompts.json'}")
+        print(f"  - Perfis compactos: {self.features_output / 'features_by_chord.index.json'}")
 
 if __name__ == "__main__":
     # Caminho para o diretório com os ZIPs do GuitarSet
@@ -16,19 +16,15 @@ python train_model.py --data datasets/processed/training_data.npz
 
 import os
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
 import argparse
 import json
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# TensorFlow, scikit-learn e matplotlib são importados só onde são usados:
+# `--help`, evaluate e export não pagam o custo de importação de tudo
+
 class ChordDetectionModel:
     def __init__(self, input_shape: tuple, num_classes: int):
         self.input_shape = input_shape
@@ -37,6 +33,9 @@ class ChordDetectionModel:
 
     def build_model(self):
         """Constrói o modelo CNN para detecção de acordes"""
+        from tensorflow import keras
+        from tensorflow.keras import layers
+
         print(f"🏗️ Construindo modelo: input {self.input_shape}, {self.num_classes} classes")
 
         model = keras.Sequential([
@@ -85,6 +84,8 @@ class ChordDetectionModel:
     def train(self, X_train, y_train, X_val, y_val,
               epochs=50, batch_size=32, save_path="models/chord_detector"):
         """Treina o modelo"""
+        from tensorflow import keras
+
         if self.model is None:
             raise ValueError("Modelo não foi construído")
 
@@ -175,6 +176,8 @@ class ChordDetectionModel:
 
     def plot_training_history(self, history, save_path="models"):
         """Plota o histórico de treinamento"""
+        import matplotlib.pyplot as plt
+
         os.makedirs(save_path, exist_ok=True)
 
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
@@ -218,24 +221,96 @@ class ChordDetectionModel:
 
         print(f"📈 Gráfico salvo: {save_path}/training_history.png")
 
+def dataset_normalization(data_path: str):
+    """Normalização global gravada com o dataset (None em datasets antigos)"""
+    data = np.load(data_path)
+    if 'normalization' not in data.files:
+        return None
+    return json.loads(str(data['normalization']))
+
 def load_training_data(data_path: str):
-    """Carrega dados de treinamento"""
+    """Carrega dados de treinamento (decodificados e normalizados com as estatísticas do dataset)"""
+    from feature_codecs import load_features
+    from prepare_training_data import normalize_features
+
     print(f"📂 Carregando dados: {data_path}")
 
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {data_path}")
 
     data = np.load(data_path)
-    X = data['X']
+    X = load_features(data)  # decodifica float16/uint8 (ver feature_codecs.py)
     y = data['y']
     chord_vocab = data['chord_vocab']
 
     print(f"✅ Dados carregados: {X.shape[0]} amostras, {X.shape[1]} features")
     print(f"🎼 Vocabulário: {len(chord_vocab)} acordes")
+    if 'feature_config' in data.files:
+        print(f"⚙️ Features: {json.loads(str(data['feature_config']))}")
+
+    normalization = dataset_normalization(data_path)
+    if normalization is not None:
+        X = normalize_features(X, normalization)
+        print(f"📏 Normalização global aplicada ({normalization['count']} frames)")
 
     return X, y, chord_vocab
 
-def main():
+def load_saved_model(model_path: str) -> ChordDetectionModel:
+    """Carrega um modelo Keras salvo (.h5) para avaliação ou exportação"""
+    from tensorflow import keras
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Modelo não encontrado: {model_path}")
+
+    keras_model = keras.models.load_model(model_path)
+    model = ChordDetectionModel(tuple(keras_model.input_shape[1:]), keras_model.output_shape[-1])
+    model.model = keras_model
+    return model
+
+def evaluate_main(argv=None):
+    parser = argparse.ArgumentParser(description='Avalia um modelo treinado de detecção de acordes')
+    parser.add_argument('--model', default='models/chord_detector/chord_detector_final.h5',
+                       help='Modelo Keras (.h5)')
+    parser.add_argument('--data', default='datasets/processed/training_data.npz',
+                       help='Dados de avaliação')
+    parser.add_argument('--output', default=None,
+                       help='Arquivo JSON para salvar as métricas')
+
+    args = parser.parse_args(argv)
+
+    X, y, chord_vocab = load_training_data(args.data)
+    model = load_saved_model(args.model)
+    results = model.evaluate(X, y)
+
+    if args.output:
+        metrics = {
+            'model': args.model,
+            'data': args.data,
+            'samples': int(len(X)),
+            'loss': float(results['loss']),
+            'accuracy': float(results['accuracy']),
+            'top3_accuracy': float(results['top3_accuracy']),
+        }
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(metrics, f, indent=2)
+        print(f"💾 Métricas salvas: {args.output}")
+
+    return results
+
+def export_main(argv=None):
+    parser = argparse.ArgumentParser(description='Exporta um modelo treinado para TensorFlow.js')
+    parser.add_argument('--model', default='models/chord_detector/chord_detector_final.h5',
+                       help='Modelo Keras (.h5)')
+    parser.add_argument('--model-dir', default='models/chord_detector',
+                       help='Diretório de saída (o modelo web fica em <model-dir>/web_model)')
+
+    args = parser.parse_args(argv)
+
+    model = load_saved_model(args.model)
+    model.save_for_web(args.model_dir)
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Treinamento do Modelo de Detecção de Acordes')
     parser.add_argument('--data', default='datasets/processed/training_data.npz',
                        help='Caminho para dados de treinamento')
@@ -250,7 +325,9 @@ def main():
     parser.add_argument('--val-split', type=float, default=0.2,
                        help='Proporção dos dados para validação')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    from sklearn.model_selection import train_test_split
 
     print("🎸 MusicTutor - Treinamento de IA")
     print("=" * 40)
@@ -321,6 +398,13 @@ def main():
         with open(f"{args.model_dir}/training_metrics.json", 'w') as f:
             json.dump(metrics, f, indent=2)
 
+        # Estatísticas de normalização junto do modelo: qualquer consumidor
+        # normaliza frame a frame com (x - mean) / std
+        normalization = dataset_normalization(args.data)
+        if normalization is not None:
+            with open(f"{args.model_dir}/feature_normalization.json", 'w') as f:
+                json.dump(normalization, f, indent=2)
+
         print("\n🎉 Treinamento concluído!")
         print(f"💾 Modelo salvo em: {args.model_dir}")
         print(f"📊 Acurácia final: {results['accuracy'] * 100:.2f}%")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Corte de silêncio e pontos de loop para as bibliotecas de samples
+=================================================================
+
+Processa os samples em lote (envelopes RMS calculados de forma vetorizada para
+vários arquivos de uma vez), detecta o ataque e o fim efetivo do decaimento por
+limiar de energia, corta o arquivo (todos os canais nos mesmos índices, mantendo
+canais e subtipo do original) e calcula pontos de loop alinhados a cruzamentos
+por zero dentro da janela de RMS estável (a sustentação). WAV e MP3 são aceitos.
+Cada entrada do manifest que aponta para o arquivo (inclusive as 'variants' de
+process_philharmonia_samples.py) recebe:
+
+- startOffset: início do ataque dentro do arquivo cortado (s)
+- loopStart / loopEnd: região de loop para notas sustentadas (s)
+- trimmedFrom: duração original (s)
+
+O ganho de reprodução é o gain_db de analyze_loudness.py (rode depois do corte).
+Arquivos cujas entradas já têm trimmedFrom não são cortados de novo, então
+repetir o comando na própria biblioteca não reaplica o corte nem o fade.
+
+O cliente usa arquivos menores sem nenhuma análise em tempo de execução.
+
+Uso:
+python trim_samples.py --library notes
+python trim_samples.py --library philharmonia/violin --output-dir /tmp/violin_trimmed
+"""
+
+import argparse
+import shutil
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from sample_manifest import SAMPLES_DIR, library_files, load_manifest, save_manifest
+
+HOP = 256  # amostras por frame do envelope
+AUDIO_EXTENSIONS = ('.wav', '.mp3')
+
+
+def frame_rms(batch: np.ndarray, hop: int = HOP) -> np.ndarray:
+    """Envelope RMS por frame de um lote (n, amostras) -> (n, frames); pelo menos 1 frame"""
+    if batch.shape[1] < hop:
+        # Entradas mais curtas que um frame: completa com zeros
+        batch = np.pad(batch, ((0, 0), (0, hop - batch.shape[1])))
+    n_frames = batch.shape[1] // hop
+    frames = batch[:, :n_frames * hop].reshape(batch.shape[0], n_frames, hop)
+    return np.sqrt(np.mean(frames ** 2, axis=2))
+
+
+def detect_bounds(batch: np.ndarray, lengths: np.ndarray, onset_db: float, end_db: float, hop: int = HOP):
+    """
+    Detecta ataque e fim do decaimento para todo o lote de uma vez.
+    Limiares em dB relativos ao pico do envelope de cada sample.
+    Retorna (onset, end) em amostras.
+    """
+    env = frame_rms(batch, hop)
+    peak = env.max(axis=1, keepdims=True)
+    peak[peak == 0] = 1.0
+    env_db = 20 * np.log10(np.maximum(env / peak, 1e-10))
+
+    above_onset = env_db > onset_db
+    above_end = env_db > end_db
+    onset_frame = np.argmax(above_onset, axis=1)
+    # Último frame acima do limiar: argmax no envelope invertido
+    last_frame = env.shape[1] - 1 - np.argmax(above_end[:, ::-1], axis=1)
+
+    onset = onset_frame * hop
+    end = np.minimum((last_frame + 1) * hop, lengths)
+    silent = ~above_onset.any(axis=1)
+    onset[silent] = 0
+    end[silent] = lengths[silent]
+    return onset, end
+
+
+def zero_crossings(audio: np.ndarray) -> np.ndarray:
+    """Índices de cruzamento por zero ascendente"""
+    return np.flatnonzero((audio[:-1] < 0) & (audio[1:] >= 0)) + 1
+
+
+def stable_window(env_db: np.ndarray, stability_db: float, floor_db: float) -> Tuple[int, int]:
+    """
+    Maior trecho contínuo de frames cujo envelope varia no máximo stability_db
+    e fica acima de floor_db: a sustentação. Retorna (primeiro, último) frame,
+    inclusive; (0, -1) se todos os frames estiverem abaixo de floor_db.
+    """
+    best = (0, -1)
+    left = 0
+    highs, lows = deque(), deque()  # índices com envelope decrescente / crescente
+    for right in range(len(env_db)):
+        if env_db[right] < floor_db:
+            left = right + 1
+            highs.clear()
+            lows.clear()
+            continue
+        while highs and env_db[highs[-1]] <= env_db[right]:
+            highs.pop()
+        highs.append(right)
+        while lows and env_db[lows[-1]] >= env_db[right]:
+            lows.pop()
+        lows.append(right)
+        while env_db[highs[0]] - env_db[lows[0]] > stability_db:
+            left += 1
+            if highs[0] < left:
+                highs.popleft()
+            if lows[0] < left:
+                lows.popleft()
+        if right - left > best[1] - best[0]:
+            best = (left, right)
+    return best
+
+
+def loop_points(audio: np.ndarray, sr: int, frame_ms: float = 50.0, stability_db: float = 3.0,
+                floor_db: float = -30.0):
+    """
+    Região de loop na sustentação medida: a maior janela de RMS estável (o ataque
+    e o decaimento variam demais para formar uma), com extremos em cruzamentos
+    por zero dentro dela. Em um sample silencioso, o loop cobre do pico ao fim.
+    """
+    if len(audio) == 0:
+        return 0, 0
+    # Frames longos: batimentos entre as notas de um acorde não contam como instabilidade
+    hop = max(1, int(frame_ms / 1000 * sr))
+    env = frame_rms(audio[np.newaxis, :], hop)[0]
+    peak = env.max()
+    env_db = 20 * np.log10(np.maximum(env / (peak if peak > 0 else 1.0), 1e-10))
+    peak_frame = int(np.argmax(env))
+    first, last = stable_window(env_db, stability_db, floor_db)
+    if last < first:
+        first, last = peak_frame, len(env) - 1
+
+    window_start = first * hop
+    window_end = min((last + 1) * hop, len(audio))
+    crossings = zero_crossings(audio)
+    inside = crossings[(crossings >= window_start) & (crossings <= window_end)]
+    if len(inside) < 2:
+        return window_start, window_end
+    return int(inside[0]), int(inside[-1])
+
+
+def process_batch(
+    paths: List[Path],
+    onset_db: float,
+    end_db: float,
+    pre_roll_ms: float,
+    release_ms: float
+) -> Dict[Path, Dict]:
+    """Corta um lote de arquivos e calcula metadados de playback"""
+    audios, rates = [], []
+    for path in paths:
+        audio, sr = sf.read(str(path), dtype='float32', always_2d=True)
+        audios.append(audio)  # (amostras, canais): o corte preserva os canais
+        rates.append(sr)
+
+    # Envelopes sobre cópias mono; os índices valem para todos os canais
+    lengths = np.array([len(a) for a in audios])
+    batch = np.zeros((len(audios), lengths.max()), dtype=np.float32)
+    for i, audio in enumerate(audios):
+        batch[i, :len(audio)] = audio.mean(axis=1)
+
+    onsets, ends = detect_bounds(batch, lengths, onset_db, end_db)
+
+    results = {}
+    for i, path in enumerate(paths):
+        sr = rates[i]
+        pre_roll = int(pre_roll_ms / 1000 * sr)
+        release = int(release_ms / 1000 * sr)
+        start = max(0, int(onsets[i]) - pre_roll)
+        end = min(int(lengths[i]), int(ends[i]) + release)
+        trimmed = audios[i][start:end].copy()
+
+        # Fade curto no fim para não gerar clique no corte
+        fade = min(int(0.01 * sr), len(trimmed))
+        if fade:
+            trimmed[-fade:] *= np.linspace(1, 0, fade, dtype=np.float32)[:, np.newaxis]
+
+        loop_start, loop_end = loop_points(trimmed.mean(axis=1), sr)
+
+        results[path] = {
+            'audio': trimmed,
+            'sample_rate': sr,
+            'fields': {
+                'duration': round(len(trimmed) / sr, 3),
+                'startOffset': round((int(onsets[i]) - start) / sr, 4),
+                'loopStart': round(loop_start / sr, 4),
+                'loopEnd': round(loop_end / sr, 4),
+                'trimmedFrom': round(lengths[i] / sr, 3),
+            }
+        }
+    return results
+
+
+def file_entries(manifest: Dict) -> Dict[str, List[Dict]]:
+    """Entradas do manifest (notas e suas 'variants') que apontam para cada arquivo"""
+    grouped = {}
+    for entry in manifest.values():
+        if not isinstance(entry, dict):
+            continue
+        if 'file' in entry:
+            grouped.setdefault(entry['file'], []).append(entry)
+        for variant in entry.get('variants', []):
+            grouped.setdefault(variant['file'], []).append(variant)
+    return grouped
+
+
+def trim_library(
+    library_dir,
+    output_dir=None,
+    batch_size: int = 32,
+    onset_db: float = -40.0,
+    end_db: float = -60.0,
+    pre_roll_ms: float = 5.0,
+    release_ms: float = 50.0
+) -> Dict:
+    """Corta os samples ainda não cortados de uma biblioteca e atualiza o manifest"""
+    library_dir = Path(library_dir)
+    output_dir = Path(output_dir) if output_dir else library_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_path = library_dir / 'manifest.json'
+    if not manifest_path.exists():
+        raise FileNotFoundError(
+            f"{manifest_path} não existe: gere o manifest antes (create_notes_manifest.py "
+            f"ou process_philharmonia_samples.py) para o corte chegar às entradas e variantes"
+        )
+    manifest = load_manifest(manifest_path)
+    files = library_files(library_dir, AUDIO_EXTENSIONS)
+    targets = file_entries(manifest)
+    paths = [files[f] for f in targets if f in files]
+    pending = [p for p in paths if not all('trimmedFrom' in e for e in targets[p.name])]
+
+    if output_dir != library_dir:
+        # Já cortados entram na saída como estão: a biblioteca de saída fica completa
+        for path in paths:
+            if path not in pending:
+                shutil.copy2(path, output_dir / path.name)
+
+    saved_bytes = 0
+    for i in range(0, len(pending), batch_size):
+        results = process_batch(pending[i:i + batch_size], onset_db, end_db, pre_roll_ms, release_ms)
+        for path, result in results.items():
+            target = output_dir / path.name
+            before = path.stat().st_size
+            info = sf.info(str(path))
+            sf.write(str(target), result['audio'], result['sample_rate'], format=info.format, subtype=info.subtype)
+            saved_bytes += before - target.stat().st_size
+            for entry in targets[path.name]:
+                entry.update(result['fields'])
+                if 'bytes' in entry:  # variantes de process_philharmonia_samples.py
+                    entry['bytes'] = target.stat().st_size
+
+    save_manifest(output_dir / 'manifest.json', manifest)
+    print(f"  ✅ {len(pending)} arquivos cortados ({len(paths) - len(pending)} já cortados), "
+          f"{saved_bytes / (1024 * 1024):.2f} MB economizados")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corta silêncio e calcula pontos de loop dos samples')
+    parser.add_argument('--library', default='notes',
+                        help='Biblioteca relativa a client/public/samples (ex.: notes, chords, philharmonia/violin)')
+    parser.add_argument('--samples-dir', default=str(SAMPLES_DIR),
+                        help='Diretório das bibliotecas')
+    parser.add_argument('--output-dir', default=None,
+                        help='Saída (padrão: sobrescreve a própria biblioteca)')
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='Arquivos analisados por lote')
+    parser.add_argument('--onset-db', type=float, default=-40.0,
+                        help='Limiar do ataque (dB relativo ao pico)')
+    parser.add_argument('--end-db', type=float, default=-60.0,
+                        help='Limiar do fim do decaimento (dB relativo ao pico)')
+    args = parser.parse_args()
+
+    library_dir = Path(args.samples_dir) / args.library
+    print(f"✂️ Cortando samples de {library_dir}...")
+    try:
+        trim_library(
+            library_dir,
+            args.output_dir,
+            batch_size=args.batch_size,
+            onset_db=args.onset_db,
+            end_db=args.end_db
+        )
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
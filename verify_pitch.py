@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Verificação de afinação das bibliotecas de samples
+==================================================
+
+Estima a frequência fundamental de cada sample com YIN vetorizado (todos os
+frames de um arquivo processados de uma vez, função de diferença via FFT) em um
+pool de processos, e compara com a altura esperada:
+
+- notes: nome da nota (MIDI_TO_NOTE / 'A#2', 'Asharp2')
+- philharmonia/<instrumento>: nota extraída do nome do arquivo
+- chords: apenas a classe de altura da tônica (o baixo de um acorde nem sempre é a
+  tônica, então o resultado é indicativo)
+
+Escreve pitch_report.json na biblioteca e os campos estimatedHz/pitchCents/
+pitchStatus em cada entrada do manifest.
+
+Uso:
+python verify_pitch.py --libraries notes chords philharmonia/violin
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from numpy.lib.stride_tricks import sliding_window_view
+
+from music_notes import midi_to_hz, note_to_midi, parse_pitch_class
+from sample_manifest import SAMPLES_DIR, load_manifest, save_manifest
+
+FMIN = 60.0
+FMAX = 2000.0
+OK_CENTS = 25.0
+WARN_CENTS = 50.0
+
+
+def yin(
+    audio: np.ndarray,
+    sr: int,
+    fmin: float = FMIN,
+    fmax: float = FMAX,
+    frame_length: int = 2048,
+    hop_length: int = 512,
+    threshold: float = 0.1,
+    silence_db: float = -60.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    YIN vetorizado: retorna (f0 por frame, aperiodicidade por frame).
+    Frames sem período abaixo do limiar recebem f0 = nan, assim como frames
+    silenciosos (RMS abaixo de silence_db dBFS ou função de diferença nula):
+    em silêncio digital a diferença é 0 em todo lag e o primeiro lag pareceria
+    um período (f0 = sr/tau_min).
+    """
+    tau_min = max(1, int(sr / fmax))
+    tau_max = min(int(sr / fmin), frame_length // 2)
+    window = frame_length - tau_max
+
+    if len(audio) < frame_length:
+        audio = np.pad(audio, (0, frame_length - len(audio)))
+    frames = sliding_window_view(audio, frame_length)[::hop_length].astype(np.float64)
+
+    # Correlação cruzada entre o frame e seus primeiros `window` pontos, via FFT
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + window)))
+    spec = np.fft.rfft(frames, n_fft, axis=1)
+    head = np.fft.rfft(frames[:, :window], n_fft, axis=1)
+    acf = np.fft.irfft(spec * np.conj(head), n_fft, axis=1)[:, :tau_max + 1]
+
+    # Energias das janelas deslocadas via soma cumulativa
+    cumsum = np.concatenate([np.zeros((len(frames), 1)), np.cumsum(frames ** 2, axis=1)], axis=1)
+    taus = np.arange(tau_max + 1)
+    energy_tau = cumsum[:, taus + window] - cumsum[:, taus]
+    diff = energy_tau[:, :1] + energy_tau - 2 * acf
+    diff[:, 0] = 0
+
+    # Diferença média normalizada cumulativa
+    running = np.cumsum(diff[:, 1:], axis=1)
+    cmnd = np.ones_like(diff)
+    cmnd[:, 1:] = diff[:, 1:] * taus[1:] / np.maximum(running, 1e-12)
+
+    search = cmnd[:, tau_min:tau_max]
+    is_min = np.zeros_like(search, dtype=bool)
+    is_min[:, 1:-1] = (search[:, 1:-1] <= search[:, :-2]) & (search[:, 1:-1] <= search[:, 2:])
+    candidates = (search < threshold) & is_min
+    has_candidate = candidates.any(axis=1)
+    best = np.where(has_candidate, np.argmax(candidates, axis=1), np.argmin(search, axis=1))
+
+    # Interpolação parabólica em torno do mínimo
+    rows = np.arange(len(frames))
+    idx = np.clip(best, 1, search.shape[1] - 2)
+    left, center, right = search[rows, idx - 1], search[rows, idx], search[rows, idx + 1]
+    denom = left - 2 * center + right
+    shift = np.zeros_like(denom)
+    np.divide(0.5 * (left - right), denom, out=shift, where=np.abs(denom) > 1e-12)
+    tau = tau_min + idx + np.clip(shift, -1, 1)
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    silent = (rms < 10 ** (silence_db / 20)) | (running[:, -1] <= 1e-12)
+
+    aperiodicity = search[rows, best]
+    f0 = np.where(has_candidate & ~silent, sr / tau, np.nan)
+    return f0, aperiodicity
+
+
+def estimate_pitch(path: str) -> Dict:
+    """Estima f0 de um arquivo (mediana dos frames sonoros da parte estável)"""
+    audio, sr = sf.read(path, dtype='float32', always_2d=True)
+    audio = audio.mean(axis=1)
+    f0, aperiodicity = yin(audio, sr)
+
+    # Ignorar o ataque (primeiros ~50 ms) e frames silenciosos
+    skip = max(1, int(0.05 * sr / 512))
+    voiced = f0[skip:]
+    voiced = voiced[~np.isnan(voiced)]
+    if len(voiced) == 0:
+        return {'estimatedHz': None, 'voicedRatio': 0.0}
+    return {
+        'estimatedHz': round(float(np.median(voiced)), 2),
+        'voicedRatio': round(len(voiced) / max(1, len(f0) - skip), 3),
+    }
+
+
+def cents_between(estimated_hz: float, expected_hz: float) -> float:
+    return 1200 * np.log2(estimated_hz / expected_hz)
+
+
+def compare(name: str, result: Dict, chord_mode: bool) -> Dict:
+    """Compara a estimativa com a altura esperada do nome"""
+    estimated = result['estimatedHz']
+    if chord_mode:
+        pitch_class = parse_pitch_class(name)
+        if pitch_class is None or estimated is None:
+            return {**result, 'pitchCents': None, 'pitchStatus': 'unknown' if pitch_class is None else 'unvoiced'}
+        # Distância até a oitava mais próxima da tônica
+        semitones = 12 * np.log2(estimated / midi_to_hz(60 + pitch_class))
+        cents = (semitones - 12 * np.round(semitones / 12)) * 100
+    else:
+        midi = note_to_midi(name)
+        if midi is None or estimated is None:
+            return {**result, 'pitchCents': None, 'pitchStatus': 'unknown' if midi is None else 'unvoiced'}
+        cents = cents_between(estimated, midi_to_hz(midi))
+
+    cents = float(cents)
+    status = 'ok' if abs(cents) <= OK_CENTS else 'warn' if abs(cents) <= WARN_CENTS else 'fail'
+    return {**result, 'pitchCents': round(cents, 1), 'pitchStatus': status}
+
+
+def library_targets(library_dir: Path, manifest: Dict):
+    """(nome esperado, arquivo, entrada a atualizar) para cada arquivo da biblioteca"""
+    for name, entry in manifest.items():
+        if not isinstance(entry, dict):
+            continue
+        if 'variants' in entry:
+            for variant in entry['variants']:
+                yield name, library_dir / variant['file'], variant
+        elif 'file' in entry:
+            yield name, library_dir / entry['file'], entry
+
+
+def verify_library(library_dir, workers: Optional[int] = None) -> Dict:
+    library_dir = Path(library_dir)
+    manifest_path = library_dir / 'manifest.json'
+    manifest = load_manifest(manifest_path)
+    chord_mode = library_dir.name == 'chords'
+
+    targets = [t for t in library_targets(library_dir, manifest) if t[1].exists()]
+    unique_paths = sorted({str(path) for _, path, _ in targets})
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        estimates = dict(zip(unique_paths, pool.map(estimate_pitch, unique_paths, chunksize=4)))
+
+    report = {}
+    for name, path, entry in targets:
+        result = compare(name, estimates[str(path)], chord_mode)
+        entry.update(result)
+        report[f"{name}:{path.name}"] = result
+
+    save_manifest(manifest_path, manifest)
+
+    summary = {status: sum(1 for r in report.values() if r['pitchStatus'] == status)
+               for status in ('ok', 'warn', 'fail', 'unvoiced', 'unknown')}
+    with open(library_dir / 'pitch_report.json', 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'advisory': chord_mode, 'samples': report}, f, indent=2, ensure_ascii=False)
+
+    return {'summary': summary, 'samples': report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica a afinação dos samples com YIN')
+    parser.add_argument('--libraries', nargs='+', default=['notes', 'chords'],
+                        help='Bibliotecas relativas a client/public/samples (ex.: notes, philharmonia/violin)')
+    parser.add_argument('--samples-dir', default=str(SAMPLES_DIR),
+                        help='Diretório das bibliotecas')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos em paralelo (padrão: número de CPUs)')
+    args = parser.parse_args()
+
+    print("🎯 Verificação de afinação dos samples")
+    print("=" * 40)
+
+    for library in args.libraries:
+        library_dir = Path(args.samples_dir) / library
+        if not (library_dir / 'manifest.json').exists():
+            print(f"⚠️ {library}: manifest.json não encontrado")
+            continue
+        result = verify_library(library_dir, args.workers)
+        summary = result['summary']
+        print(f"📁 {library}: {summary['ok']} ok, {summary['warn']} avisos, {summary['fail']} falhas, "
+              f"{summary['unvoiced']} sem altura definida")
+        for key, sample in result['samples'].items():
+            if sample['pitchStatus'] in ('warn', 'fail'):
+                print(f"   ⚠️ {key}: {sample['estimatedHz']} Hz ({sample['pitchCents']:+.1f} cents)")
+
+
+if __name__ == "__main__":
+    main()